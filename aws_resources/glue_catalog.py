@@ -1,7 +1,10 @@
 from .glue_database import GlueDatabase
+from .glue_name_index import GlueNameIndex
 from .aws_resource import AwsObject
 from .aws_resource_exceptions import CatalogEntityAlreadyExistsException, CatalogEntityMismatchException
 
+from typing import Callable
+
 class GlueCatalog(AwsObject):
     '''
     Represents a Catalog in the Glue Data Catalog
@@ -11,6 +14,11 @@ class GlueCatalog(AwsObject):
         self._region : str = region
         self._catalog_id : str = catalog_id
         self._databases : dict[str, GlueDatabase] = {}
+        self._database_name_index : GlueNameIndex = GlueNameIndex()
+        # Resource links, ie link name -> (target catalog id, target database name)
+        self._database_links : dict[str, tuple[str, str]] = {}
+        # Called whenever a database, database link or table of one of the databases is added.
+        self._change_listeners : list[Callable[[], None]] = []
 
     def get_region(self) -> str:
         return self._region
@@ -24,14 +32,52 @@ class GlueCatalog(AwsObject):
     def get_database(self, databaseName : str) -> GlueDatabase:
         return self._databases.get(databaseName)
 
+    def get_databases_matching(self, pattern : str) -> list[GlueDatabase]:
+        '''
+        Gets the databases whose names match a glob pattern, where "*" matches any number of characters and "?"
+        matches a single character.
+        '''
+        return [self._databases[name] for name in self._database_name_index.get_names_matching(pattern)]
+
     def add_database(self, glueDatabase: GlueDatabase):
         if glueDatabase.get_catalog_id() != self._catalog_id:
             raise CatalogEntityMismatchException(f"Invalid database provided. Database catalog id: {glueDatabase.get_catalog_id()} does not match this catalogs id: {self._catalog_id}")
 
-        if glueDatabase.get_name() in self._databases:
+        if glueDatabase.get_name() in self._databases or glueDatabase.get_name() in self._database_links:
             raise CatalogEntityAlreadyExistsException(f"Database: {glueDatabase.get_name()} already exists in catalog: {self}")
 
         self._databases[glueDatabase.get_name()] = glueDatabase
+        self._database_name_index.add(glueDatabase.get_name())
+        glueDatabase.add_change_listener(self._notify_change_listeners)
+        self._notify_change_listeners()
+
+    def add_database_link(self, link_name : str, target_catalog_id : str, target_database_name : str):
+        '''
+        Adds a resource link to a database, which may be in another catalog. Links are only aliases, the target
+        database is added to its own catalog.
+        '''
+        if link_name in self._databases or link_name in self._database_links:
+            raise CatalogEntityAlreadyExistsException(f"Database: {link_name} already exists in catalog: {self}")
+
+        self._database_links[link_name] = (target_catalog_id, target_database_name)
+        self._notify_change_listeners()
+
+    def add_change_listener(self, listener : Callable[[], None]):
+        '''
+        Registers a function that is called whenever a database, database link or table is added to this catalog,
+        including tables added directly to one of its databases.
+        '''
+        self._change_listeners.append(listener)
+
+    def _notify_change_listeners(self):
+        for listener in self._change_listeners:
+            listener()
+
+    def get_database_link(self, link_name : str) -> tuple[str, str] | None:
+        return self._database_links.get(link_name)
+
+    def get_database_links(self) -> dict[str, tuple[str, str]]:
+        return self._database_links
 
     def get_name(self) -> str:
         return self._catalog_id
@@ -1,6 +1,7 @@
 from .glue_catalog import GlueCatalog
 from .glue_database import GlueDatabase
 from .glue_table import GlueTable
+from .glue_name_index import GlueNameIndex
 
 from .aws_resource_exceptions import CatalogEntityAlreadyExistsException, CatalogEntityNotFoundException
 
@@ -14,10 +15,15 @@ class GlueDataCatalog():
 
     def __init__(self) -> None:
         self._catalogs : dict[str, GlueCatalog] = {}
+        # Cached ARNs of wildcard lookups, cleared whenever anything is added to the catalog, including databases and
+        # tables added directly to a GlueCatalog or GlueDatabase of this catalog.
+        self._arn_views : dict[tuple[str, str | None, str | None], list[str]] = {}
 
     def add_catalog(self, glue_catalog: GlueCatalog):
         if glue_catalog.get_catalog_id() not in self._catalogs:
             self._catalogs[glue_catalog.get_catalog_id()] = glue_catalog
+            glue_catalog.add_change_listener(self._arn_views.clear)
+            self._arn_views.clear()
         else:
             raise CatalogEntityAlreadyExistsException(f"Catalog {glue_catalog.get_catalog_id()} already exists")
 
@@ -36,11 +42,23 @@ class GlueDataCatalog():
             raise CatalogEntityNotFoundException(f"add_database: Catalog {database.get_catalog_id()} has not been registered yet.")
         self._catalogs[database.get_catalog_id()].add_database(database)
 
+    def add_database_link(self, catalog_id : str, link_name : str, target_catalog_id : str, target_database_name : str):
+        if catalog_id not in self._catalogs:
+            raise CatalogEntityNotFoundException(f"add_database_link: Catalog {catalog_id} has not been registered yet.")
+        self._catalogs[catalog_id].add_database_link(link_name, target_catalog_id, target_database_name)
+
     def get_database(self, catalog_id : str, database_name : str) -> GlueDatabase:
+        '''
+        Gets a database by name. If the name is a resource link, the database that it targets is returned.
+        '''
         catalog = self.get_catalog(catalog_id)
         if catalog is None:
             return None
         database = catalog.get_database(database_name)
+        if database is None and catalog.get_database_link(database_name) is not None:
+            target_catalog_id, target_database_name = catalog.get_database_link(database_name)
+            target_catalog = self.get_catalog(target_catalog_id)
+            database = target_catalog.get_database(target_database_name) if target_catalog is not None else None
         if database is None:
             logger.debug(f"get_database: Database {database_name} in Catalog {catalog_id} does not exist")
             return None
@@ -62,6 +80,16 @@ class GlueDataCatalog():
         return table
 
     def get_resources_by_wildcard(self, catalog_id : str, database_name : str | None = None, table_name : str | None = None) -> list[GlueCatalog] | list[GlueDatabase] | list[GlueTable]:
+        '''
+        Gets the catalogs, databases or tables matching the given names. The catalog id can be "*", and database and
+        table names can be glob patterns, where "*" matches any number of characters and "?" a single character.
+        '''
+        return list(self.iter_resources_by_wildcard(catalog_id, database_name, table_name))
+
+    def iter_resources_by_wildcard(self, catalog_id : str, database_name : str | None = None, table_name : str | None = None):
+        '''
+        Generator variant of get_resources_by_wildcard, which yields the resources without building lists of them.
+        '''
         catalogs : list[GlueCatalog] = []
         if catalog_id == "*":
             catalogs.extend(self.get_catalogs().values())
@@ -71,30 +99,49 @@ class GlueDataCatalog():
                 catalogs.append(catalog)
 
         if database_name is None:
-            return catalogs
+            yield from catalogs
+            return
 
-        databases : list[GlueDatabase] = []
         for catalog in catalogs:
+            databases : list[GlueDatabase] = []
             if database_name == "*":
                 databases.extend(self.get_catalog(catalog.get_catalog_id()).get_databases().values())
+            elif GlueNameIndex.is_pattern(database_name):
+                databases.extend(catalog.get_databases_matching(database_name))
             else:
                 database = self.get_database(catalog.get_catalog_id(), database_name)
                 if database is not None:
                     databases.append(database)
 
-        if table_name is None:
-            return databases
-
-        tables : list[GlueTable] = []
-        for database in databases:
-            if table_name == "*":
-                tables.extend(database.get_tables().values())
-            else:
-                table = database.get_table(table_name)
-                if table is not None:
-                    tables.append(table)
-
-        return tables
+            if table_name is None:
+                yield from databases
+                continue
+
+            for database in databases:
+                if table_name == "*":
+                    yield from database.get_tables().values()
+                elif GlueNameIndex.is_pattern(table_name):
+                    yield from database.get_tables_matching(table_name)
+                else:
+                    table = database.get_table(table_name)
+                    if table is not None:
+                        yield table
+
+    def get_arns_by_wildcard(self, catalog_id : str, database_name : str | None = None, table_name : str | None = None) -> list[str]:
+        '''
+        Gets the ARNs of the resources returned by get_resources_by_wildcard. The ARNs of lookups for whole catalogs
+        and databases, ie with no table name or a "*" table name, are cached until the catalog changes, so the
+        returned list must not be modified.
+        '''
+        if table_name not in (None, "*"):
+            return [resource.get_arn() for resource in self.iter_resources_by_wildcard(catalog_id, database_name, table_name)]
+
+        key = (catalog_id, database_name, table_name)
+        arns = self._arn_views.get(key)
+        if arns is None:
+            arns = [resource.get_arn() for resource in self.iter_resources_by_wildcard(catalog_id, database_name, table_name)]
+            self._arn_views[key] = arns
+        return arns
 
     def get_tables(self):
         return GlueDataCatalogTablesIterator(self)
@@ -1,7 +1,10 @@
 from .glue_table import GlueTable
+from .glue_name_index import GlueNameIndex
 from .aws_resource import AwsObject
 from .aws_resource_exceptions import CatalogEntityMismatchException, CatalogEntityAlreadyExistsException
 
+from typing import Callable
+
 class GlueDatabase(AwsObject):
     """
     Represents a Glue Database
@@ -13,6 +16,9 @@ class GlueDatabase(AwsObject):
         self._location = location
         self._catalog = catalog
         self._tables = {}
+        self._table_name_index : GlueNameIndex = GlueNameIndex()
+        # Called whenever a table is added, ie so a GlueDataCatalog can clear views of the database.
+        self._change_listeners : list[Callable[[], None]] = []
 
     def get_region(self) -> str:
         return self._region
@@ -32,6 +38,13 @@ class GlueDatabase(AwsObject):
     def get_tables(self) -> dict[str, GlueTable]:
         return self._tables
 
+    def get_tables_matching(self, pattern : str) -> list[GlueTable]:
+        '''
+        Gets the tables whose names match a glob pattern, where "*" matches any number of characters and "?"
+        matches a single character.
+        '''
+        return [self._tables[name] for name in self._table_name_index.get_names_matching(pattern)]
+
     def get_arn(self) -> str:
         return f"arn:aws:glue:{self._region}:{self._catalog}:database/{self._name}"
 
@@ -46,6 +59,18 @@ class GlueDatabase(AwsObject):
             raise CatalogEntityAlreadyExistsException(f"Table: {glueTable.get_name()} already exists in database: {self}")
 
         self._tables[glueTable.get_name()] = glueTable
+        self._table_name_index.add(glueTable.get_name())
+        self._notify_change_listeners()
+
+    def add_change_listener(self, listener : Callable[[], None]):
+        '''
+        Registers a function that is called whenever a table is added to this database.
+        '''
+        self._change_listeners.append(listener)
+
+    def _notify_change_listeners(self):
+        for listener in self._change_listeners:
+            listener()
 
     def __eq__(self, other):
         return isinstance(other, GlueDatabase) and self._region == other._region and self._catalog == other._catalog and self._name == other._name
@@ -0,0 +1,50 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+class GlueNameIndex:
+    '''
+    A sorted index of Glue database or table names, for looking up the names that match an IAM style glob
+    pattern, where "*" matches any number of characters and "?" matches a single character.
+
+    The names are kept sorted, so the names starting with the literal prefix of a pattern are found with a binary
+    search. Patterns of the form "prefix*" are answered from that range directly, other patterns are matched
+    against the names in that range only. Names are sorted again the first time the index is queried after a name
+    has been added, so adding many names is not quadratic.
+    '''
+
+    def __init__(self):
+        self._names : list[str] = []
+        self._sorted : bool = True
+
+    @staticmethod
+    def is_pattern(name : str | None) -> bool:
+        return name is not None and ("*" in name or "?" in name)
+
+    def add(self, name : str):
+        if self._names and self._sorted and name < self._names[-1]:
+            self._sorted = False
+        self._names.append(name)
+
+    def get_names_matching(self, pattern : str) -> list[str]:
+        if not self._sorted:
+            self._names.sort()
+            self._sorted = True
+
+        literal_prefix = re.split(r"[*?]", pattern, maxsplit=1)[0]
+        start = bisect_left(self._names, literal_prefix)
+        end = start
+        while end < len(self._names) and self._names[end].startswith(literal_prefix):
+            end += 1
+
+        if pattern == literal_prefix + "*":
+            return self._names[start:end]
+
+        regex = GlueNameIndex._compile(pattern)
+        return [name for name in self._names[start:end] if regex.fullmatch(name)]
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _compile(pattern : str) -> re.Pattern:
+        return re.compile("".join(".*" if character == "*" else "." if character == "?" else re.escape(character)
+                                  for character in pattern), re.DOTALL)
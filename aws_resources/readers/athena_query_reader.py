@@ -0,0 +1,119 @@
+import boto3
+import awswrangler as wr
+import pandas as pd
+import uuid
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+import logging
+logger = logging.getLogger(__name__)
+
+class AthenaQueryReader:
+    '''
+        Runs Athena queries and reads their results as pandas DataFrames. If a chunk size is set, the results are
+        read chunk_size rows at a time, so that only one chunk of a large result set is in memory at once.
+
+        By default the results are read from the CSV file Athena writes to s3_output, where every value is a string.
+        With unload_approach, the query is run as an UNLOAD to Parquet in s3_output instead, and the Parquet files are
+        read with their types, ie array columns are read as lists. This is faster for large results. The Parquet
+        files of each query are deleted once its results have been read, or have failed to read.
+
+        With arrow_results, the DataFrame columns are Arrow arrays rather than Python objects, so the results can be
+        converted to Arrow tables without copying them.
+    '''
+
+    def __init__(self, boto3Session : boto3.Session, workgroup : str, database : str, s3_output : str,
+                 chunk_size : int | None = None, unload_approach : bool = False, arrow_results : bool = False):
+        self._boto3Session = boto3Session
+        self._workgroup = workgroup
+        self._database = database
+        self._s3_output = s3_output
+        self._chunk_size = chunk_size
+        self._unload_approach = unload_approach
+        self._arrow_results = arrow_results
+        # The UNLOAD location of each started query, ie query execution id -> S3 prefix.
+        self._unload_locations : dict[str, str] = {}
+
+    def read_sql_query(self, sql : str):
+        '''
+            Runs the query and yields the results as DataFrames, of at most chunk_size rows each. Without a chunk
+            size, the whole result is yielded as a single DataFrame.
+        '''
+        yield from self.read_query_results(self.start_query(sql))
+
+    def start_query(self, sql : str) -> str:
+        '''
+            Starts the query without waiting for it to complete, and returns its query execution id. The results are
+            read with read_query_results, so several queries can run in Athena at the same time.
+        '''
+        unload_location = None
+        if self._unload_approach:
+            # Each query is unloaded to its own prefix, as UNLOAD requires an empty location.
+            unload_location = f"{self._s3_output.rstrip('/')}/unload/{uuid.uuid4()}/"
+            sql = f"UNLOAD ({sql}) TO '{unload_location}' WITH (format = 'PARQUET')"
+        logger.debug(f"Running query: {sql}")
+
+        try:
+            query_execution_id = wr.athena.start_query_execution(
+                    sql,
+                    database=self._database,
+                    s3_output=self._s3_output,
+                    workgroup=self._workgroup,
+                    boto3_session=self._boto3Session
+            )
+        except Exception as e:
+            logger.error(f"Was not able to run Athena Query with SQL: {sql} with error: {e}")
+            raise
+        if unload_location is not None:
+            self._unload_locations[query_execution_id] = unload_location
+        logger.info(f"Started Athena query {query_execution_id}.")
+        return query_execution_id
+
+    def stop_query(self, query_execution_id : str):
+        '''
+            Stops a query started with start_query. Reading its results then fails.
+        '''
+        logger.info(f"Stopping Athena query {query_execution_id}.")
+        wr.athena.stop_query_execution(query_execution_id, boto3_session=self._boto3Session)
+
+    def read_query_results(self, query_execution_id : str):
+        '''
+            Waits for a query started with start_query to complete, and yields its results as DataFrames, of at most
+            chunk_size rows each.
+        '''
+        try:
+            yield from self._read_query_results(query_execution_id)
+        finally:
+            unload_location = self._unload_locations.pop(query_execution_id, None)
+            if unload_location is not None:
+                self._delete_unload_location(unload_location)
+
+    def _read_query_results(self, query_execution_id : str):
+        try:
+            results = wr.athena.get_query_results(
+                    query_execution_id,
+                    boto3_session=self._boto3Session,
+                    chunksize=self._chunk_size,
+                    dtype_backend="pyarrow" if self._arrow_results else "numpy_nullable"
+            )
+        except Exception as e:
+            logger.error(f"Athena query {query_execution_id} failed with error: {e}")
+            raise
+
+        if isinstance(results, pd.DataFrame):
+            yield results
+            return
+
+        row_count = 0
+        for chunk_number, results_df in enumerate(results, start=1):
+            row_count += len(results_df)
+            logger.debug(f"Read chunk {chunk_number} of Athena query results. Rows read so far: {row_count}")
+            yield results_df
+        logger.info(f"Read {row_count} rows of Athena query results in chunks of {self._chunk_size} rows.")
+
+    def _delete_unload_location(self, unload_location : str):
+        try:
+            wr.s3.delete_objects(unload_location, boto3_session=self._boto3Session)
+            logger.debug(f"Deleted the unloaded query results in {unload_location}.")
+        except (BotoCoreError, ClientError, wr.exceptions.ServiceApiError) as e:
+            logger.warning(f"Unable to delete the unloaded query results in {unload_location}. They can be deleted manually: {e}")
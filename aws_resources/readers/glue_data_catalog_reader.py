@@ -1,10 +1,15 @@
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 import boto3
 
 from ..glue_data_catalog import GlueDataCatalog
 from ..glue_catalog import GlueCatalog
 from ..glue_database import GlueDatabase
 from ..glue_table import GlueTable
+from .glue_data_catalog_snapshot import GlueDataCatalogSnapshot
+from .glue_resource_filter import GlueResourceFilter
 
 logger = logging.getLogger(__name__)
 
@@ -17,53 +22,432 @@ class GlueDataCatalogReaderAPI:
             This module should be run as an LF admin.
     """
 
-    def __init__(self, boto3session : boto3.Session, aws_account_id : str):
+    TABLE_LOADER_GET_TABLES = "get_tables"
+    TABLE_LOADER_SEARCH_TABLES = "search_tables"
+    DEFAULT_TABLE_READ_CONCURRENCY = 1
+    DEFAULT_PARTITION_READ_CONCURRENCY = 8
+
+    _SEARCH_TABLES_PAGE_SIZE = 1000
+    # Changes are searched from a little before the watermark, in case the local clock is ahead of Glue's.
+    _SNAPSHOT_CLOCK_SKEW = timedelta(minutes=5)
+    # The lists of entries in these responses. Only the name, database and location of each entry are read.
+    _SLIM_RESPONSE_LISTS = { 'GetTables': 'TableList', 'SearchTables': 'TableList', 'GetPartitions': 'Partitions' }
+
+    def __init__(self, boto3session : boto3.Session, aws_account_id : str, slim_reads : bool = False,
+                 resourceFilter : GlueResourceFilter | None = None):
         self._glueClient = boto3session.client('glue')
         self._region = boto3session.region_name
         self._aws_account_id = aws_account_id
+        # Databases and tables that are filtered out are dropped before their tables are read.
+        self._resourceFilter = resourceFilter or GlueResourceFilter()
+
+        if slim_reads:
+            # GetTables' AttributesToGet cannot return the StorageDescriptor, so the full payload is still sent.
+            # Instead, everything but the name and location is dropped before botocore parses the response.
+            for operation_name in GlueDataCatalogReaderAPI._SLIM_RESPONSE_LISTS:
+                self._glueClient.meta.events.register(f'before-parse.glue.{operation_name}', GlueDataCatalogReaderAPI._slim_response)
+
+    @staticmethod
+    def _slim_response(operation_model, response_dict, customized_response_dict, **kwargs):
+        '''
+            Parses GetTables, SearchTables and GetPartitions responses into slim records that only have the Name,
+            DatabaseName, CatalogId, the StorageDescriptor's Location and the NextToken. The body is replaced with an empty document, so botocore
+            does not walk the columns, parameters and serde info of every entry. Errors are parsed as usual.
+        '''
+        if response_dict['status_code'] >= 300 or not response_dict['body']:
+            return
+
+        body = json.loads(response_dict['body'])
+        records = []
+        for entry in body.get(GlueDataCatalogReaderAPI._SLIM_RESPONSE_LISTS[operation_model.name], []):
+            record = { key: entry[key] for key in ('Name', 'DatabaseName', 'CatalogId') if key in entry }
+            if 'Location' in entry.get('StorageDescriptor', {}):
+                record['StorageDescriptor'] = { 'Location': entry['StorageDescriptor']['Location'] }
+            records.append(record)
+
+        customized_response_dict[GlueDataCatalogReaderAPI._SLIM_RESPONSE_LISTS[operation_model.name]] = records
+        if 'NextToken' in body:
+            customized_response_dict['NextToken'] = body['NextToken']
+        response_dict['body'] = b'{}'
 
-    def read_catalog(self) -> GlueDataCatalog:
+    def read_catalog(self, max_workers : int = DEFAULT_TABLE_READ_CONCURRENCY,
+                     table_loader : str = TABLE_LOADER_GET_TABLES, catalog_id : str | None = None) -> GlueDataCatalog:
         '''
             This function will iterate through the GDC and output all resources with their S3 locations
             so that it can be fed into an algorithm that will create data location permissions, etc
+
+            All databases are read first. With the get_tables loader, the tables of up to max_workers databases are
+            then read concurrently, and are added to the GlueDataCatalog from the calling thread only as each
+            database completes. The search_tables loader instead pages through the tables of all databases at once,
+            which needs far fewer calls when there are many small databases.
+
+            If catalog_id is set, only that catalog is read. Otherwise the catalogs are discovered from the
+            databases that are shared with this account. Databases and tables that the reader's GlueResourceFilter
+            filters out are dropped as they are listed, so the tables of filtered out databases are never read.
         '''
+        if table_loader not in (GlueDataCatalogReaderAPI.TABLE_LOADER_GET_TABLES, GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES):
+            raise ValueError(f"Unknown table loader {table_loader}")
+
         glueDataCatalog = GlueDataCatalog()
+        glueDatabases = self.read_databases(glueDataCatalog, catalog_id)
+
+        if table_loader == GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES:
+            glueTables = self._search_tables(catalog_id=catalog_id)
+            if glueTables is not None:
+                self._add_searched_tables(glueDataCatalog, glueTables)
+                return glueDataCatalog
+
+        for glueTables in self.read_tables(glueDatabases, max_workers):
+            self._add_tables(glueDataCatalog, glueTables)
+
+        return glueDataCatalog
+
+    def read_tables(self, glueDatabases : list[GlueDatabase], max_workers : int = DEFAULT_TABLE_READ_CONCURRENCY):
+        '''
+            Reads the tables of the given databases, up to max_workers databases at a time. Yields the list of
+            tables of each database as it completes, so that the caller can add them to a catalog from its thread.
+        '''
+        if max_workers <= 1:
+            for glueDatabase in glueDatabases:
+                yield self._read_tables(glueDatabase)
+            return
+
+        logger.info(f"Reading tables for {len(glueDatabases)} databases using {max_workers} workers.")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._read_tables, glueDatabase) for glueDatabase in glueDatabases]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def refresh_catalog(self, snapshot : GlueDataCatalogSnapshot, max_workers : int = DEFAULT_TABLE_READ_CONCURRENCY,
+                        table_loader : str = TABLE_LOADER_GET_TABLES) -> GlueDataCatalog:
+        '''
+            Reads the catalog using a local snapshot, and saves the refreshed catalog back into the snapshot. If the
+            snapshot is empty, the whole catalog is read. Otherwise only the tables that were created or updated
+            since the snapshot's watermark are read, and deleted tables are found by listing only the names of the
+            tables in each database. Databases are always read, as there are few of them, and databases that are new
+            since the snapshot are read in full.
+        '''
+        refresh_time = datetime.now(timezone.utc)
+        watermark = snapshot.get_watermark()
+        changedTables = None
+        if watermark is not None:
+            changedTables = self._search_changed_tables(watermark - GlueDataCatalogReaderAPI._SNAPSHOT_CLOCK_SKEW)
+
+        if changedTables is None:
+            logger.info("Reading the whole Glue Data Catalog into the snapshot.")
+            glueDataCatalog = self.read_catalog(max_workers, table_loader)
+            snapshot.save(glueDataCatalog, refresh_time)
+            return glueDataCatalog
+
+        logger.info(f"Refreshing Glue Data Catalog snapshot from {watermark}. {len(changedTables)} tables were created or updated.")
+        previousCatalog = snapshot.load()
+        glueDataCatalog = GlueDataCatalog()
+        glueDatabases = self.read_databases(glueDataCatalog)
+
+        def refresh_tables(glueDatabase : GlueDatabase) -> list[GlueTable]:
+            return self._refresh_tables(glueDatabase, previousCatalog.get_database(glueDatabase.get_catalog_id(), glueDatabase.get_name()),
+                                        changedTables)
+
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            futures = [executor.submit(refresh_tables, glueDatabase) for glueDatabase in glueDatabases]
+            for future in as_completed(futures):
+                self._add_tables(glueDataCatalog, future.result())
+
+        previous_table_count = sum(1 for _ in previousCatalog.get_tables())
+        table_count = sum(1 for _ in glueDataCatalog.get_tables())
+        logger.info(f"Refreshed Glue Data Catalog snapshot. Tables before: {previous_table_count}, tables after: {table_count}.")
+        snapshot.save(glueDataCatalog, refresh_time)
+        return glueDataCatalog
+
+    def _refresh_tables(self, glueDatabase : GlueDatabase, previousDatabase : GlueDatabase | None,
+                        changedTables : dict[tuple[str, str, str], GlueTable]) -> list[GlueTable]:
+        if previousDatabase is None:
+            return self._read_tables(glueDatabase)
+
+        glueTables : list[GlueTable] = []
+        for table_name in self._read_table_names(glueDatabase):
+            glueTable = changedTables.get((glueDatabase.get_catalog_id(), glueDatabase.get_name(), table_name))
+            if glueTable is None:
+                glueTable = previousDatabase.get_table(table_name)
+            if glueTable is None:
+                # The table is new, but was not found by the search, so read it directly.
+                glueTable = self.read_table(glueDatabase, table_name)
+            if glueTable is not None:
+                glueTables.append(glueTable)
+        return glueTables
+
+    def _search_changed_tables(self, since : datetime) -> dict[tuple[str, str, str], GlueTable] | None:
+        '''
+            Searches for the tables that were created or updated after the given time. Returns None if the tables
+            could not be searched.
+        '''
+        changedTables : dict[tuple[str, str, str], GlueTable] = {}
+        for time_field in ('CreateTime', 'UpdateTime'):
+            glueTables = self._search_tables([{ 'Key': time_field, 'Value': since.strftime('%Y-%m-%dT%H:%M:%SZ'), 'Comparator': 'GREATER_THAN' }])
+            if glueTables is None:
+                return None
+            for glueTable in glueTables:
+                changedTables[(glueTable.get_catalog_id(), glueTable.get_database(), glueTable.get_name())] = glueTable
+        return changedTables
+
+    def _read_table_names(self, glueDatabase : GlueDatabase) -> list[str]:
+        table_names : list[str] = []
+        try:
+            table_paginator = self._glueClient.get_paginator('get_tables')
+            for table_page in table_paginator.paginate(CatalogId=glueDatabase.get_catalog_id(), DatabaseName=glueDatabase.get_name(),
+                                                       AttributesToGet=['NAME']):
+                table_names.extend(table['Name'] for table in table_page['TableList'] if self._resourceFilter.is_table_included(table['Name']))
+
+        except self._glueClient.exceptions.AccessDeniedException as e:
+            logger.warning(f'Database {glueDatabase} was not accessible: {e}')
+        except self._glueClient.exceptions.EntityNotFoundException as e:
+            logger.warning(f'Database {glueDatabase} was not found: {e}')
+
+        return table_names
 
+    def read_table(self, glueDatabase : GlueDatabase, table_name : str) -> GlueTable | None:
+        try:
+            table = self._glueClient.get_table(CatalogId=glueDatabase.get_catalog_id(), DatabaseName=glueDatabase.get_name(), Name=table_name)['Table']
+        except self._glueClient.exceptions.AccessDeniedException as e:
+            logger.warning(f'Table {table_name} in database {glueDatabase} was not accessible: {e}')
+            return None
+        except self._glueClient.exceptions.EntityNotFoundException as e:
+            logger.warning(f'Table {table_name} in database {glueDatabase} was not found: {e}')
+            return None
+
+        if not self._resourceFilter.is_table_included(table_name):
+            logger.debug(f'Table {table_name} in database {glueDatabase} is filtered out.')
+            return None
+
+        return GlueTable(self._region, glueDatabase.get_catalog_id(), glueDatabase.get_name(), table_name,
+                         table.get('StorageDescriptor', {}).get('Location'))
+
+    def read_database(self, catalog_id : str, database_name : str) -> GlueDatabase | None:
+        if not self._resourceFilter.is_database_included(database_name):
+            logger.debug(f'Database {database_name} in catalog {catalog_id} is filtered out.')
+            return None
+        return self._read_database(catalog_id, database_name)
+
+    def _read_database(self, catalog_id : str, database_name : str) -> GlueDatabase | None:
+        try:
+            db = self._glueClient.get_database(CatalogId=catalog_id, Name=database_name)['Database']
+        except self._glueClient.exceptions.AccessDeniedException as e:
+            logger.warning(f'Database {database_name} in catalog {catalog_id} was not accessible: {e}')
+            return None
+        except self._glueClient.exceptions.EntityNotFoundException as e:
+            logger.debug(f'Database {database_name} in catalog {catalog_id} was not found: {e}')
+            return None
+
+        if 'TargetDatabase' in db:
+            # A resource link, so return the database that it targets if it can be read.
+            target = db['TargetDatabase']
+            glueDatabase = self._read_database(target.get('CatalogId', catalog_id), target['DatabaseName'])
+            if glueDatabase is not None:
+                return glueDatabase
+
+        return GlueDatabase(self._region, db.get('CatalogId', catalog_id), db["Name"], db.get('Location', None))
+
+    def read_databases(self, glueDataCatalog : GlueDataCatalog, catalog_id : str | None = None) -> list[GlueDatabase]:
+        '''
+            Reads the databases into the GlueDataCatalog, and returns the databases whose tables need to be read.
+            Resource links are added as links to their target database, so that the tables of a database are only
+            read once however many links there are to it. If a link's target is not returned by get_databases and
+            cannot be read directly, the link is read as a database, as before.
+        '''
+        glueDatabases : list[GlueDatabase] = []
+        # (catalog id, link name, link location, target catalog id, target database name)
+        links : list[tuple[str, str, str | None, str, str]] = []
         db_paginator = self._glueClient.get_paginator('get_databases')
-        table_paginator = self._glueClient.get_paginator('get_tables')
+        paginate_args = { 'ResourceShareType': 'ALL' } if catalog_id is None else { 'CatalogId': catalog_id }
         #----------------------------------------------------------------------------------------
         #                         Paginate through the entire GDC and output their locations
         #----------------------------------------------------------------------------------------
-        for db_page in db_paginator.paginate(ResourceShareType='ALL'):
+        filtered_count = 0
+        for db_page in db_paginator.paginate(**paginate_args):
             for db in db_page['DatabaseList']:
-                catalog_id = db.get('CatalogId', self._aws_account_id)
+                db_catalog_id = db.get('CatalogId', catalog_id or self._aws_account_id)
+                if not self._resourceFilter.is_database_included(db["Name"]):
+                    filtered_count += 1
+                    continue
+
+                if glueDataCatalog.get_catalog(db_catalog_id) is None:
+                    glueDataCatalog.add_catalog(GlueCatalog(self._region, db_catalog_id))
 
-                glueCatalog = None
-                if glueDataCatalog.get_catalog(catalog_id) is None:
-                    glueCatalog = GlueCatalog(self._region, catalog_id)
-                    glueDataCatalog.add_catalog(glueCatalog)
-                else:
-                    glueCatalog = glueDataCatalog.get_catalog(catalog_id)
+                if 'TargetDatabase' in db:
+                    target = db['TargetDatabase']
+                    links.append((db_catalog_id, db["Name"], db.get('Location', None), target.get('CatalogId', db_catalog_id), target['DatabaseName']))
+                    continue
 
-                glueDatabase = GlueDatabase(self._region, catalog_id, db["Name"], db.get('Location', None))
+                glueDatabase = GlueDatabase(self._region, db_catalog_id, db["Name"], db.get('Location', None))
                 glueDataCatalog.add_database(glueDatabase)
+                glueDatabases.append(glueDatabase)
 
-                #Iterate through the tables in the database and output table data
-                #TODO: Change this with GetAttributesToGet to make this much faster. Location will need
-                # to be added to the API.
-                try:
-                    for table_page in table_paginator.paginate(CatalogId=catalog_id, DatabaseName=db["Name"]):
-                        for table in table_page['TableList']:
-                            tbl_location = None
-                            if 'StorageDescriptor' in table and 'Location' in table['StorageDescriptor']:
-                                tbl_location = table["StorageDescriptor"]["Location"]
+        for link_catalog_id, link_name, link_location, target_catalog_id, target_database_name in links:
+            targetCatalog = glueDataCatalog.get_catalog(target_catalog_id)
+            if targetCatalog is None or targetCatalog.get_database(target_database_name) is None:
+                targetDatabase = self._read_database(target_catalog_id, target_database_name)
+                if targetDatabase is None or targetDatabase.get_catalog_id() != target_catalog_id \
+                        or targetDatabase.get_name() != target_database_name:
+                    logger.debug(f'Target of resource link {link_name} in catalog {link_catalog_id} could not be read. Reading the link as a database.')
+                    glueDatabase = GlueDatabase(self._region, link_catalog_id, link_name, link_location)
+                    glueDataCatalog.add_database(glueDatabase)
+                    glueDatabases.append(glueDatabase)
+                    continue
 
-                            glueTable = GlueTable(self._region, catalog_id, glueDatabase.get_name(), table['Name'], tbl_location)
-                            glueDataCatalog.add_table(glueTable)
+                if targetCatalog is None:
+                    glueDataCatalog.add_catalog(GlueCatalog(self._region, target_catalog_id))
+                glueDataCatalog.add_database(targetDatabase)
+                glueDatabases.append(targetDatabase)
 
-                except self._glueClient.exceptions.AccessDeniedException as e:
-                    logger.warning(f'Database {db} was not accessible: {e}')
-                except self._glueClient.exceptions.EntityNotFoundException as e:
-                    logger.warning(f'Database {db} was not found: {e}')
+            glueDataCatalog.add_database_link(link_catalog_id, link_name, target_catalog_id, target_database_name)
 
-        return glueDataCatalog
+        if links:
+            logger.info(f"Read {len(glueDatabases)} databases and {len(links)} resource links.")
+        if filtered_count:
+            logger.info(f"Filtered out {filtered_count} databases with {self._resourceFilter}.")
+        return glueDatabases
+
+    def _read_tables(self, glueDatabase : GlueDatabase) -> list[GlueTable]:
+        '''
+            Reads the tables of a single database. This is called from worker threads, so it must not modify
+            the GlueDataCatalog.
+        '''
+        glueTables : list[GlueTable] = []
+        catalog_id = glueDatabase.get_catalog_id()
+        #Iterate through the tables in the database and output table data. AttributesToGet cannot return the
+        # location, so use slim_reads to avoid parsing the full table definitions.
+        try:
+            table_paginator = self._glueClient.get_paginator('get_tables')
+            for table_page in table_paginator.paginate(CatalogId=catalog_id, DatabaseName=glueDatabase.get_name()):
+                for table in table_page['TableList']:
+                    if not self._resourceFilter.is_table_included(table['Name']):
+                        continue
+                    tbl_location = None
+                    if 'StorageDescriptor' in table and 'Location' in table['StorageDescriptor']:
+                        tbl_location = table["StorageDescriptor"]["Location"]
+
+                    glueTables.append(GlueTable(self._region, catalog_id, glueDatabase.get_name(), table['Name'], tbl_location))
+
+        except self._glueClient.exceptions.AccessDeniedException as e:
+            logger.warning(f'Database {glueDatabase} was not accessible: {e}')
+        except self._glueClient.exceptions.EntityNotFoundException as e:
+            logger.warning(f'Database {glueDatabase} was not found: {e}')
+
+        return glueTables
+
+    def _search_tables(self, filters : list[dict[str, str]] | None = None, catalog_id : str | None = None) -> list[GlueTable] | None:
+        '''
+            Reads the tables of all databases with search_tables. Returns None if the tables could not be searched,
+            so that the tables can be read per database instead.
+        '''
+        glueTables : list[GlueTable] = []
+        search_args = { 'MaxResults': GlueDataCatalogReaderAPI._SEARCH_TABLES_PAGE_SIZE }
+        if catalog_id is None:
+            search_args['ResourceShareType'] = 'ALL'
+        else:
+            search_args['CatalogId'] = catalog_id
+        if filters:
+            search_args['Filters'] = filters
+        try:
+            while True:
+                table_page = self._glueClient.search_tables(**search_args)
+                for table in table_page['TableList']:
+                    # Tables of databases that were filtered out are dropped when they are added, as their database was not read.
+                    if not self._resourceFilter.is_table_included(table['Name']):
+                        continue
+                    tbl_location = None
+                    if 'StorageDescriptor' in table and 'Location' in table['StorageDescriptor']:
+                        tbl_location = table["StorageDescriptor"]["Location"]
+
+                    glueTables.append(GlueTable(self._region, table.get('CatalogId', catalog_id or self._aws_account_id), table['DatabaseName'],
+                                                table['Name'], tbl_location))
+
+                if not table_page.get('NextToken'):
+                    break
+                search_args['NextToken'] = table_page['NextToken']
+
+        except self._glueClient.exceptions.AccessDeniedException as e:
+            logger.warning(f'Unable to search tables, reading tables per database instead: {e}')
+            return None
+
+        return glueTables
+
+    def _add_searched_tables(self, glueDataCatalog : GlueDataCatalog, glueTables : list[GlueTable]):
+        for glueTable in glueTables:
+            # Tables can be returned for databases that get_databases did not return, ie databases that are not accessible,
+            # and through resource links, whose target database's tables are read directly.
+            glueCatalog = glueDataCatalog.get_catalog(glueTable.get_catalog_id())
+            if glueCatalog is None or glueCatalog.get_database(glueTable.get_database()) is None:
+                logger.debug(f'Database of table {glueTable} was not read. Ignoring.')
+                continue
+            glueDataCatalog.add_table(glueTable)
+
+    def _add_tables(self, glueDataCatalog : GlueDataCatalog, glueTables : list[GlueTable]):
+        for glueTable in glueTables:
+            glueDataCatalog.add_table(glueTable)
+
+    def read_partition_locations(self, glueDataCatalog : GlueDataCatalog,
+                                 max_workers : int = DEFAULT_PARTITION_READ_CONCURRENCY,
+                                 catalog_id : str | None = None) -> dict[GlueTable, list[str]]:
+        '''
+            Reads the partitions of every table in the catalog and returns the S3 locations of partitions that are
+            stored outside of their table's location. Partitions under the table location are already covered by
+            the table, and partition locations that are under another partition location of the same table are
+            removed, so only the minimal set of prefixes are returned per table. If catalog_id is set, only the
+            tables of that catalog are read, ie when each catalog is read with its own session.
+        '''
+        tables = [table for table in glueDataCatalog.get_tables()
+                  if (catalog_id is None or table.get_catalog_id() == catalog_id) and self._normalize_s3_location(table.get_location()) is not None]
+        logger.info(f"Reading partition locations for {len(tables)} tables using {max_workers} workers.")
+
+        partition_locations : dict[GlueTable, list[str]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._read_table_partition_locations, table): table for table in tables}
+            for future in as_completed(futures):
+                locations = future.result()
+                if locations:
+                    partition_locations[futures[future]] = locations
+
+        logger.info(f"Found {sum(len(locations) for locations in partition_locations.values())} partition locations outside of their table locations for {len(partition_locations)} tables.")
+        return partition_locations
+
+    def _read_table_partition_locations(self, glueTable : GlueTable) -> list[str]:
+        # Both locations are compared as s3:// "directories", so a table at s3://bucket/table does not cover
+        # s3://bucket/table2/.
+        table_location = self._normalize_s3_location(glueTable.get_location())
+        locations : set[str] = set()
+        try:
+            partition_paginator = self._glueClient.get_paginator('get_partitions')
+            for partition_page in partition_paginator.paginate(CatalogId=glueTable.get_catalog_id(), DatabaseName=glueTable.get_database(),
+                                                               TableName=glueTable.get_name(), ExcludeColumnSchema=True):
+                for partition in partition_page['Partitions']:
+                    location = self._normalize_s3_location(partition.get('StorageDescriptor', {}).get('Location'))
+                    if location is not None and not location.startswith(table_location):
+                        locations.add(location)
+
+        except self._glueClient.exceptions.AccessDeniedException as e:
+            logger.warning(f'Partitions of table {glueTable} were not accessible: {e}')
+        except self._glueClient.exceptions.EntityNotFoundException as e:
+            logger.warning(f'Table {glueTable} was not found while reading partitions: {e}')
+
+        # Remove any locations that are under another partition location, as they are already covered.
+        prefixes : list[str] = []
+        for location in sorted(locations):
+            if not prefixes or not location.startswith(prefixes[-1]):
+                prefixes.append(location)
+        return prefixes
+
+    @staticmethod
+    def _normalize_s3_location(location : str | None) -> str | None:
+        '''
+            Returns the location as an s3:// path ending with a "/", or None if it is not an S3 location.
+        '''
+        if location is None:
+            return None
+        if location.startswith("s3a://"):
+            location = "s3://" + location[6:]
+        if not location.startswith("s3://"):
+            return None
+        if not location.endswith("/"):
+            location += "/"
+        return location
@@ -0,0 +1,75 @@
+import logging
+import sqlite3
+from datetime import datetime
+
+from ..glue_data_catalog import GlueDataCatalog
+from ..glue_catalog import GlueCatalog
+from ..glue_database import GlueDatabase
+from ..glue_table import GlueTable
+
+logger = logging.getLogger(__name__)
+
+class GlueDataCatalogSnapshot:
+    """
+        A local SQLite snapshot of a GlueDataCatalog, so that later runs can refresh only what has changed in the
+        Glue Data Catalog instead of reading it again. The watermark is the time the snapshot was last refreshed from.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS catalogs (catalog_id TEXT PRIMARY KEY, region TEXT);
+        CREATE TABLE IF NOT EXISTS databases (catalog_id TEXT, name TEXT, location TEXT, PRIMARY KEY (catalog_id, name));
+        CREATE TABLE IF NOT EXISTS tables (catalog_id TEXT, database_name TEXT, name TEXT, location TEXT,
+                                           PRIMARY KEY (catalog_id, database_name, name));
+    """
+
+    def __init__(self, snapshot_file_path : str):
+        self._snapshot_file_path = snapshot_file_path
+        self._connection = sqlite3.connect(snapshot_file_path)
+        self._connection.executescript(GlueDataCatalogSnapshot._SCHEMA)
+
+    def get_watermark(self) -> datetime | None:
+        row = self._connection.execute("SELECT value FROM metadata WHERE key = 'watermark'").fetchone()
+        if row is None:
+            return None
+        return datetime.fromisoformat(row[0])
+
+    def load(self) -> GlueDataCatalog:
+        glueDataCatalog = GlueDataCatalog()
+        regions : dict[str, str] = {}
+        for catalog_id, region in self._connection.execute("SELECT catalog_id, region FROM catalogs"):
+            regions[catalog_id] = region
+            glueDataCatalog.add_catalog(GlueCatalog(region, catalog_id))
+        for catalog_id, name, location in self._connection.execute("SELECT catalog_id, name, location FROM databases"):
+            glueDataCatalog.add_database(GlueDatabase(regions[catalog_id], catalog_id, name, location))
+        for catalog_id, database_name, name, location in self._connection.execute(
+                "SELECT catalog_id, database_name, name, location FROM tables"):
+            glueDataCatalog.add_table(GlueTable(regions[catalog_id], catalog_id, database_name, name, location))
+
+        logger.info(f"Loaded Glue Data Catalog snapshot {self._snapshot_file_path} from {self.get_watermark()}.")
+        return glueDataCatalog
+
+    def save(self, glueDataCatalog : GlueDataCatalog, watermark : datetime):
+        '''
+            Replaces the snapshot with the given catalog in a single transaction, so that a failed save leaves
+            the previous snapshot in place.
+        '''
+        with self._connection:
+            for table_name in ("catalogs", "databases", "tables"):
+                self._connection.execute(f"DELETE FROM {table_name}")
+            self._connection.executemany("INSERT INTO catalogs VALUES (?, ?)",
+                                         ((catalog.get_catalog_id(), catalog.get_region())
+                                          for catalog in glueDataCatalog.get_catalogs().values()))
+            self._connection.executemany("INSERT INTO databases VALUES (?, ?, ?)",
+                                         ((database.get_catalog_id(), database.get_name(), database.get_location())
+                                          for catalog in glueDataCatalog.get_catalogs().values()
+                                          for database in catalog.get_databases().values()))
+            self._connection.executemany("INSERT INTO tables VALUES (?, ?, ?, ?)",
+                                         ((table.get_catalog_id(), table.get_database(), table.get_name(), table.get_location())
+                                          for table in glueDataCatalog.get_tables()))
+            self._connection.execute("INSERT OR REPLACE INTO metadata VALUES ('watermark', ?)", (watermark.isoformat(),))
+
+        logger.info(f"Saved Glue Data Catalog snapshot {self._snapshot_file_path} at {watermark}.")
+
+    def close(self):
+        self._connection.close()
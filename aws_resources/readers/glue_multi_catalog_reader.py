@@ -0,0 +1,88 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+from ..glue_data_catalog import GlueDataCatalog
+from .glue_data_catalog_reader import GlueDataCatalogReaderAPI
+
+logger = logging.getLogger(__name__)
+
+class GlueMultiCatalogReader:
+    """
+        Reads an explicit list of Glue Data Catalogs, ie the catalogs of several producer accounts, into a single
+        GlueDataCatalog. Each catalog is read with its own GlueDataCatalogReaderAPI, so each can use its own session
+        or assumed role. The readers are created by a factory on the catalog's worker, so assuming a role is part of
+        reading the catalog. Up to max_catalog_workers catalogs are read concurrently. A catalog that fails to load,
+        including when its reader cannot be created, is logged and left out, so one failing or slow account does not
+        hold up the others.
+    """
+
+    DEFAULT_CATALOG_READ_CONCURRENCY = 4
+
+    def __init__(self, catalogReaderFactories : dict[str, Callable[[], GlueDataCatalogReaderAPI]]):
+        self._catalogReaderFactories = catalogReaderFactories
+        self._load_times : dict[str, float] = {}
+        self._failed_catalogs : dict[str, Exception] = {}
+
+    def read_catalogs(self, max_catalog_workers : int = DEFAULT_CATALOG_READ_CONCURRENCY,
+                      max_workers : int = GlueDataCatalogReaderAPI.DEFAULT_TABLE_READ_CONCURRENCY,
+                      table_loader : str = GlueDataCatalogReaderAPI.TABLE_LOADER_GET_TABLES) -> GlueDataCatalog:
+        '''
+            Reads every catalog and merges them into one GlueDataCatalog. Each catalog is read into its own
+            GlueDataCatalog on a worker thread, and is merged from the calling thread as it completes.
+        '''
+        logger.info(f"Reading {len(self._catalogReaderFactories)} Glue Data Catalogs using {max_catalog_workers} workers.")
+        glueDataCatalog = GlueDataCatalog()
+        with ThreadPoolExecutor(max_workers=max(max_catalog_workers, 1)) as executor:
+            futures = { executor.submit(self._read_catalog, catalog_id, readerFactory, max_workers, table_loader): catalog_id
+                        for catalog_id, readerFactory in self._catalogReaderFactories.items() }
+            for future in as_completed(futures):
+                catalog_id = futures[future]
+                try:
+                    catalogToMerge = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to read Glue Data Catalog {catalog_id}. It will not be included: {e}")
+                    self._failed_catalogs[catalog_id] = e
+                    continue
+                self._merge_catalog(glueDataCatalog, catalogToMerge)
+
+        logger.info(f"Read {len(self._load_times)} Glue Data Catalogs. Failed: {sorted(self._failed_catalogs)}")
+        return glueDataCatalog
+
+    def get_load_times(self) -> dict[str, float]:
+        '''
+            The number of seconds it took to read each catalog that was read successfully.
+        '''
+        return self._load_times
+
+    def get_failed_catalogs(self) -> dict[str, Exception]:
+        return self._failed_catalogs
+
+    def _read_catalog(self, catalog_id : str, readerFactory : Callable[[], GlueDataCatalogReaderAPI], max_workers : int,
+                      table_loader : str) -> GlueDataCatalog:
+        start_time = time.monotonic()
+        catalogToMerge = readerFactory().read_catalog(max_workers, table_loader, catalog_id)
+        self._load_times[catalog_id] = time.monotonic() - start_time
+        logger.info(f"Read Glue Data Catalog {catalog_id} in {self._load_times[catalog_id]:.1f} seconds. "
+                    f"Databases: {sum(len(catalog.get_databases()) for catalog in catalogToMerge.get_catalogs().values())}, "
+                    f"tables: {sum(1 for _ in catalogToMerge.get_tables())}")
+        return catalogToMerge
+
+    def _merge_catalog(self, glueDataCatalog : GlueDataCatalog, catalogToMerge : GlueDataCatalog):
+        for glueCatalog in catalogToMerge.get_catalogs().values():
+            mergedCatalog = glueDataCatalog.get_catalog(glueCatalog.get_catalog_id())
+            if mergedCatalog is None:
+                glueDataCatalog.add_catalog(glueCatalog)
+                continue
+
+            # The catalog was also read from another catalog, ie as the target of a resource link, so only merge
+            # what has not been read already.
+            for glueDatabase in glueCatalog.get_databases().values():
+                if mergedCatalog.get_database(glueDatabase.get_name()) is None and mergedCatalog.get_database_link(glueDatabase.get_name()) is None:
+                    glueDataCatalog.add_database(glueDatabase)
+                else:
+                    logger.debug(f"Database {glueDatabase} was read more than once. Keeping the first one read.")
+            for link_name, (target_catalog_id, target_database_name) in glueCatalog.get_database_links().items():
+                if mergedCatalog.get_database(link_name) is None and mergedCatalog.get_database_link(link_name) is None:
+                    glueDataCatalog.add_database_link(glueCatalog.get_catalog_id(), link_name, target_catalog_id, target_database_name)
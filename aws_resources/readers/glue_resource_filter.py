@@ -0,0 +1,32 @@
+from fnmatch import fnmatchcase
+
+class GlueResourceFilter:
+    '''
+    Decides which databases and tables are read from the Glue Data Catalog, using include and exclude lists of
+    fnmatch style patterns, ie "sales_*" or "tmp_??". A name is included if it matches any include pattern, or
+    there are no include patterns, and it does not match any exclude pattern. Table patterns are matched against
+    the table name.
+    '''
+
+    def __init__(self, include_databases : list[str] | None = None, exclude_databases : list[str] | None = None,
+                 include_tables : list[str] | None = None, exclude_tables : list[str] | None = None):
+        self._include_databases = include_databases or []
+        self._exclude_databases = exclude_databases or []
+        self._include_tables = include_tables or []
+        self._exclude_tables = exclude_tables or []
+
+    def is_database_included(self, database_name : str) -> bool:
+        return GlueResourceFilter._is_included(database_name, self._include_databases, self._exclude_databases)
+
+    def is_table_included(self, table_name : str) -> bool:
+        return GlueResourceFilter._is_included(table_name, self._include_tables, self._exclude_tables)
+
+    @staticmethod
+    def _is_included(name : str, include_patterns : list[str], exclude_patterns : list[str]) -> bool:
+        if include_patterns and not any(fnmatchcase(name, pattern) for pattern in include_patterns):
+            return False
+        return not any(fnmatchcase(name, pattern) for pattern in exclude_patterns)
+
+    def __str__(self) -> str:
+        return f"GlueResourceFilter(include_databases={self._include_databases}, exclude_databases={self._exclude_databases}, " \
+               f"include_tables={self._include_tables}, exclude_tables={self._exclude_tables})"
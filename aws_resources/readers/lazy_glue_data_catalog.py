@@ -0,0 +1,135 @@
+from ..glue_data_catalog import GlueDataCatalog
+from ..glue_catalog import GlueCatalog
+from ..glue_database import GlueDatabase
+from ..glue_table import GlueTable
+from ..glue_name_index import GlueNameIndex
+from .glue_data_catalog_reader import GlueDataCatalogReaderAPI
+
+import logging
+logger = logging.getLogger(__name__)
+
+class LazyGlueDataCatalog(GlueDataCatalog):
+    '''
+        A GlueDataCatalog that reads databases and tables from Glue the first time they are accessed, instead of
+        reading the whole catalog up front. Everything that is read is cached, including resources that were not
+        found. When a wildcard needs every table of a database, the tables of all of the matching databases are read
+        in a batch. Iterating the catalog still reads all of it.
+    '''
+
+    def __init__(self, glueDataCatalogReader : GlueDataCatalogReaderAPI,
+                 max_workers : int = GlueDataCatalogReaderAPI.DEFAULT_TABLE_READ_CONCURRENCY):
+        super().__init__()
+        self._reader = glueDataCatalogReader
+        self._max_workers = max_workers
+        self._all_databases_read = False
+        self._databases_with_all_tables : set[tuple[str, str]] = set()
+        self._not_found : set[tuple[str, ...]] = set()
+
+    def get_catalog(self, catalog_id : str) -> GlueCatalog | None:
+        if catalog_id not in self._catalogs:
+            self._read_all_databases()
+        return super().get_catalog(catalog_id)
+
+    def get_catalogs(self) -> dict[str, GlueCatalog]:
+        self._read_all_databases()
+        return super().get_catalogs()
+
+    def get_database(self, catalog_id : str, database_name : str) -> GlueDatabase:
+        if self._find_database(catalog_id, database_name) is None and not self._all_databases_read \
+                and (catalog_id, database_name) not in self._not_found:
+            glueDatabase = self._reader.read_database(catalog_id, database_name)
+            if glueDatabase is None:
+                self._not_found.add((catalog_id, database_name))
+            else:
+                self._add_database_if_missing(glueDatabase)
+                if (glueDatabase.get_catalog_id(), glueDatabase.get_name()) != (catalog_id, database_name):
+                    # The database is a resource link, and the database that it targets was read.
+                    self._add_database_link_if_missing(catalog_id, database_name, glueDatabase.get_catalog_id(), glueDatabase.get_name())
+        return self._find_database(catalog_id, database_name)
+
+    def get_table(self, catalog_id : str, database_name : str, table_name : str) -> GlueTable:
+        glueDatabase = self.get_database(catalog_id, database_name)
+        if glueDatabase is None:
+            return None
+
+        key = (catalog_id, database_name, table_name)
+        if glueDatabase.get_table(table_name) is None and (catalog_id, database_name) not in self._databases_with_all_tables \
+                and key not in self._not_found:
+            glueTable = self._reader.read_table(glueDatabase, table_name)
+            if glueTable is None:
+                self._not_found.add(key)
+            else:
+                self.add_table(glueTable)
+        return glueDatabase.get_table(table_name)
+
+    def iter_resources_by_wildcard(self, catalog_id : str, database_name : str | None = None, table_name : str | None = None):
+        if catalog_id == "*" or GlueNameIndex.is_pattern(database_name):
+            self._read_all_databases()
+        elif database_name is not None and self.get_database(catalog_id, database_name) is None:
+            return
+
+        if GlueNameIndex.is_pattern(table_name):
+            self._read_all_tables(list(super().iter_resources_by_wildcard(catalog_id, database_name)))
+        elif table_name is not None:
+            for glueDatabase in list(super().iter_resources_by_wildcard(catalog_id, database_name)):
+                self.get_table(glueDatabase.get_catalog_id(), glueDatabase.get_name(), table_name)
+
+        yield from super().iter_resources_by_wildcard(catalog_id, database_name, table_name)
+
+    def get_tables(self):
+        self._read_all_tables(self.get_resources_by_wildcard("*", "*"))
+        return super().get_tables()
+
+    def __iter__(self):
+        self._read_all_tables(self.get_resources_by_wildcard("*", "*"))
+        return super().__iter__()
+
+    def _find_database(self, catalog_id : str, database_name : str) -> GlueDatabase | None:
+        glueCatalog = self._catalogs.get(catalog_id)
+        if glueCatalog is None:
+            return None
+        if glueCatalog.get_database_link(database_name) is not None:
+            catalog_id, database_name = glueCatalog.get_database_link(database_name)
+            glueCatalog = self._catalogs.get(catalog_id)
+            if glueCatalog is None:
+                return None
+        return glueCatalog.get_database(database_name)
+
+    def _add_database_if_missing(self, glueDatabase : GlueDatabase):
+        if glueDatabase.get_catalog_id() not in self._catalogs:
+            self.add_catalog(GlueCatalog(glueDatabase.get_region(), glueDatabase.get_catalog_id()))
+        if self._find_database(glueDatabase.get_catalog_id(), glueDatabase.get_name()) is None:
+            self.add_database(glueDatabase)
+
+    def _add_database_link_if_missing(self, catalog_id : str, link_name : str, target_catalog_id : str, target_database_name : str):
+        if catalog_id not in self._catalogs:
+            self.add_catalog(GlueCatalog(self._catalogs[target_catalog_id].get_region(), catalog_id))
+        glueCatalog = self._catalogs[catalog_id]
+        if glueCatalog.get_database(link_name) is None and glueCatalog.get_database_link(link_name) is None:
+            self.add_database_link(catalog_id, link_name, target_catalog_id, target_database_name)
+
+    def _read_all_databases(self):
+        if self._all_databases_read:
+            return
+
+        # Databases are read into a separate catalog, as some of them may have already been read individually.
+        readCatalog = GlueDataCatalog()
+        for glueDatabase in self._reader.read_databases(readCatalog):
+            self._add_database_if_missing(glueDatabase)
+        for glueCatalog in readCatalog.get_catalogs().values():
+            for link_name, (target_catalog_id, target_database_name) in glueCatalog.get_database_links().items():
+                self._add_database_link_if_missing(glueCatalog.get_catalog_id(), link_name, target_catalog_id, target_database_name)
+        self._all_databases_read = True
+
+    def _read_all_tables(self, glueDatabases : list[GlueDatabase]):
+        glueDatabases = [glueDatabase for glueDatabase in glueDatabases
+                         if (glueDatabase.get_catalog_id(), glueDatabase.get_name()) not in self._databases_with_all_tables]
+        if not glueDatabases:
+            return
+
+        logger.debug(f"Reading all tables of {len(glueDatabases)} databases.")
+        for glueTables in self._reader.read_tables(glueDatabases, self._max_workers):
+            for glueTable in glueTables:
+                if self._find_database(glueTable.get_catalog_id(), glueTable.get_database()).get_table(glueTable.get_name()) is None:
+                    self.add_table(glueTable)
+        self._databases_with_all_tables.update((glueDatabase.get_catalog_id(), glueDatabase.get_name()) for glueDatabase in glueDatabases)
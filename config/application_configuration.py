@@ -1,12 +1,22 @@
 
 
+import functools
+import json
+import os
 import boto3
 
 from aws_resources.glue_data_catalog import GlueDataCatalog
+from aws_resources.glue_table import GlueTable
 from aws_resources.readers.glue_data_catalog_reader import GlueDataCatalogReaderAPI
+from aws_resources.readers.glue_data_catalog_snapshot import GlueDataCatalogSnapshot
+from aws_resources.readers.glue_multi_catalog_reader import GlueMultiCatalogReader
+from aws_resources.readers.glue_resource_filter import GlueResourceFilter
+from aws_resources.readers.lazy_glue_data_catalog import LazyGlueDataCatalog
 from aws_resources.readers.iam_policy_reader import IamPolicyReader
 from aws_resources.readers.s3_bucket_policy_reader import S3BucketPolicyPolicyReader
 from config.boto3_factory import Boto3Factory
+from config.config_helper import ConfigHelper
+from lakeformation_utils.s3_location_index import S3LocationIndex
 from lakeformation_utils.s3_to_table_mapper import S3ToTableMapper
 
 import logging
@@ -17,6 +27,12 @@ class ApplicationConfiguration:
     This class is used to get configuration and other helper classes.
     '''
 
+    GLUE_DATA_CATALOG_SECTION = "glue_data_catalog"
+    # glue_data_catalog settings that only change how the catalog is read, not which tables and locations are read,
+    # so they are left out of the fingerprint of the S3 location index.
+    _S3_LOCATION_INDEX_IGNORED_SETTINGS = {"s3_location_index_file", "rebuild_s3_location_index", "table_loader", "read_concurrency",
+                                           "partition_read_concurrency", "catalog_read_concurrency", "lazy_loading"}
+
     def __init__(self, args : str, boto3_session : boto3.Session = None,
                  s3_bucket_policies : S3BucketPolicyPolicyReader = None,
                  glue_data_catalog : GlueDataCatalog = None,
@@ -31,6 +47,8 @@ class ApplicationConfiguration:
         self._iam_policy_reader = iam_policy_reader
         self._s3_to_table_translator = s3_to_table_translator
         self._account_id = account_id
+        # The sessions used to read each catalog in catalog_ids, ie with an assumed role in the catalog's account.
+        self._catalog_sessions : dict[str, boto3.Session] = {}
 
     def get_args(self) -> dict[str | dict]:
         return self._args
@@ -51,11 +69,72 @@ class ApplicationConfiguration:
     def get_glue_data_catalog(self) -> GlueDataCatalog:
         if self._glue_data_catalog is None:
             logger.info("Reading Glue Data Catalog.")
-            gdcReader = GlueDataCatalogReaderAPI(self.get_boto3_session(), self.get_account_id())
-            self._glue_data_catalog = gdcReader.read_catalog()
+            catalog_args = ConfigHelper.get_section(self._args, ApplicationConfiguration.GLUE_DATA_CATALOG_SECTION, {})
+            concurrency = ConfigHelper.get_config_int(catalog_args, "read_concurrency",
+                                                      GlueDataCatalogReaderAPI.DEFAULT_TABLE_READ_CONCURRENCY)
+            gdcReader = self._create_glue_data_catalog_reader(catalog_args, self.get_boto3_session(), self.get_account_id())
+            table_loader = ConfigHelper.get_config_string(catalog_args, "table_loader", GlueDataCatalogReaderAPI.TABLE_LOADER_GET_TABLES)
+            snapshot_file = ConfigHelper.get_config_string(catalog_args, "snapshot_file")
+            lazy_loading = ConfigHelper.get_config_boolean(catalog_args, "lazy_loading", False)
+            catalog_ids = ConfigHelper.get_config_list(catalog_args, "catalog_ids")
+
+            if catalog_ids and (lazy_loading or snapshot_file is not None):
+                logger.warning("lazy_loading and snapshot_file are ignored when catalog_ids is set.")
+            elif lazy_loading and snapshot_file is not None:
+                logger.warning("lazy_loading is ignored when a snapshot_file is set.")
+
+            if catalog_ids:
+                self._glue_data_catalog = self._read_glue_data_catalogs(catalog_args, catalog_ids, concurrency, table_loader)
+            elif snapshot_file is None and lazy_loading:
+                logger.info("Glue Data Catalog resources will be read as they are needed.")
+                self._glue_data_catalog = LazyGlueDataCatalog(gdcReader, concurrency)
+            elif snapshot_file is None:
+                self._glue_data_catalog = gdcReader.read_catalog(concurrency, table_loader)
+            else:
+                if ConfigHelper.get_config_boolean(catalog_args, "rebuild_snapshot", False) and os.path.exists(snapshot_file):
+                    os.remove(snapshot_file)
+                snapshot = GlueDataCatalogSnapshot(snapshot_file)
+                try:
+                    self._glue_data_catalog = gdcReader.refresh_catalog(snapshot, concurrency, table_loader)
+                finally:
+                    snapshot.close()
             logger.info("Completed Glue Data Catalog.")
         return self._glue_data_catalog
 
+    def _read_glue_data_catalogs(self, catalog_args : dict[str], catalog_ids : list[str],
+                                 concurrency : int, table_loader : str) -> GlueDataCatalog:
+        '''
+        Reads the listed catalogs concurrently into one GlueDataCatalog. If catalog_role_name is set, that role is
+        assumed in each catalog's account, other than this account, to read its catalog. The role is assumed on the
+        catalog's worker, so a slow or failing account only holds up, or leaves out, its own catalog.
+        '''
+        role_name = ConfigHelper.get_config_string(catalog_args, "catalog_role_name")
+        # Resolved before the workers start, so they do not create the default session concurrently.
+        self.get_boto3_session()
+        self.get_account_id()
+        catalog_concurrency = ConfigHelper.get_config_int(catalog_args, "catalog_read_concurrency",
+                                                          GlueMultiCatalogReader.DEFAULT_CATALOG_READ_CONCURRENCY)
+        readerFactories = {catalog_id: functools.partial(self._create_catalog_reader, catalog_args, catalog_id, role_name)
+                           for catalog_id in catalog_ids}
+        return GlueMultiCatalogReader(readerFactories).read_catalogs(catalog_concurrency, concurrency, table_loader)
+
+    def _create_catalog_reader(self, catalog_args : dict[str], catalog_id : str, role_name : str | None) -> GlueDataCatalogReaderAPI:
+        boto3_session = self.get_boto3_session()
+        if role_name is not None and catalog_id != self.get_account_id():
+            boto3_session = Boto3Factory.createAssumedRoleBoto3Session(boto3_session, f"arn:aws:iam::{catalog_id}:role/{role_name}",
+                                                                       "policy-migrator-glue-catalog-reader")
+        self._catalog_sessions[catalog_id] = boto3_session
+        return self._create_glue_data_catalog_reader(catalog_args, boto3_session, catalog_id)
+
+    def _create_glue_data_catalog_reader(self, catalog_args : dict[str], boto3_session : boto3.Session,
+                                         account_id : str) -> GlueDataCatalogReaderAPI:
+        resourceFilter = GlueResourceFilter(ConfigHelper.get_config_list(catalog_args, "include_databases"),
+                                            ConfigHelper.get_config_list(catalog_args, "exclude_databases"),
+                                            ConfigHelper.get_config_list(catalog_args, "include_tables"),
+                                            ConfigHelper.get_config_list(catalog_args, "exclude_tables"))
+        return GlueDataCatalogReaderAPI(boto3_session, account_id, ConfigHelper.get_config_boolean(catalog_args, "slim_reads", False),
+                                        resourceFilter)
+
     def get_account_id(self) -> str:
         if self._account_id is None:
             sts_client = self.get_boto3_session().client('sts')
@@ -67,7 +146,66 @@ class ApplicationConfiguration:
             self._iam_policy_reader = IamPolicyReader(self.get_boto3_session())
         return self._iam_policy_reader
 
-    def get_s3_to_table_translator(self) -> S3ToTableMapper:
+    def get_s3_to_table_translator(self) -> S3ToTableMapper | S3LocationIndex:
         if self._s3_to_table_translator is None:
-            self._s3_to_table_translator = S3ToTableMapper(self.get_glue_data_catalog())
+            catalog_args = ConfigHelper.get_section(self._args, ApplicationConfiguration.GLUE_DATA_CATALOG_SECTION, {})
+            index_file = ConfigHelper.get_config_string(catalog_args, "s3_location_index_file")
+            rebuild_index = ConfigHelper.get_config_boolean(catalog_args, "rebuild_s3_location_index", False) \
+                or (self._get_snapshot_file(catalog_args) is not None and ConfigHelper.get_config_boolean(catalog_args, "rebuild_snapshot", False))
+
+            if index_file is not None and not rebuild_index \
+                    and S3LocationIndex.matches_fingerprint(index_file, self._get_s3_location_index_fingerprint(catalog_args)):
+                logger.info(f"Reading S3 location index from {index_file}.")
+                self._s3_to_table_translator = S3LocationIndex(index_file)
+            else:
+                if index_file is not None and not rebuild_index and os.path.exists(index_file):
+                    logger.info(f"S3 location index {index_file} was built with other Glue Data Catalog settings or snapshot, rebuilding it.")
+                self._s3_to_table_translator = S3ToTableMapper(self.get_glue_data_catalog(), self._get_partition_locations(catalog_args))
+                if index_file is not None:
+                    # The fingerprint is taken after the catalog is read, as reading it refreshes the snapshot.
+                    S3LocationIndex.write(index_file, self._s3_to_table_translator, self._get_s3_location_index_fingerprint(catalog_args))
         return self._s3_to_table_translator
+
+    def _get_s3_location_index_fingerprint(self, catalog_args : dict[str]) -> str:
+        '''
+        Returns the glue_data_catalog settings that change the tables and locations that are read, and the watermark
+        of the snapshot, if one is used, so an index built from other settings or an older snapshot is not reused.
+        '''
+        settings = {key: value for key, value in catalog_args.items() if key not in ApplicationConfiguration._S3_LOCATION_INDEX_IGNORED_SETTINGS}
+        watermark = None
+        snapshot_file = self._get_snapshot_file(catalog_args)
+        if snapshot_file is not None and os.path.exists(snapshot_file):
+            snapshot = GlueDataCatalogSnapshot(snapshot_file)
+            try:
+                watermark = snapshot.get_watermark()
+            finally:
+                snapshot.close()
+        return json.dumps({"settings": settings, "snapshot_watermark": watermark.isoformat() if watermark is not None else None},
+                          sort_keys=True, default=str)
+
+    def _get_snapshot_file(self, catalog_args : dict[str]) -> str | None:
+        # The snapshot is not used when catalog_ids is set.
+        if ConfigHelper.get_config_list(catalog_args, "catalog_ids"):
+            return None
+        return ConfigHelper.get_config_string(catalog_args, "snapshot_file")
+
+    def _get_partition_locations(self, catalog_args : dict[str]) -> dict[GlueTable, list[str]] | None:
+        if not ConfigHelper.get_config_boolean(catalog_args, "index_partition_locations", False):
+            return None
+
+        concurrency = ConfigHelper.get_config_int(catalog_args, "partition_read_concurrency",
+                                                  GlueDataCatalogReaderAPI.DEFAULT_PARTITION_READ_CONCURRENCY)
+        logger.info("Reading Glue partition locations.")
+        glueDataCatalog = self.get_glue_data_catalog()
+        partition_locations : dict[GlueTable, list[str]] = {}
+        # Each catalog's partitions are read with the session its tables were read with, so catalogs in other accounts
+        # are read with the role assumed in that account. Other catalogs, ie targets of resource links, use the default
+        # session.
+        for catalog_id in glueDataCatalog.get_catalogs():
+            if catalog_id in self._catalog_sessions:
+                gdcReader = self._create_glue_data_catalog_reader(catalog_args, self._catalog_sessions[catalog_id], catalog_id)
+            else:
+                gdcReader = self._create_glue_data_catalog_reader(catalog_args, self.get_boto3_session(), self.get_account_id())
+            partition_locations.update(gdcReader.read_partition_locations(glueDataCatalog, concurrency, catalog_id))
+        logger.info("Completed Glue partition locations.")
+        return partition_locations
@@ -1,8 +1,24 @@
 
 import boto3
+import botocore.session
+from botocore.credentials import CredentialProvider, CredentialResolver, RefreshableCredentials
 
 from config.config_helper import ConfigHelper
 
+class _AssumedRoleCredentialProvider(CredentialProvider):
+    '''
+    Provides the refreshable credentials of an assumed role to a botocore session.
+    '''
+
+    METHOD = "sts-assume-role"
+
+    def __init__(self, credentials : RefreshableCredentials):
+        super().__init__()
+        self._credentials = credentials
+
+    def load(self) -> RefreshableCredentials:
+        return self._credentials
+
 class Boto3Factory:
     '''
     Factory class that creates Boto3 Sessions from Application Configuration
@@ -19,3 +35,28 @@ class Boto3Factory:
                                       aws_session_token=ConfigHelper.get_config_string(boto3configuration, "aws_session_token"),
                                       region_name=ConfigHelper.get_config_string(boto3configuration, "region_name"),
                                       profile_name=ConfigHelper.get_config_string(boto3configuration, "profile_name"))
+
+    @staticmethod
+    def createAssumedRoleBoto3Session(boto3_session : boto3.Session, role_arn : str, session_name : str) -> boto3.Session:
+        '''
+        Assumes a role using the given session, and returns a session with the role's credentials in the same region.
+        The role is assumed again before its credentials expire, so the session can be used for longer than the
+        role's maximum session duration. The role is assumed once before returning, so errors are raised here.
+        '''
+        sts_client = boto3_session.client('sts')
+
+        def assume_role() -> dict[str, str]:
+            credentials = sts_client.assume_role(RoleArn=role_arn, RoleSessionName=session_name)['Credentials']
+            return {"access_key": credentials['AccessKeyId'],
+                    "secret_key": credentials['SecretAccessKey'],
+                    "token": credentials['SessionToken'],
+                    "expiry_time": credentials['Expiration'].isoformat()}
+
+        credentials = RefreshableCredentials.create_from_metadata(metadata=assume_role(), refresh_using=assume_role,
+                                                                  method=_AssumedRoleCredentialProvider.METHOD)
+        # The session uses the same profile as the source session, so it keeps its configuration, ie retries and
+        # endpoints, and only its credentials are replaced. A source session without a profile reports "default".
+        profile_name = boto3_session.profile_name if boto3_session.profile_name in boto3_session.available_profiles else None
+        botocore_session = botocore.session.Session(profile=profile_name)
+        botocore_session.register_component('credential_provider', CredentialResolver([_AssumedRoleCredentialProvider(credentials)]))
+        return boto3.Session(botocore_session=botocore_session, region_name=boto3_session.region_name)
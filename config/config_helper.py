@@ -45,6 +45,30 @@ class ConfigHelper:
             return val.lower() in ['true', 'yes']
         return default
 
+    @staticmethod
+    def get_config_int(args : dict[str | dict], fieldname : str, default : int | None = None) -> int | None:
+        if fieldname in args:
+            val = args[fieldname]
+            if not isinstance(val, str):
+                raise ConfigException("Field " + fieldname + " is not an integer")
+            try:
+                return int(val)
+            except ValueError as e:
+                raise ConfigException("Field " + fieldname + " is not an integer") from e
+        return default
+
+    @staticmethod
+    def get_config_list(args : dict[str | dict], fieldname : str, default : list[str] | None = None) -> list[str] | None:
+        '''
+        Get a comma-separated or newline-separated list of values. Values are trimmed, and empty values are dropped.
+        '''
+        if fieldname in args:
+            val = args[fieldname]
+            if not isinstance(val, str):
+                raise ConfigException("Field " + fieldname + " is not a list")
+            return [item.strip() for part in val.split(",") for item in part.split("\n") if item.strip()]
+        return default
+
     @staticmethod
     def configure_logger(command_args : dict[str | dict], config_file_args : dict[str | dict]):
         '''
@@ -1,69 +1,230 @@
-from aws_resources.glue_catalog import GlueCatalog
+import math
+import logging
+
 from aws_resources.glue_data_catalog import GlueDataCatalog
 from aws_resources.glue_database import GlueDatabase
 from aws_resources.glue_table import GlueTable
+from .s3_tree import S3Tree
+from .tree_node import TreeNode
 
+logger = logging.getLogger(__name__)
 
 class LakeFormationS3DataLakeLocationGenerator:
     '''
     Given a Glue Data Catalog, this will generate Data Location's to be registered with LF.
+
+    All database and table locations are put into an S3Tree, and locations under another location are dropped.
+    The remaining locations are merged in sorted order: when the locations that follow a location are in the same
+    parent "directory", they are all replaced by that parent, and the parent is then checked against its own parent
+    the same way. Buckets are the highest level that is registered. This is computed in a single pass over the
+    sorted locations.
+
+    If a maximum number of locations is given, the locations are instead chosen to stay within that budget while
+    covering as little data outside of the catalog's locations as possible. Registering a "directory" above a
+    location also covers everything next to it, so the cost of registering a directory is the number of levels
+    that each location under it is widened by. The cheapest set of directories within the budget is found with
+    a dynamic program over the S3Tree.
     '''
 
-    def generate_data_lake_locations(self, glueDataCatalog : GlueDataCatalog) -> list[str]:
+    def generate_data_lake_locations(self, glueDataCatalog : GlueDataCatalog, max_locations : int | None = None) -> list[str]:
+        return sorted(self.generate_data_lake_location_coverage(glueDataCatalog, max_locations).keys())
+
+    def generate_data_lake_location_coverage(self, glueDataCatalog : GlueDataCatalog,
+                                             max_locations : int | None = None) -> dict[str, list[GlueTable]]:
+        '''
+        Generates the data lake locations to register, and the tables that each location covers. If max_locations
+        is set, no more than max_locations locations are returned. A ValueError is raised if the locations cannot
+        fit in the budget, ie there are more buckets than max_locations.
+        '''
         if glueDataCatalog is None:
             raise ValueError('glueDataCatalog cannot be None')
 
-        s3_locations = self._get_s3_locations_from_catalog(glueDataCatalog)
-        #sort s3_locations
-        s3_locations.sort()
+        s3_tree = self._get_s3_tree_from_catalog(glueDataCatalog)
+
+        if max_locations is None:
+            covering_nodes = self._get_covering_nodes(s3_tree)
+        else:
+            covering_nodes = self._get_covering_nodes_within_budget(s3_tree, max_locations)
+
+        coverage : dict[str, list[GlueTable]] = {}
+        for covering_node in covering_nodes:
+            if covering_node is None:
+                continue
+            tables = [value for value in s3_tree.get_all_values_from_node(covering_node) if isinstance(value, GlueTable)]
+            coverage[covering_node.get_path_to_self() + "/"] = sorted(tables)
+
+        return coverage
+
+    def _get_covering_nodes(self, s3_tree : S3Tree) -> list[TreeNode]:
+        # A node with a location covers everything below it, so only the topmost locations are merged.
+        locations = sorted(node.get_path_to_self() + "/" for node in self._get_topmost_location_nodes(s3_tree.get_root()))
 
-        #remove duplicates and remove subfolders
+        covering_locations = []
         i = 0
-        while i < len(s3_locations) - 1:
-            if s3_locations[i] == s3_locations[i+1] or s3_locations[i+1].startswith(s3_locations[i]):
-                s3_locations.pop(i+1)
+        while i < len(locations):
+            location = locations[i]
+            i += 1
+            while True:
+                parent = location[:location[:-1].rindex("/") + 1]
+                if parent == "s3://" or i == len(locations) or not locations[i].startswith(parent):
+                    break
+                # The following locations in the same parent are merged into it, and the parent is checked again.
+                location = parent
+                while i < len(locations) and locations[i].startswith(parent):
+                    i += 1
+            covering_locations.append(location)
+
+        return [s3_tree.get_node_from_path(location) for location in covering_locations]
+
+    def _get_topmost_location_nodes(self, node : TreeNode) -> list[TreeNode]:
+        nodes = []
+        pending = list(node.get_children())
+        while pending:
+            child = pending.pop()
+            if child.has_values():
+                nodes.append(child)
             else:
-                i += 1
+                pending.extend(child.get_children())
+        return nodes
 
-        i = 0
-        while i < len(s3_locations):
-            #remove trailing "/"
-            current_location = s3_locations[i][:-1]
-            current_location = current_location[:current_location.rindex("/")] + "/"
+    def _get_covering_nodes_within_budget(self, s3_tree : S3Tree, max_locations : int) -> list[TreeNode]:
+        if max_locations < 1:
+            raise ValueError('max_locations must be at least 1')
 
-            if current_location == 's3://':
-                i += 1
-                continue
+        # costs[node] = (cost of registering the node itself, costs[k - 1] = the lowest cost to cover the
+        # locations under the node with at most k locations)
+        costs : dict[TreeNode, tuple[int, list[float]]] = {}
+        bucket_nodes = [bucket_node for bucket_node in s3_tree.get_root().get_children()
+                        if self._compute_costs(bucket_node, max_locations, costs)[0] > 0]
+        if not bucket_nodes:
+            return []
 
-            j = i + 1
-            has_changes = False
-            while j < len(s3_locations):
-                if s3_locations[j].startswith(current_location):
-                    s3_locations.pop(j)
-                    s3_locations[i] = current_location
-                    has_changes = True
-                else:
+        if len(bucket_nodes) > max_locations:
+            raise ValueError(f"Cannot register data locations for {len(bucket_nodes)} buckets with a budget of {max_locations} locations.")
+
+        # The root is never registered, so every bucket needs at least one location.
+        covering_nodes : list[TreeNode] = []
+        bucket_costs = [costs[bucket_node][1] for bucket_node in bucket_nodes]
+        merged_costs = self._merge_costs(bucket_costs, max_locations)
+        budget = self._get_lowest_budget(merged_costs, len(merged_costs))
+        for bucket_node, bucket_budget in zip(bucket_nodes, self._split_budget(bucket_costs, budget, max_locations)):
+            self._select_covering_nodes(bucket_node, bucket_budget, max_locations, costs, covering_nodes)
+
+        logger.info(f"Selected {len(covering_nodes)} data locations within a budget of {max_locations} locations. Total levels widened: {merged_costs[budget - 1]}")
+        return covering_nodes
+
+    def _compute_costs(self, node : TreeNode, max_locations : int, costs : dict[TreeNode, tuple[int, list[float]]]) -> tuple[int, int]:
+        '''
+        Computes the costs for the node and its descendants. Returns the number of locations under the node
+        (not counting locations under other locations), and the cost of registering the node itself.
+        '''
+        if node.has_values():
+            costs[node] = (0, [0])
+            return 1, 0
+
+        location_count = 0
+        self_cost = 0
+        child_nodes = []
+        for child in node.get_children():
+            child_location_count, child_self_cost = self._compute_costs(child, max_locations, costs)
+            if child_location_count > 0:
+                child_nodes.append(child)
+                location_count += child_location_count
+                # Registering this node widens every location under the child by one more level.
+                self_cost += child_self_cost + child_location_count
+
+        if location_count == 0:
+            return 0, 0
+
+        node_costs = self._merge_costs([costs[child][1] for child in child_nodes], max_locations)
+        node_costs[0] = min(node_costs[0], self_cost)
+        for k in range(1, len(node_costs)):
+            node_costs[k] = min(node_costs[k], node_costs[k - 1])
+        costs[node] = (self_cost, node_costs)
+        return location_count, self_cost
+
+    def _merge_costs(self, child_costs : list[list[float]], max_locations : int) -> list[float]:
+        '''
+        Merges the costs of the children, where every child needs at least one location. The returned list is
+        merged[k - 1] = the lowest cost to cover all the children with exactly k locations.
+        '''
+        merged = list(child_costs[0])
+        for costs in child_costs[1:]:
+            next_merged = [math.inf] * min(len(merged) + len(costs), max_locations)
+            for i, merged_cost in enumerate(merged):
+                if merged_cost == math.inf:
+                    continue
+                for j, cost in enumerate(costs):
+                    if i + j + 1 >= len(next_merged):
+                        break
+                    next_merged[i + j + 1] = min(next_merged[i + j + 1], merged_cost + cost)
+            merged = next_merged
+        return merged
+
+    def _split_budget(self, child_costs : list[list[float]], budget : int, max_locations : int) -> list[int]:
+        '''
+        Splits the budget between the children so that the merged cost is the lowest. Walks back through the
+        partially merged costs to find how many locations each child was given.
+        '''
+        partial_merges = [list(child_costs[0])]
+        for costs in child_costs[1:]:
+            partial_merges.append(self._merge_costs([partial_merges[-1], costs], max_locations))
+
+        budgets = [0] * len(child_costs)
+        remaining = budget
+        for i in range(len(child_costs) - 1, 0, -1):
+            target = partial_merges[i][remaining - 1]
+            for k in range(1, len(child_costs[i]) + 1):
+                previous = remaining - k
+                if previous < 1 or previous > len(partial_merges[i - 1]):
+                    continue
+                if partial_merges[i - 1][previous - 1] + child_costs[i][k - 1] == target:
+                    budgets[i] = k
+                    remaining = previous
                     break
+        budgets[0] = remaining
+        return budgets
 
-            if not has_changes:
-                i = i + 1
+    def _select_covering_nodes(self, node : TreeNode, budget : int, max_locations : int,
+                               costs : dict[TreeNode, tuple[int, list[float]]], covering_nodes : list[TreeNode]):
+        self_cost, node_costs = costs[node]
+        budget = min(budget, len(node_costs))
+        if node.has_values() or node_costs[budget - 1] == self_cost:
+            covering_nodes.append(node)
+            return
 
-        return s3_locations
+        child_nodes = [child for child in node.get_children() if child in costs]
+        child_costs = [costs[child][1] for child in child_nodes]
+        merged_costs = self._merge_costs(child_costs, max_locations)
+        budget = self._get_lowest_budget(merged_costs, budget)
+        for child, child_budget in zip(child_nodes, self._split_budget(child_costs, budget, max_locations)):
+            self._select_covering_nodes(child, child_budget, max_locations, costs, covering_nodes)
 
+    def _get_lowest_budget(self, merged_costs : list[float], budget : int) -> int:
+        # The costs are for exactly k locations, so find the fewest locations that reach the lowest cost.
+        lowest_cost = min(merged_costs[:budget])
+        return merged_costs.index(lowest_cost) + 1
 
-    def _get_s3_locations_from_catalog(self, glueDataCatalog : GlueDataCatalog) -> list:
-        s3_locations = []
+    def _get_s3_tree_from_catalog(self, glueDataCatalog : GlueDataCatalog) -> S3Tree:
+        s3_tree = S3Tree()
         for item in glueDataCatalog:
-            if isinstance(item, GlueCatalog):
-                pass
             if isinstance(item, (GlueDatabase, GlueTable)):
-                if item.get_location() is not None:
-                    location = item.get_location()
-                    if item.get_location().startswith("s3a://"):
-                        location = "s3://" + location[5:]
-
-                    if location.startswith("s3://"):
-                        if not location.endswith("/"):
-                            location += "/"
-                        s3_locations.append(location)
-        return s3_locations
+                location = self._get_s3_location(item)
+                if location is not None:
+                    s3_tree.add_path(location, item)
+        return s3_tree
+
+    def _get_s3_location(self, item : GlueDatabase | GlueTable) -> str | None:
+        location = item.get_location()
+        if location is None:
+            return None
+
+        if location.startswith("s3a://"):
+            location = "s3://" + location[6:]
+
+        if not location.startswith("s3://"):
+            return None
+
+        if not location.endswith("/"):
+            location += "/"
+        return location
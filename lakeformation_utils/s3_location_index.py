@@ -0,0 +1,293 @@
+from aws_resources.glue_table import GlueTable
+from aws_resources.aws_arn_utils import AwsArnUtils
+from .s3_to_table_mapper import S3ToTableMapper
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+class S3LocationIndex:
+    '''
+    A read only, memory mapped version of S3ToTableMapper that is persisted to a file so that it can be
+    shared between processes and reused between runs without rebuilding it from the Glue Data Catalog.
+
+    The header holds a fingerprint of how the index was built, ie the Glue Data Catalog settings, so a caller can
+    tell whether an existing index still matches its configuration before reusing it.
+
+    File layout (all integers are little endian unsigned 32 bit):
+        header           : magic, SHA-256 of the fingerprint, string count, location entry count, table count
+        string offsets   : (string count + 1) offsets into the string blob
+        location entries : (string id of the location, table id), sorted by location
+        table records    : (region, catalog id, database, name, location) as string ids
+        string blob      : sorted, de-duplicated UTF-8 strings
+    '''
+
+    _MAGIC = b"LFS3IDX2"
+    _HEADER = struct.Struct("<8s32sIII")
+    _UINT32_SIZE = 4
+    _LOCATION_ENTRY_FIELDS = 2
+    _TABLE_RECORD_FIELDS = 5
+
+    def __init__(self, index_file_path : str):
+        if sys.byteorder != "little":
+            raise ValueError("S3LocationIndex is only supported on little endian platforms.")
+
+        with open(index_file_path, mode='rb') as index_file:
+            self._mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._string_offsets = self._location_entries = self._table_records = None
+
+        if len(self._buffer) < S3LocationIndex._HEADER.size:
+            self.close()
+            raise ValueError(f"{index_file_path} is not a valid S3 location index file.")
+        magic, _, string_count, location_count, table_count = S3LocationIndex._HEADER.unpack_from(self._buffer, 0)
+        if magic != S3LocationIndex._MAGIC:
+            self.close()
+            raise ValueError(f"{index_file_path} is not a valid S3 location index file.")
+
+        offset = S3LocationIndex._HEADER.size
+        self._string_offsets = self._cast(offset, string_count + 1)
+        offset += (string_count + 1) * S3LocationIndex._UINT32_SIZE
+        self._location_entries = self._cast(offset, location_count * S3LocationIndex._LOCATION_ENTRY_FIELDS)
+        offset += location_count * S3LocationIndex._LOCATION_ENTRY_FIELDS * S3LocationIndex._UINT32_SIZE
+        self._table_records = self._cast(offset, table_count * S3LocationIndex._TABLE_RECORD_FIELDS)
+        offset += table_count * S3LocationIndex._TABLE_RECORD_FIELDS * S3LocationIndex._UINT32_SIZE
+        self._strings_offset = offset
+
+        self._location_count = location_count
+        self._table_count = table_count
+        self._tables : dict[int, GlueTable] = {}
+
+        logger.debug(f"Opened S3 location index {index_file_path} with {location_count} locations and {table_count} tables.")
+
+    @staticmethod
+    def matches_fingerprint(index_file_path : str, fingerprint : str) -> bool:
+        '''
+        Returns whether the index file exists, is a valid index, and was written with the given fingerprint.
+        '''
+        try:
+            with open(index_file_path, mode='rb') as index_file:
+                header = index_file.read(S3LocationIndex._HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) < S3LocationIndex._HEADER.size:
+            return False
+        magic, fingerprint_hash, _, _, _ = S3LocationIndex._HEADER.unpack(header)
+        return magic == S3LocationIndex._MAGIC and fingerprint_hash == S3LocationIndex._hash_fingerprint(fingerprint)
+
+    @staticmethod
+    def write(index_file_path : str, s3_to_table_mapper : S3ToTableMapper, fingerprint : str = ""):
+        '''
+        Writes the locations from the S3ToTableMapper into an index file, with a fingerprint of how the mapper was
+        built. The file is written to a temporary file first and then moved, so that readers never see a partially
+        written index.
+        '''
+        table_ids : dict[GlueTable, int] = {}
+        locations : list[tuple[str, int]] = []
+        for location, table in s3_to_table_mapper.get_location_entries():
+            table_id = table_ids.setdefault(table, len(table_ids))
+            locations.append((location, table_id))
+
+        tables = list(table_ids)
+        strings = {location for location, _ in locations}
+        for table in tables:
+            strings.update((table.get_region(), table.get_catalog_id(), table.get_database(), table.get_name(), table.get_location()))
+
+        encoded_strings = sorted(string.encode("utf-8") for string in strings)
+        string_ids = {string.decode("utf-8"): string_id for string_id, string in enumerate(encoded_strings)}
+
+        string_offsets = [0]
+        for string in encoded_strings:
+            string_offsets.append(string_offsets[-1] + len(string))
+
+        location_entries = sorted((string_ids[location], table_id) for location, table_id in locations)
+
+        temp_file_path = index_file_path + ".tmp"
+        with open(temp_file_path, mode='wb') as index_file:
+            index_file.write(S3LocationIndex._HEADER.pack(S3LocationIndex._MAGIC, S3LocationIndex._hash_fingerprint(fingerprint),
+                                                          len(encoded_strings), len(location_entries), len(tables)))
+            index_file.write(struct.pack(f"<{len(string_offsets)}I", *string_offsets))
+            for string_id, table_id in location_entries:
+                index_file.write(struct.pack("<II", string_id, table_id))
+            for table in tables:
+                index_file.write(struct.pack("<5I", string_ids[table.get_region()], string_ids[table.get_catalog_id()],
+                                             string_ids[table.get_database()], string_ids[table.get_name()],
+                                             string_ids[table.get_location()]))
+            for string in encoded_strings:
+                index_file.write(string)
+        os.replace(temp_file_path, index_file_path)
+
+        logger.info(f"Wrote S3 location index {index_file_path} with {len(location_entries)} locations and {len(tables)} tables.")
+
+    def get_tables_from_s3_arn_postfix(self, s3_arn : str) -> list[GlueTable]:
+        '''
+        See S3ToTableMapper.get_tables_from_s3_arn_postfix
+        '''
+        s3_path = AwsArnUtils.get_s3_path_from_arn(s3_arn)
+        if not s3_path.endswith("/"):
+            s3_path += "/"
+        return self.get_tables_from_s3_location_postfix(s3_path)
+
+    def get_tables_from_s3_location_postfix(self, s3_path : str) -> list[GlueTable]:
+        '''
+        See S3ToTableMapper.get_tables_from_s3_location_postfix. The deepest "directory" of the path that
+        prefixes any indexed location is found, and the tables located exactly at it are returned.
+        '''
+        segments = self._get_path_segments(s3_path)
+        while segments:
+            prefix = ("s3://" + "/".join(segments) + "/").encode("utf-8")
+            position = self._lower_bound_location(prefix)
+            if position < self._location_count:
+                location = self._get_location(position)
+                if location == prefix:
+                    return self._get_tables_in_range(position, self._upper_bound_location(prefix))
+                if location.startswith(prefix):
+                    return []
+            segments.pop()
+        return []
+
+    def get_all_tables_from_s3_path_prefix(self, s3_path : str) -> list[GlueTable]:
+        '''
+        See S3ToTableMapper.get_all_tables_from_s3_path_prefix
+        '''
+        if s3_path.startswith("arn:"):
+            raise ValueError("This function does not take in ARNs. Call get_tables_from_s3_arn instead.")
+
+        segments = self._get_path_segments(s3_path)
+        if not segments:
+            return self.get_all_tables()
+
+        prefix = ("s3://" + "/".join(segments) + "/").encode("utf-8")
+        # All locations that start with "<prefix>/" sort between "<prefix>/" and "<prefix>0"
+        start = self._lower_bound_location(prefix)
+        end = self._lower_bound_location(prefix[:-1] + b"0")
+        return self._get_tables_in_range(start, end)
+
+    def get_all_tables_from_s3_arn_prefix(self, s3_arn : str) -> list[GlueTable]:
+        '''
+        See S3ToTableMapper.get_all_tables_from_s3_arn_prefix
+        '''
+        s3_path = AwsArnUtils.get_s3_path_from_arn(s3_arn)
+        if not s3_path.endswith("/"):
+            s3_path += "/"
+        return self.get_all_tables_from_s3_path_prefix(s3_path)
+
+    def get_all_tables_matching_s3_path_pattern(self, s3_pattern : str) -> list[GlueTable]:
+        '''
+        See S3ToTableMapper.get_all_tables_matching_s3_path_pattern. Only the locations that start with the
+        pattern's literal prefix are matched against it.
+        '''
+        if s3_pattern.startswith("arn:"):
+            raise ValueError("This function does not take in ARNs. Call get_all_tables_matching_s3_arn_pattern instead.")
+        if not s3_pattern.startswith("s3://"):
+            s3_pattern = "s3://" + s3_pattern
+
+        # A location is fully covered when it matches the pattern without its trailing "*"s, followed by anything.
+        stripped_pattern = s3_pattern.rstrip("*")
+        if stripped_pattern == s3_pattern:
+            return []
+        regex = re.compile("".join(".*" if character == "*" else "." if character == "?" else re.escape(character)
+                                   for character in stripped_pattern) + ".*", re.DOTALL)
+
+        literal_prefix = re.split(r"[*?]", stripped_pattern, maxsplit=1)[0].encode("utf-8")
+        start = self._lower_bound_location(literal_prefix)
+        table_ids : dict[int, None] = {}
+        for position in range(start, self._location_count):
+            location = self._get_location(position)
+            if not location.startswith(literal_prefix):
+                break
+            if regex.fullmatch(location.decode("utf-8")):
+                table_ids[self._location_entries[position * S3LocationIndex._LOCATION_ENTRY_FIELDS + 1]] = None
+        return [self._get_table(table_id) for table_id in table_ids]
+
+    def get_all_tables_matching_s3_arn_pattern(self, s3_arn : str) -> list[GlueTable]:
+        '''
+        See S3ToTableMapper.get_all_tables_matching_s3_arn_pattern
+        '''
+        return self.get_all_tables_matching_s3_path_pattern(AwsArnUtils.get_s3_path_from_arn(s3_arn))
+
+    def get_all_tables(self) -> list[GlueTable]:
+        return [self._get_table(table_id) for table_id in range(self._table_count)]
+
+    def get_location_entries(self):
+        '''
+        See S3ToTableMapper.get_location_entries
+        '''
+        for position in range(self._location_count):
+            yield (self._get_location(position).decode("utf-8"),
+                   self._get_table(self._location_entries[position * S3LocationIndex._LOCATION_ENTRY_FIELDS + 1]))
+
+    def close(self):
+        for view in (self._string_offsets, self._location_entries, self._table_records, self._buffer):
+            if view is not None:
+                view.release()
+        self._mmap.close()
+
+    @staticmethod
+    def _hash_fingerprint(fingerprint : str) -> bytes:
+        return hashlib.sha256(fingerprint.encode("utf-8")).digest()
+
+    def _cast(self, offset : int, count : int) -> memoryview:
+        return self._buffer[offset:offset + count * S3LocationIndex._UINT32_SIZE].cast("I")
+
+    def _get_string(self, string_id : int) -> bytes:
+        start = self._strings_offset + self._string_offsets[string_id]
+        end = self._strings_offset + self._string_offsets[string_id + 1]
+        return self._buffer[start:end].tobytes()
+
+    def _get_location(self, position : int) -> bytes:
+        return self._get_string(self._location_entries[position * S3LocationIndex._LOCATION_ENTRY_FIELDS])
+
+    def _lower_bound_location(self, key : bytes) -> int:
+        low, high = 0, self._location_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_location(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _upper_bound_location(self, key : bytes) -> int:
+        low, high = 0, self._location_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_location(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _get_tables_in_range(self, start : int, end : int) -> list[GlueTable]:
+        table_ids = dict.fromkeys(self._location_entries[position * S3LocationIndex._LOCATION_ENTRY_FIELDS + 1]
+                                  for position in range(start, end))
+        return [self._get_table(table_id) for table_id in table_ids]
+
+    def _get_table(self, table_id : int) -> GlueTable:
+        table = self._tables.get(table_id)
+        if table is None:
+            record_start = table_id * S3LocationIndex._TABLE_RECORD_FIELDS
+            region, catalog_id, database, name, location = (
+                self._get_string(string_id).decode("utf-8")
+                for string_id in self._table_records[record_start:record_start + S3LocationIndex._TABLE_RECORD_FIELDS])
+            table = GlueTable(region, catalog_id, database, name, location)
+            self._tables[table_id] = table
+        return table
+
+    def _get_path_segments(self, s3_path : str) -> list[str]:
+        # Mirrors S3Tree._sanitize_s3_path so that both implementations resolve paths the same way.
+        if s3_path.startswith("s3://"):
+            s3_path = s3_path[5:]
+        if s3_path == "":
+            return []
+        if s3_path.endswith("/"):
+            s3_path = s3_path[:-1]
+        elif "/" in s3_path:
+            s3_path = s3_path[:s3_path.rindex('/')]
+        return s3_path.split("/")
@@ -12,7 +12,7 @@ class S3ToTableMapper:
         Converts S3 path to GlueTables.
     '''
 
-    def __init__(self, glueDataCatalog : GlueDataCatalog):
+    def __init__(self, glueDataCatalog : GlueDataCatalog, partition_locations : dict[GlueTable, list[str]] | None = None):
         self._s3_tree = S3Tree()
 
         #Loop through glueDataCatalog and filter by tables. Take the tables location and
@@ -21,6 +21,12 @@ class S3ToTableMapper:
             if table.get_location() is not None and table.get_location().startswith("s3://"):
                 self._s3_tree.add_path(table.get_location(), table)
 
+        # Partitions that are stored outside of their table's location map back to their parent table.
+        if partition_locations:
+            for table, locations in partition_locations.items():
+                for location in locations:
+                    self._s3_tree.add_path(location, table)
+
     def get_tables_from_s3_arn_postfix(self, s3_arn : str) -> list[GlueTable]:
         '''
         Does a backwards look up for tables in which an S3 Path exists in.
@@ -53,7 +59,8 @@ class S3ToTableMapper:
         '''
         if s3_path.startswith("arn:"):
             raise ValueError("This function does not take in ARNs. Call get_tables_from_s3_arn instead.")
-        return self._s3_tree.get_all_subtree_values_from_path(s3_path)
+        # A table can be stored at several nodes when it has partitions outside of its location.
+        return list(dict.fromkeys(self._s3_tree.get_all_subtree_values_from_path(s3_path)))
 
     def get_all_tables_from_s3_arn_prefix(self, s3_arn : str) -> list[GlueTable]:
         '''
@@ -69,5 +76,33 @@ class S3ToTableMapper:
         logger.debug(f"get_all_tables_from_s3_arn_prefix: S3 Path: {s3_path}")
         return self.get_all_tables_from_s3_path_prefix(s3_path)
 
+    def get_all_tables_matching_s3_path_pattern(self, s3_pattern : str) -> list[GlueTable]:
+        '''
+        Gets all the tables whose locations are fully covered by an S3 path with wildcards in it.
+        eg. s3://bucket/*/raw/* will find the tables:
+        Table1: s3://bucket/db1/raw/
+        Table2: s3://bucket/db2/tables/raw/table2/
+        '''
+        if s3_pattern.startswith("arn:"):
+            raise ValueError("This function does not take in ARNs. Call get_all_tables_matching_s3_arn_pattern instead.")
+        return list(dict.fromkeys(self._s3_tree.get_all_values_matching_pattern(s3_pattern)))
+
+    def get_all_tables_matching_s3_arn_pattern(self, s3_arn : str) -> list[GlueTable]:
+        '''
+        Gets all the tables whose locations are fully covered by an S3 ARN with wildcards in it.
+        eg. arn:aws:s3:::bucket/*/raw/* will find the tables:
+        Table1: s3://bucket/db1/raw/
+        Table2: s3://bucket/db2/tables/raw/table2/
+        '''
+        s3_path = AwsArnUtils.get_s3_path_from_arn(s3_arn)
+        logger.debug(f"get_all_tables_matching_s3_arn_pattern: S3 Path: {s3_path}")
+        return self.get_all_tables_matching_s3_path_pattern(s3_path)
+
     def get_all_tables(self) -> list[GlueTable]:
-        return self._s3_tree.get_all_subtree_values_from_path("s3://")
+        return self.get_all_tables_from_s3_path_prefix("s3://")
+
+    def get_location_entries(self):
+        '''
+        Yields a tuple of (s3_location, GlueTable) for every location that is mapped to a table.
+        '''
+        return self._s3_tree.get_all_paths_and_values()
@@ -13,6 +13,9 @@ class S3Tree:
         # We only have one slash becasue our tree is delimited by a '/'
         self._root = TreeNode("s3:/")
 
+    def get_root(self) -> TreeNode:
+        return self._root
+
     def add_path(self, s3_path : str, value = None):
         '''
         Adds a path to the tree and returns the last node in the tree.
@@ -84,6 +87,89 @@ class S3Tree:
             logger.error(f"Error getting all values from path {s3_path}: {e}")
             raise e
 
+    def get_all_values_matching_pattern(self, s3_pattern : str) -> list[str]:
+        '''
+        Gets all the values stored at paths that are fully covered by an S3 pattern, ie every object under the
+        path matches the pattern. Like IAM, "*" matches any number of characters including "/", and "?" matches
+        a single character, eg s3://bucket/*/raw/* covers s3://bucket/a/raw/ and s3://bucket/a/b/raw/c/.
+
+        The pattern is matched while walking the tree, so branches that can no longer match are never visited,
+        and the subtree of a node that is fully covered is collected without matching any further.
+        '''
+        if s3_pattern.startswith("s3://"):
+            s3_pattern = s3_pattern[5:]
+
+        # Walk the "directories" before the first wildcard directly.
+        literal_end = min((s3_pattern.find(wildcard) for wildcard in "*?" if wildcard in s3_pattern), default=len(s3_pattern))
+        literal_end = s3_pattern.rfind("/", 0, literal_end) + 1
+        current_node = self._root
+        for segment in s3_pattern[:literal_end].split("/")[:-1]:
+            current_node = current_node >> segment
+            if current_node is None:
+                return []
+
+        pattern = s3_pattern[literal_end:]
+        # covering_states[i] is True when the rest of the pattern from i only contains "*", so any text matches it.
+        covering_states = [False] * (len(pattern) + 1)
+        for i in range(len(pattern) - 1, -1, -1):
+            covering_states[i] = pattern[i] == "*" and (i == len(pattern) - 1 or covering_states[i + 1])
+
+        values = []
+        nodes = [(current_node, self.__get_pattern_states(pattern, {0}))]
+        while nodes:
+            node, states = nodes.pop()
+            if any(covering_states[state] for state in states):
+                values.extend(self.__get_all_values_from_node(node))
+                continue
+            for child in node.get_children():
+                child_states = states
+                for character in child.get_path_val() + "/":
+                    child_states = self.__get_next_pattern_states(pattern, child_states, character)
+                    if not child_states:
+                        break
+                if child_states:
+                    nodes.append((child, child_states))
+        return values
+
+    def __get_next_pattern_states(self, pattern : str, states : set[int], character : str) -> set[int]:
+        next_states = set()
+        for state in states:
+            if state == len(pattern):
+                continue
+            if pattern[state] == "*":
+                next_states.add(state)
+            elif pattern[state] == "?" or pattern[state] == character:
+                next_states.add(state + 1)
+        return self.__get_pattern_states(pattern, next_states)
+
+    def __get_pattern_states(self, pattern : str, states : set[int]) -> set[int]:
+        # A "*" can match nothing, so the state after it is reachable as well.
+        pattern_states = set(states)
+        for state in states:
+            while state < len(pattern) and pattern[state] == "*":
+                state += 1
+                pattern_states.add(state)
+        return pattern_states
+
+    def get_all_paths_and_values(self):
+        '''
+        Yields a tuple of (s3_path, value) for every value stored in the tree. The S3 path always ends with a "/".
+        '''
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if node.has_values():
+                path = node.get_path_to_self() + "/"
+                for value in node.get_values():
+                    yield path, value
+            nodes.extend(node.get_children())
+
+    def get_all_values_from_node(self, node : TreeNode) -> list[str]:
+        '''
+        Gets all the values stored in the given node and all of its descendants.
+        '''
+        return self.__get_all_values_from_node(node)
+
     def __get_all_values_from_node(self, node) -> list[str]:
         values = []
         for child in node.get_children():
@@ -34,6 +34,9 @@ class TreeNode:
     def get_children(self):
         return self._children.values()
 
+    def get_path_val(self) -> any:
+        return self._path_val
+
     def get_path_to_self(self) -> str:
         return self._get_path_value()
 
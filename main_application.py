@@ -4,6 +4,7 @@ from policy_readers.iam_policy_permissions_reader import IamPolicyPermissionsRea
 from policy_readers.policy_reader_interface import PolicyReaderInterface
 from policy_readers.s3_bucket_permissions_policy_reader import S3BucketPermissionsPolicyReader
 from policy_readers.s3_cloudtrail_reader import S3CloudTrailDataEventsReader
+from policy_readers.cloudtrail_log_file_reader import CloudTrailLogFilePolicyReader
 
 # Import Policy Filters
 from policy_filters.filter_invalid_actions_to_resources import FilterInvalidActionsToResources
@@ -40,7 +41,7 @@ class MainApplication:
     '''
     The main application class.
     '''
-    _POLICY_READERS : list[PolicyReaderInterface] = [ GlueEventCloudTrailPolicyReader, S3CloudTrailDataEventsReader, S3BucketPermissionsPolicyReader, IamPolicyPermissionsReader]
+    _POLICY_READERS : list[PolicyReaderInterface] = [ GlueEventCloudTrailPolicyReader, S3CloudTrailDataEventsReader, CloudTrailLogFilePolicyReader, S3BucketPermissionsPolicyReader, IamPolicyPermissionsReader]
     _POLICY_FILTERS : list[PolicyFilterInterface] = [ IAMPrincipalValidator, FilterNotInGlueCatalog, FilterInvalidActionsToResources, FilterDataZoneRoles, IamFilterPrincipalsByList, IAMPolicySimulatorValidator ]
     _POST_PROCESSING_PLUGINS : list[PostProcessingPluginInterface] = [ AddDataPermissionsFromGluePermissions ]
 
@@ -78,14 +79,27 @@ class MainApplication:
             logger.info("    Imported permissions from previous run.")
             return importedPermissionsList
 
+        readers : list[PolicyReaderInterface] = []
         for module in MainApplication._POLICY_READERS:
             config_section = ConfigHelper.get_section(self._args, module.get_config_section(), {})
             if "enabled" in config_section and config_section["enabled"] == "true":
-                logger.info(f"=> Starting to read policies using {module.get_name()}")
-                reader : PolicyReaderInterface = module(self._app_conf, config_section)
+                readers.append(module(self._app_conf, config_section))
+
+        # Readers can start long running work, ie Athena queries, up front. Those run while the other readers are read,
+        # and are read last, so the total time is that of the longest query rather than the sum of all of them.
+        submitted : list[tuple[bool, PolicyReaderInterface]] = []
+        try:
+            for reader in readers:
+                submitted.append((reader.submit(), reader))
+            for _, reader in sorted(submitted, key=lambda submitted_reader: submitted_reader[0]):
+                logger.info(f"=> Starting to read policies using {reader.get_name()}")
                 newPermissionsList = reader.read_policies()
                 permissionsList.add_permissions_from_list(newPermissionsList)
-                logger.info(f"=> Finished reading policies from {module.get_name()}. Found {newPermissionsList.get_permissions_count()} permissions.")
+                logger.info(f"=> Finished reading policies from {reader.get_name()}. Found {newPermissionsList.get_permissions_count()} permissions.")
+        finally:
+            # If a reader failed, the work the other readers submitted is stopped rather than left running.
+            for _, reader in submitted:
+                reader.cancel()
 
         self._import_export.export_policy_readers_output(permissionsList)
 
@@ -141,6 +155,7 @@ class MainApplication:
         registration_role = ConfigHelper.get_config_string(section, "iam_role_arn")
         use_service_linked_role = ConfigHelper.get_config_boolean(section, "use_service_linked_role")
         enabled = ConfigHelper.get_config_boolean(section, "enabled", False)
+        max_locations = ConfigHelper.get_config_int(section, "max_locations")
 
         if not enabled:
             return
@@ -148,7 +163,13 @@ class MainApplication:
         logger.info("=> Generating Lake Formation data locations.")
 
         dataLocationGenerator = LakeFormationS3DataLakeLocationGenerator()
-        locations = dataLocationGenerator.generate_data_lake_locations(self._app_conf.get_glue_data_catalog())
+        try:
+            coverage = dataLocationGenerator.generate_data_lake_location_coverage(self._app_conf.get_glue_data_catalog(), max_locations)
+        except ValueError as e:
+            logger.error(f"Unable to generate data locations: {e} Not registering data locations")
+            return
+        locations = sorted(coverage.keys())
+        self._output_data_location_coverage(coverage)
 
         if registration_role is not None and use_service_linked_role:
             logger.error("Cannot use service linked role and a specific role at the same time. Not registering data locations")
@@ -163,6 +184,15 @@ class MainApplication:
             dataLocationCommitter.register_locations()
             logger.info("=> Finished committing data locations.")
 
+    def _output_data_location_coverage(self, coverage : dict[str, list]):
+        logger.info(f"=> Generated {len(coverage)} data locations.")
+        for location in sorted(coverage.keys()):
+            tables = coverage[location]
+            logger.info(f"     {location} covers {len(tables)} tables.")
+            if logger.isEnabledFor(logging.DEBUG):
+                for table in tables:
+                    logger.debug(f"         {table.get_arn()}")
+
     def _convert_permissions_to_lf_permissions(self, permissionsList : PermissionsList):
         translator = ActionsToLFPermissionsTranslator(self._app_conf.get_s3_to_table_translator())
         lfpermissions = translator.translate_iam_permissions_to_lf_permissions(permissionsList)
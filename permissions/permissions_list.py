@@ -44,6 +44,38 @@ class PermissionsList:
             return True
         return False
 
+    def add_permissions(self, permissions) -> int:
+        """
+        Adds permissions in bulk from an iterable of (principal_arn, resource_arn, iam_actions) tuples, where
+        iam_actions is an iterable of IAM actions. Existing actions are ignored.
+        Returns: The number of (principal, resource) pairs that were added or had new actions.
+        """
+        changed = 0
+        for principal_arn, resource_arn, iam_actions in permissions:
+            actions = self._permissions.setdefault(principal_arn, {}).setdefault(resource_arn, set())
+            if not actions:
+                self._permissions_count += 1
+            action_count = len(actions)
+            actions.update(iam_actions)
+            if len(actions) != action_count:
+                changed += 1
+            elif not actions:
+                # No actions were given for a new resource, so do not keep an empty record.
+                self.delete_permission(principal_arn, resource_arn)
+        return changed
+
+    def add_encoded_permissions(self, principal_arns : list[str], resource_arns : list[str],
+                                iam_actions : list[str], permissions) -> int:
+        """
+        Adds permissions in bulk from an iterable of (principal_id, resource_id, action_ids) tuples, where the ids are
+        positions in principal_arns, resource_arns and iam_actions, ie the indices of dictionary encoded columns. Each
+        distinct ARN and action is then a single string shared by all of the permissions that use it.
+        Returns: The number of (principal, resource) pairs that were added or had new actions.
+        """
+        return self.add_permissions((principal_arns[principal_id], resource_arns[resource_id],
+                                     [iam_actions[action_id] for action_id in action_ids])
+                                    for principal_id, resource_id, action_ids in permissions)
+
     def get_permissions_count(self):
         return self._permissions_count
 
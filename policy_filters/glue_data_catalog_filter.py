@@ -28,7 +28,8 @@ class FilterNotInGlueCatalog(PolicyFilterInterface):
     def __init__(self, appConfig : ApplicationConfiguration, conf : dict[str]):
         super().__init__(appConfig, conf)
         self._glueDataCatalog : GlueDataCatalog = appConfig.get_glue_data_catalog()
-        self._s3_to_table_mapper : S3ToTableMapper = appConfig.get_s3_to_table_translator()
+        # The S3 to table mapper reads every table in the catalog, so only create it once an S3 resource is seen.
+        self._s3_to_table_mapper : S3ToTableMapper | None = None
 
     def filter_policies(self, permissionsList : PermissionsList) -> PermissionsList:
         for permission in permissionsList.get_permissions():
@@ -43,7 +44,7 @@ class FilterNotInGlueCatalog(PolicyFilterInterface):
                 s3_arn = awsObject.get_arn()
                 if s3_arn.endswith("*"):
                     s3_arn = s3_arn[:-1]
-                tables = self._s3_to_table_mapper.get_all_tables_from_s3_arn_prefix(s3_arn)
+                tables = self._get_s3_to_table_mapper().get_all_tables_from_s3_arn_prefix(s3_arn)
                 # If there are no tables returned from our mapper, then the S3 location doesn't contain any Tables
                 # so filter it.
                 if not tables:
@@ -58,6 +59,11 @@ class FilterNotInGlueCatalog(PolicyFilterInterface):
                 raise CatalogEntityNotFoundException("Unknown glue object type: " + str(type(awsObject)))
         return self.get_filtered_permissions()
 
+    def _get_s3_to_table_mapper(self) -> S3ToTableMapper:
+        if self._s3_to_table_mapper is None:
+            self._s3_to_table_mapper = self._appConfig.get_s3_to_table_translator()
+        return self._s3_to_table_mapper
+
     def _check_glue_catalog(self, glueCatalog : GlueCatalog, permission):
         if self._glueDataCatalog.get_catalog(glueCatalog.get_catalog_id()) is None:
             logger.info(f"not found catalog: {glueCatalog}")
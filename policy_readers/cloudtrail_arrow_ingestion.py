@@ -0,0 +1,66 @@
+from permissions.permissions_list import PermissionsList
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import logging
+logger = logging.getLogger(__name__)
+
+class CloudTrailArrowIngestion:
+    """Converts the results of the CloudTrail queries to permissions with Arrow compute functions, rather than pandas
+    operations on columns of Python strings.
+
+    The principal, resource and action columns are dictionary encoded, the actions are grouped by the indices of the
+    principal and resource, and only the distinct values of each dictionary are converted to Python strings, so each
+    distinct ARN is a single string in the permissions list. The results are expected to be read with the pyarrow dtype
+    backend, so the DataFrame columns are Arrow arrays and converting them to a table does not copy them.
+    """
+
+    @staticmethod
+    def to_table(results_df : pd.DataFrame, columns : list[str]) -> pa.Table:
+        """Returns the columns of the query results as an Arrow table with one chunk per column."""
+        return pa.Table.from_pandas(results_df[columns], preserve_index=False).combine_chunks()
+
+    @staticmethod
+    def get_string_column(table : pa.Table, column : str) -> pa.Array:
+        """Returns a column as strings. Columns of only nulls, ie in a chunk of CSV results, have the null type."""
+        array = table.column(column).combine_chunks()
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        return array.cast(pa.string())
+
+    @staticmethod
+    def flatten_events(events : pa.Array) -> tuple[pa.Array, pa.Array]:
+        """Returns the events of every row as one array, and the row index of each event. Events are either lists, when
+        the results are read from Parquet, or arrays formatted as strings, ie "[GetObject, PutObject]", when they are
+        read as CSV."""
+        if pa.types.is_dictionary(events.type):
+            events = events.dictionary_decode()
+        if pa.types.is_string(events.type) or pa.types.is_large_string(events.type):
+            events = pc.split_pattern(pc.utf8_trim(events, characters="[]"), pattern=",")
+        row_indices = pc.list_parent_indices(events)
+        flat_events = pc.utf8_trim_whitespace(pc.list_flatten(events).cast(pa.string()))
+        valid = pc.and_(pc.is_valid(flat_events), pc.not_equal(flat_events, ""))
+        return pc.filter(flat_events, valid), pc.filter(row_indices, valid)
+
+    @staticmethod
+    def add_permissions(permissions_list : PermissionsList, principal_arns : pa.Array, resource_arns : pa.Array,
+                        iam_actions : pa.Array) -> int:
+        """Adds the distinct actions of each principal and resource to the permissions list. The arrays must not have
+        nulls. Returns the number of (principal, resource) pairs that were added or had new actions."""
+        principals = pc.dictionary_encode(principal_arns)
+        resources = pc.dictionary_encode(resource_arns)
+        actions = pc.dictionary_encode(iam_actions)
+
+        grouped = pa.table({
+            "principal_id": principals.indices,
+            "resource_id": resources.indices,
+            "action_id": actions.indices,
+        }).group_by(["principal_id", "resource_id"], use_threads=False).aggregate([("action_id", "distinct")])
+
+        return permissions_list.add_encoded_permissions(principals.dictionary.to_pylist(), resources.dictionary.to_pylist(),
+                                                        actions.dictionary.to_pylist(),
+                                                        zip(grouped.column("principal_id").to_pylist(),
+                                                            grouped.column("resource_id").to_pylist(),
+                                                            grouped.column("action_id_distinct").to_pylist()))
@@ -0,0 +1,89 @@
+from permissions.permissions_list import PermissionsList
+from config.config_helper import ConfigHelper
+from policy_readers.cloudtrail_time_range import CloudTrailTimeRange
+
+from datetime import datetime, timedelta, timezone
+import json
+import os
+
+import logging
+logger = logging.getLogger(__name__)
+
+class CloudTrailIncrementalState:
+    """Keeps the watermark and the aggregated permissions of a CloudTrail reader between runs, so that each run only
+    queries the CloudTrail events since the previous run and merges them into the permissions read so far.
+
+    Each run reads the events up to lag_minutes ago, as CloudTrail delivers events late, and that time becomes the
+    watermark of the next run. If a partition column is configured, ie the "timestamp" column of a CloudTrail table with
+    partition projection, the query is also bound to the partitions between the watermark and now, so Athena only scans
+    the new partitions. The state is only saved once the run has completed.
+    """
+
+    DEFAULT_LAG_MINUTES : int = 15
+
+    def __init__(self, state_filename : str, lag_minutes : int = DEFAULT_LAG_MINUTES, partition_column : str | None = None,
+                 partition_format : str = CloudTrailTimeRange.DEFAULT_PARTITION_FORMAT):
+        self._state_filename = state_filename
+        self._lag = timedelta(minutes=lag_minutes)
+        self._partition_column = partition_column
+        self._partition_format = partition_format
+        self._watermark : datetime | None = None
+        self._permissions = PermissionsList()
+        self._next_watermark : datetime | None = None
+        self._load()
+
+    @staticmethod
+    def create(config : dict[str]):
+        """Returns the incremental state of a reader if incremental_state_file is configured, or None otherwise."""
+        state_filename = ConfigHelper.get_config_string(config, "incremental_state_file")
+        if state_filename is None:
+            return None
+        return CloudTrailIncrementalState(state_filename,
+                                          ConfigHelper.get_config_int(config, "incremental_lag_minutes", CloudTrailIncrementalState.DEFAULT_LAG_MINUTES),
+                                          ConfigHelper.get_config_string(config, "athena_partition_column"),
+                                          ConfigHelper.get_config_string(config, "athena_partition_format", CloudTrailTimeRange.DEFAULT_PARTITION_FORMAT))
+
+    def get_watermark(self) -> datetime | None:
+        return self._watermark
+
+    def get_time_range(self, now : datetime | None = None, default_start : datetime | None = None) -> CloudTrailTimeRange:
+        """Returns the range of events since the watermark, or since default_start if there is no watermark yet. The end
+        of this range becomes the watermark once save is called."""
+        self._next_watermark = (now or datetime.now(timezone.utc)) - self._lag
+        time_range = CloudTrailTimeRange(self._watermark or default_start, self._next_watermark, self._partition_column, self._partition_format)
+        logger.info(f"Reading CloudTrail events in {time_range}.")
+        return time_range
+
+    def save(self, delta_permissions : PermissionsList) -> PermissionsList:
+        """Merges the permissions read in this run into the stored permissions, saves them with the new watermark, and
+        returns all of the permissions."""
+        assert self._next_watermark is not None, "get_time_range must be called before save."
+        self._permissions.add_permissions_from_list(delta_permissions)
+        self._watermark = self._next_watermark
+        self._next_watermark = None
+
+        state = {
+            "watermark": self._watermark.strftime(CloudTrailTimeRange.EVENT_TIME_FORMAT),
+            "permissions": [[permission.principal_arn(), permission.resource_arn(), sorted(permission.permission_actions())]
+                            for permission in self._permissions]
+        }
+        # Written to a temporary file first so an interrupted save does not lose the previous state.
+        temporary_filename = self._state_filename + ".tmp"
+        with open(temporary_filename, mode='w', encoding="utf-8") as state_file:
+            json.dump(state, state_file)
+        os.replace(temporary_filename, self._state_filename)
+        logger.info(f"Saved CloudTrail incremental state to {self._state_filename}. Watermark: {state['watermark']}, "
+                    f"permissions: {self._permissions.get_permissions_count()}, new in this run: {delta_permissions.get_permissions_count()}")
+        return self._permissions
+
+    def _load(self):
+        if not os.path.exists(self._state_filename):
+            logger.info(f"No CloudTrail incremental state found in {self._state_filename}. All events will be read.")
+            return
+
+        with open(self._state_filename, mode='r', encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        self._watermark = datetime.strptime(state["watermark"], CloudTrailTimeRange.EVENT_TIME_FORMAT).replace(tzinfo=timezone.utc)
+        self._permissions.add_permissions((principal_arn, resource_arn, actions) for principal_arn, resource_arn, actions in state["permissions"])
+        logger.info(f"Loaded CloudTrail incremental state from {self._state_filename}. Watermark: {state['watermark']}, "
+                    f"permissions: {self._permissions.get_permissions_count()}")
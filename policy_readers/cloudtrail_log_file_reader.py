@@ -0,0 +1,111 @@
+from policy_readers.policy_reader_interface import PolicyReaderInterface
+from policy_readers.cloudtrail_log_parser import CloudTrailLogParser
+from permissions.permissions_list import PermissionsList
+
+from config.application_configuration import ApplicationConfiguration
+from config.config_helper import ConfigHelper
+from config.configuration_exceptions import ConfigurationInvalidException
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import multiprocessing
+import os
+
+import logging
+logger = logging.getLogger(__name__)
+
+class CloudTrailLogFilePolicyReader(PolicyReaderInterface):
+    """This class reads CloudTrail log files (*.json.gz) from a local directory, ie a copy of the CloudTrail S3 bucket, to
+    derive equalivant Lake Formation permissions without Athena. Glue events are mapped to resources the same way as the
+    GlueEventCloudTrailPolicyReader, and S3 data events the same way as the S3CloudTrailDataEventsReader.
+
+    The files are split into batches that are parsed in a pool of processes. Each batch is aggregated by its worker, so
+    only the distinct (principal, resource, event) combinations are sent back and merged.
+
+    Limitations:
+        - The same limitations as the GlueEventCloudTrailPolicyReader and S3CloudTrailDataEventsReader apply.
+        - Each log file is read into memory at once. CloudTrail log files are generally small.
+    """
+
+    _REQUIRED_CONFIGURATION : dict = {
+            "cloudtrail_log_directory": "The local directory to read CloudTrail log files from. Sub directories are read as well."
+        }
+
+    _CONFIGURATION_SECTION : str = "policy_reader_cloudtrail_log_files"
+
+    _BATCHES_PER_WORKER : int = 4
+
+    def __init__(self, appConfig : ApplicationConfiguration, conf : dict[str]):
+        assert appConfig is not None
+        super().__init__(appConfig, conf)
+
+    def read_policies(self) -> PermissionsList:
+        """This function reads policies from the CloudTrail log files in the configured directory. """
+        self._validate_application_conf()
+        log_directory = self._config["cloudtrail_log_directory"]
+        read_glue_events = ConfigHelper.get_config_boolean(self._config, "read_glue_events", True)
+        read_s3_events = ConfigHelper.get_config_boolean(self._config, "read_s3_events", True)
+        max_workers = ConfigHelper.get_config_int(self._config, "max_workers", os.cpu_count() or 1)
+
+        file_paths = sorted(str(file_path) for file_path in Path(log_directory).rglob("*.json.gz"))
+        logger.info(f"Reading policies from {len(file_paths)} CloudTrail log files in {log_directory} using {max_workers} processes.")
+
+        glue_events : dict[tuple[str, str], set[str]] = {}
+        s3_events : dict[tuple[str, str], set[str]] = {}
+        for batch_glue_events, batch_s3_events in self._parse_files(file_paths, max(max_workers, 1), read_glue_events, read_s3_events):
+            CloudTrailLogFilePolicyReader._merge_events(glue_events, batch_glue_events)
+            CloudTrailLogFilePolicyReader._merge_events(s3_events, batch_s3_events)
+
+        permissions_list = PermissionsList()
+        permissions_list.add_permissions((principal_arn, resource_arn, {"glue:" + event for event in events})
+                                         for (principal_arn, resource_arn), events in glue_events.items())
+        self._add_s3_permissions(permissions_list, s3_events)
+        return permissions_list
+
+    def _parse_files(self, file_paths : list[str], max_workers : int, read_glue_events : bool, read_s3_events : bool):
+        if max_workers == 1 or len(file_paths) <= 1:
+            yield CloudTrailLogParser.parse_files(file_paths, read_glue_events, read_s3_events)
+            return
+
+        batch_count = min(len(file_paths), max_workers * CloudTrailLogFilePolicyReader._BATCHES_PER_WORKER)
+        batches = [file_paths[index::batch_count] for index in range(batch_count)]
+        # Workers are spawned rather than forked, as this process may already be running threads, ie from boto3.
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(CloudTrailLogParser.parse_files, batch, read_glue_events, read_s3_events) for batch in batches]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _add_s3_permissions(self, permissions_list : PermissionsList, s3_events : dict[tuple[str, str], set[str]]):
+        # Filter out any s3 locations that do not map to a Glue Table. Each distinct location is only looked up once.
+        s3_to_table_mapper = self._appConfig.get_s3_to_table_translator()
+        has_tables = {s3_path: bool(s3_to_table_mapper.get_tables_from_s3_arn_postfix(s3_path))
+                      for s3_path in {s3_path for _, s3_path in s3_events}}
+        logger.debug(f"S3 Locations without any glue tables: {[s3_path for s3_path, found in has_tables.items() if not found]}")
+        permissions_list.add_permissions((principal_arn, s3_path, {"s3:" + event for event in events})
+                                         for (principal_arn, s3_path), events in s3_events.items() if has_tables[s3_path])
+
+    @staticmethod
+    def _merge_events(events : dict[tuple[str, str], set[str]], events_to_merge : dict[tuple[str, str], set[str]]):
+        for key, event_names in events_to_merge.items():
+            events.setdefault(key, set()).update(event_names)
+
+    def _validate_application_conf(self):
+        for key in self._REQUIRED_CONFIGURATION:
+            if key not in self._config:
+                raise ConfigurationInvalidException("CloudTrail Log File Reader: Missing configuration for " + key)
+        if not os.path.isdir(self._config["cloudtrail_log_directory"]):
+            raise ConfigurationInvalidException(f"CloudTrail Log File Reader: {self._config['cloudtrail_log_directory']} is not a directory.")
+
+    @classmethod
+    def get_name(cls):
+        """Gets the name of this reader. """
+        return CloudTrailLogFilePolicyReader.__name__
+
+    @classmethod
+    def get_required_configuration(cls) -> dict:
+        """Returns the required configuration for this reader. """
+        return CloudTrailLogFilePolicyReader._REQUIRED_CONFIGURATION
+
+    @classmethod
+    def get_config_section(cls) -> str:
+        return CloudTrailLogFilePolicyReader._CONFIGURATION_SECTION
@@ -0,0 +1,131 @@
+import gzip
+import json
+
+import logging
+logger = logging.getLogger(__name__)
+
+class CloudTrailLogParser:
+    """Parses CloudTrail log files, ie the *.json.gz files CloudTrail delivers to S3, into Glue and S3 permissions.
+    This applies the same mapping as the Athena queries of GlueEventCloudTrailPolicyReader and S3CloudTrailDataEventsReader,
+    so the log files can be read without Athena.
+
+    The results are aggregated as dictionaries of (principal_arn, resource) to a set of event names, where the resource is
+    a Glue ARN for Glue events, and an S3 path (the bucket and key prefix) for S3 events. The parser is stateless, so the
+    files can be parsed in separate processes and the results merged.
+    """
+
+    SUPPORTED_IDENTITY_TYPES : set[str] = {'IAMUser', 'AssumedRole'}
+
+    CATALOG_EVENTS : set[str] = {'CreateDatabase', 'GetDatabases'}
+    DATABASE_EVENTS : set[str] = {'GetDatabase', 'UpdateDatabase', 'DeleteDatabase', 'CreateTable', 'GetTables'}
+    TABLE_EVENTS : set[str] = {'GetTable', 'GetTablesVersion', 'GetTablesVersions', 'GetPartition', 'GetUnfilteredPartition',
+                               'GetInternalUnfilteredPartition', 'GetInternalUnfilteredPartitions', 'GetPartitions',
+                               'GetUnfilteredPartitions', 'BatchGetPartition', 'GetPartitionIndexes', 'UpdateTable',
+                               'DeleteTableVersion', 'BatchDeleteTableVersion', 'BatchCreatePartition', 'CreatePartition',
+                               'DeletePartition', 'BatchDeletePartition', 'UpdatePartition', 'BatchUpdatePartition',
+                               'CreatePartitionIndex', 'DeletePartitionIndex', 'DeleteTable'}
+    S3_EVENTS : set[str] = {'GetObject', 'HeadObject', 'PutObject', 'CreateMultipartUpload', 'UploadPart', 'UploadPartCopy', 'DeleteObject'}
+
+    @staticmethod
+    def parse_files(file_paths : list[str], read_glue_events : bool = True,
+                    read_s3_events : bool = True) -> tuple[dict[tuple[str, str], set[str]], dict[tuple[str, str], set[str]]]:
+        """Parses a batch of log files, and returns the Glue and S3 events of all of them aggregated. A file that cannot be
+        read is logged and skipped."""
+        glue_events : dict[tuple[str, str], set[str]] = {}
+        s3_events : dict[tuple[str, str], set[str]] = {}
+        for file_path in file_paths:
+            try:
+                records = CloudTrailLogParser.read_records(file_path)
+            except (OSError, EOFError, ValueError) as e:
+                logger.error(f"Unable to read CloudTrail log file {file_path}: {e}")
+                continue
+            CloudTrailLogParser.add_records(records, glue_events, s3_events, read_glue_events, read_s3_events)
+        return glue_events, s3_events
+
+    @staticmethod
+    def read_records(file_path : str) -> list[dict]:
+        with gzip.open(file_path, "rt", encoding="utf-8") as log_file:
+            return json.load(log_file).get("Records", [])
+
+    @staticmethod
+    def add_records(records : list[dict], glue_events : dict[tuple[str, str], set[str]], s3_events : dict[tuple[str, str], set[str]],
+                    read_glue_events : bool = True, read_s3_events : bool = True):
+        for record in records:
+            if record.get("errorCode") is not None:
+                continue
+            event_name = record.get("eventName")
+            if read_glue_events and record.get("eventSource") == "glue.amazonaws.com":
+                key = CloudTrailLogParser._get_glue_permission(record, event_name)
+                if key is not None:
+                    glue_events.setdefault(key, set()).add(event_name)
+            elif read_s3_events and event_name in CloudTrailLogParser.S3_EVENTS:
+                key = CloudTrailLogParser._get_s3_permission(record)
+                if key is not None:
+                    s3_events.setdefault(key, set()).add(event_name)
+
+    @staticmethod
+    def _get_principal_arn(record : dict) -> str | None:
+        user_identity = record.get("userIdentity") or {}
+        if user_identity.get("type") == 'IAMUser':
+            return CloudTrailLogParser._get_scalar(user_identity, "arn")
+        if user_identity.get("type") == 'AssumedRole':
+            return CloudTrailLogParser._get_scalar((user_identity.get("sessionContext") or {}).get("sessionIssuer"), "arn")
+        return None
+
+    @staticmethod
+    def _get_glue_permission(record : dict, event_name : str) -> tuple[str, str] | None:
+        """Returns the principal and Glue resource ARN of a Glue event, or None if the event is not supported or is
+        missing any values."""
+        if (record.get("userIdentity") or {}).get("type") not in CloudTrailLogParser.SUPPORTED_IDENTITY_TYPES:
+            return None
+        request_parameters = record.get("requestParameters") or {}
+        principal_arn = CloudTrailLogParser._get_principal_arn(record)
+        region = CloudTrailLogParser._get_scalar(record, "awsRegion")
+        account_id = CloudTrailLogParser._get_scalar(request_parameters, "catalogId") \
+                     or CloudTrailLogParser._get_scalar(record.get("userIdentity"), "accountId")
+        if principal_arn is None or region is None or account_id is None:
+            return None
+        arn_prefix = f"arn:aws:glue:{region}:{account_id}:"
+
+        if event_name in CloudTrailLogParser.CATALOG_EVENTS:
+            return principal_arn, arn_prefix + "catalog"
+
+        if event_name in CloudTrailLogParser.DATABASE_EVENTS:
+            database_name_parameter = "databaseName" if event_name in ('GetTables', 'CreateTable') else "name"
+            database_name = CloudTrailLogParser._get_scalar(request_parameters, database_name_parameter)
+            if database_name is None:
+                return None
+            return principal_arn, arn_prefix + f"database/{database_name}"
+
+        if event_name in CloudTrailLogParser.TABLE_EVENTS:
+            database_name = CloudTrailLogParser._get_scalar(request_parameters, "databaseName")
+            table_name = CloudTrailLogParser._get_scalar(request_parameters, "tableName") \
+                         or CloudTrailLogParser._get_scalar(request_parameters, "name")
+            if database_name is None or table_name is None:
+                return None
+            return principal_arn, arn_prefix + f"table/{database_name}/{table_name}"
+
+        return None
+
+    @staticmethod
+    def _get_s3_permission(record : dict) -> tuple[str, str] | None:
+        """Returns the principal and S3 path, ie arn:aws:s3:::bucket/prefix/, of an S3 data event, or None if the event
+        is missing any values or is for a Hive staging file."""
+        request_parameters = record.get("requestParameters") or {}
+        principal_arn = CloudTrailLogParser._get_principal_arn(record)
+        bucket = CloudTrailLogParser._get_scalar(request_parameters, "bucketName")
+        key = CloudTrailLogParser._get_scalar(request_parameters, "key")
+        if principal_arn is None or bucket is None or key is None or ".hive-staging_" in key:
+            return None
+        # Objects at the base of the bucket have an empty prefix.
+        return principal_arn, f"arn:aws:s3:::{bucket}/{key[:key.rfind('/') + 1]}"
+
+    @staticmethod
+    def _get_scalar(values : dict | None, name : str) -> str | None:
+        '''Returns a value as a string if it is a scalar, like Athena's json_extract_scalar.'''
+        if not isinstance(values, dict):
+            return None
+        value = values.get(name)
+        if value is None or isinstance(value, (dict, list)):
+            return None
+        return value if isinstance(value, str) else json.dumps(value)
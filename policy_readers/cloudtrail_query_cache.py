@@ -0,0 +1,87 @@
+from config.config_helper import ConfigHelper
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+import hashlib
+import os
+import shutil
+import time
+import uuid
+
+import pandas as pd
+
+import logging
+logger = logging.getLogger(__name__)
+
+class CloudTrailQueryCache:
+    """Keeps a local Parquet copy of the results of the CloudTrail queries, so rerunning the migration, ie a dry run
+    with different filters, reuses the rows read by a recent run rather than scanning CloudTrail again.
+
+    Each query is cached under the hash of its SQL, which includes the CloudTrail database and table and the time
+    predicate of the query, so a different table or time window is a different entry. Tables the query joins on must
+    be named after their contents, as the S3 table location lookup is, so different contents are a different entry.
+    Entries older than max_age_minutes are ignored and replaced. The results are written one chunk per file, and an
+    entry only becomes visible once all of its chunks have been written.
+    """
+
+    DEFAULT_MAX_AGE_MINUTES : int = 60
+
+    def __init__(self, cache_directory : str, max_age_minutes : int = DEFAULT_MAX_AGE_MINUTES):
+        self._cache_directory = cache_directory
+        self._max_age = timedelta(minutes=max_age_minutes)
+        os.makedirs(self._cache_directory, exist_ok=True)
+
+    @staticmethod
+    def create(config : dict[str]):
+        """Returns the query cache of a reader if query_cache_directory is configured, or None otherwise."""
+        cache_directory = ConfigHelper.get_config_string(config, "query_cache_directory")
+        if cache_directory is None:
+            return None
+        return CloudTrailQueryCache(cache_directory,
+                                    ConfigHelper.get_config_int(config, "query_cache_max_age_minutes", CloudTrailQueryCache.DEFAULT_MAX_AGE_MINUTES))
+
+    def get_max_age(self) -> timedelta:
+        return self._max_age
+
+    def align(self, now : datetime) -> datetime:
+        """Returns now rounded down to a multiple of the max age, so queries relative to now, ie the last N days, have
+        the same time window, and so the same cache entry, until the entry expires."""
+        max_age_seconds = max(int(self._max_age.total_seconds()), 1)
+        return datetime.fromtimestamp(int(now.timestamp()) // max_age_seconds * max_age_seconds, tz=timezone.utc)
+
+    def contains(self, sql : str) -> bool:
+        entry_directory = self._get_entry_directory(sql)
+        if not os.path.isdir(entry_directory):
+            return False
+        age = timedelta(seconds=time.time() - os.path.getmtime(entry_directory))
+        if age > self._max_age:
+            logger.debug(f"CloudTrail query cache entry {entry_directory} expired {age - self._max_age} ago.")
+            return False
+        return True
+
+    def read(self, sql : str) -> Iterator[pd.DataFrame]:
+        """Yields the cached results of a query one chunk at a time."""
+        entry_directory = self._get_entry_directory(sql)
+        logger.info(f"Reading CloudTrail query results from the cache in {entry_directory}.")
+        for chunk_filename in sorted(os.listdir(entry_directory)):
+            yield pd.read_parquet(os.path.join(entry_directory, chunk_filename))
+
+    def write(self, sql : str, results : Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Yields the results of a query as they are read, while writing each chunk to the cache. The entry is only
+        added, or replaced, once every chunk has been read."""
+        entry_directory = self._get_entry_directory(sql)
+        temporary_directory = f"{entry_directory}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(temporary_directory)
+        try:
+            for index, results_df in enumerate(results):
+                results_df.to_parquet(os.path.join(temporary_directory, f"{index:06}.parquet"), index=False)
+                yield results_df
+            if os.path.isdir(entry_directory):
+                shutil.rmtree(entry_directory)
+            os.replace(temporary_directory, entry_directory)
+            logger.debug(f"Cached CloudTrail query results in {entry_directory}.")
+        finally:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+
+    def _get_entry_directory(self, sql : str) -> str:
+        return os.path.join(self._cache_directory, hashlib.sha256(sql.encode("utf-8")).hexdigest())
@@ -0,0 +1,38 @@
+from config.config_helper import ConfigHelper
+from policy_readers.cloudtrail_query_cache import CloudTrailQueryCache
+
+from typing import Callable
+
+class CloudTrailQueryOptions:
+    """How a CloudTrailQueryRunner runs the query of a CloudTrail reader: how many shards run in Athena at the same
+    time, how many times a failed shard is retried, the cache of query results, if any, and a function that is called
+    once before the first query is started, if any."""
+
+    DEFAULT_CONCURRENCY : int = 4
+    DEFAULT_RETRIES : int = 2
+
+    def __init__(self, max_concurrency : int = DEFAULT_CONCURRENCY, max_retries : int = DEFAULT_RETRIES,
+                 query_cache : CloudTrailQueryCache | None = None, prepare_query : Callable[[], None] | None = None):
+        self._max_concurrency = max(max_concurrency, 1)
+        self._max_retries = max(max_retries, 0)
+        self._query_cache = query_cache
+        self._prepare_query = prepare_query
+
+    @staticmethod
+    def create(config : dict[str], prepare_query : Callable[[], None] | None = None):
+        """Returns the options configured in the section of a reader."""
+        return CloudTrailQueryOptions(ConfigHelper.get_config_int(config, "query_shard_concurrency", CloudTrailQueryOptions.DEFAULT_CONCURRENCY),
+                                      ConfigHelper.get_config_int(config, "query_shard_retries", CloudTrailQueryOptions.DEFAULT_RETRIES),
+                                      CloudTrailQueryCache.create(config), prepare_query)
+
+    def get_max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    def get_max_retries(self) -> int:
+        return self._max_retries
+
+    def get_query_cache(self) -> CloudTrailQueryCache | None:
+        return self._query_cache
+
+    def get_prepare_query(self) -> Callable[[], None] | None:
+        return self._prepare_query
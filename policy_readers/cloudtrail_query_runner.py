@@ -0,0 +1,194 @@
+from permissions.permissions_list import PermissionsList
+from config.config_helper import ConfigHelper
+from config.configuration_exceptions import ConfigurationInvalidException
+from aws_resources.readers.athena_query_reader import AthenaQueryReader
+from policy_readers.cloudtrail_incremental_state import CloudTrailIncrementalState
+from policy_readers.cloudtrail_query_cache import CloudTrailQueryCache
+from policy_readers.cloudtrail_query_options import CloudTrailQueryOptions
+from policy_readers.cloudtrail_time_range import CloudTrailTimeRange
+
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Callable
+
+import pandas as pd
+
+import logging
+logger = logging.getLogger(__name__)
+
+class _AthenaQueries:
+    """The Athena queries started by a CloudTrailQueryRunner. The query is prepared once before the first query is
+    started, and the running queries are tracked so they can be stopped when the runner is cancelled."""
+
+    def __init__(self, athenaQueryReader : AthenaQueryReader, prepare_query : Callable[[], None] | None):
+        self._athenaQueryReader = athenaQueryReader
+        self._prepare_query = prepare_query
+        self._prepare_query_lock = Lock()
+        self._running_queries : set[str] = set()
+        self._running_queries_lock = Lock()
+        self._cancelled = False
+
+    def start(self, sql : str) -> str:
+        with self._prepare_query_lock:
+            if self._prepare_query is not None:
+                self._prepare_query()
+                self._prepare_query = None
+        query_execution_id = self._athenaQueryReader.start_query(sql)
+        with self._running_queries_lock:
+            self._running_queries.add(query_execution_id)
+            cancelled = self._cancelled
+        if cancelled:
+            # The runner was cancelled while the query was starting.
+            self._stop(query_execution_id)
+        return query_execution_id
+
+    def read_results(self, query_execution_id : str):
+        try:
+            yield from self._athenaQueryReader.read_query_results(query_execution_id)
+        finally:
+            with self._running_queries_lock:
+                self._running_queries.discard(query_execution_id)
+
+    def cancel(self):
+        with self._running_queries_lock:
+            self._cancelled = True
+            running_queries = list(self._running_queries)
+        for query_execution_id in running_queries:
+            self._stop(query_execution_id)
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _stop(self, query_execution_id : str):
+        try:
+            self._athenaQueryReader.stop_query(query_execution_id)
+        except (BotoCoreError, ClientError) as e:
+            logger.warning(f"Unable to stop Athena query {query_execution_id}: {e}")
+
+class CloudTrailQueryRunner:
+    """Runs the Athena query of a CloudTrail reader, either as a single query or split into shards, where each shard is
+    the same query for a range of event times. Up to max_concurrency shards run in Athena at the same time.
+
+    Each shard is read into its own permissions list, and only merged once it has been read completely. A shard that
+    fails is retried on its own, up to max_retries times, so one failed or timed out shard does not restart the others.
+    If a shard still fails, reading the permissions fails, so no events are silently missed.
+
+    With a query cache, a shard whose query was run recently is read from the cache instead of Athena.
+
+    The concurrency, retries, cache and prepare_query are set by CloudTrailQueryOptions. If prepare_query is given, it
+    is called once before the first query is started, ie to upload a lookup table the query joins on. It is not called
+    if every shard is read from the cache.
+
+    A submitted runner that will not be read, ie because another reader failed, is cancelled, which stops its running
+    Athena queries and does not start or retry any other shard.
+    """
+
+    def __init__(self, athenaQueryReader : AthenaQueryReader, get_sql : Callable[[str], str],
+                 add_permissions : Callable[[PermissionsList, pd.DataFrame], None], options : CloudTrailQueryOptions | None = None):
+        self._options = options or CloudTrailQueryOptions()
+        self._queries = _AthenaQueries(athenaQueryReader, self._options.get_prepare_query())
+        self._get_sql = get_sql
+        self._add_permissions = add_permissions
+        # Query results are converted one chunk at a time, as the readers may use resources that are not thread safe.
+        self._add_permissions_lock = Lock()
+        self._executor : ThreadPoolExecutor | None = None
+        self._futures = {}
+
+    @staticmethod
+    def get_time_ranges(config : dict[str], incremental_state : CloudTrailIncrementalState | None,
+                        now : datetime | None = None, query_cache : CloudTrailQueryCache | None = None) -> list[CloudTrailTimeRange | None]:
+        """Returns the time ranges to query, one per shard. A single None is returned if all events are to be read in a
+        single query. With the query cache of the runner, the window is aligned to its max age."""
+        now = now or datetime.now(timezone.utc)
+        if query_cache is not None and incremental_state is None:
+            # The window is aligned so reruns within the max age of the cache run the same queries.
+            now = query_cache.align(now)
+        shard_count = ConfigHelper.get_config_int(config, "query_shards", 1)
+        lookback_days = ConfigHelper.get_config_int(config, "query_lookback_days")
+        default_start = now - timedelta(days=lookback_days) if lookback_days is not None else None
+
+        if incremental_state is not None:
+            time_range = incremental_state.get_time_range(now, default_start)
+        elif default_start is not None or shard_count > 1:
+            time_range = CloudTrailTimeRange(default_start, now, ConfigHelper.get_config_string(config, "athena_partition_column"),
+                                             ConfigHelper.get_config_string(config, "athena_partition_format", CloudTrailTimeRange.DEFAULT_PARTITION_FORMAT))
+        else:
+            return [None]
+
+        if shard_count <= 1:
+            return [time_range]
+        if time_range.get_start() is None:
+            raise ConfigurationInvalidException("query_lookback_days is required to shard a CloudTrail query without an incremental watermark.")
+        return time_range.split(shard_count)
+
+    def submit(self, time_ranges : list[CloudTrailTimeRange | None]):
+        """Starts the queries of the first max_concurrency shards, and schedules the rest to start as those complete."""
+        max_concurrency = self._options.get_max_concurrency()
+        logger.info(f"Running the CloudTrail query in {len(time_ranges)} shards, {max_concurrency} at a time.")
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        for index, time_range in enumerate(time_ranges):
+            sql = self._get_sql(f"AND {time_range.get_query_predicate()}" if time_range is not None else "")
+            # The first shards are started right away, so their queries are running in Athena once submit returns.
+            query_execution_id = None
+            if index < max_concurrency and not self._is_cached(sql):
+                query_execution_id = self._queries.start(sql)
+            self._futures[self._executor.submit(self._read_shard, time_range, sql, query_execution_id)] = time_range
+
+    def read_permissions(self) -> PermissionsList:
+        """Waits for every shard, and returns their permissions merged."""
+        permissions_list = PermissionsList()
+        try:
+            for future in as_completed(self._futures):
+                shard_permissions = future.result()
+                permissions_list.add_permissions_from_list(shard_permissions)
+                logger.debug(f"Read CloudTrail query shard {self._futures[future]}. Found {shard_permissions.get_permissions_count()} permissions.")
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+        return permissions_list
+
+    def cancel(self):
+        """Stops the running queries, and the shards that have not started yet, without waiting for them."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._queries.cancel()
+
+    def _read_shard(self, time_range : CloudTrailTimeRange | None, sql : str, query_execution_id : str | None) -> PermissionsList:
+        max_retries = self._options.get_max_retries()
+        for attempt in range(max_retries + 1):
+            if self._queries.is_cancelled():
+                break
+            try:
+                return self._read_shard_results(sql, query_execution_id)
+            # Any failure, ie a failed or timed out query, or a failed read of its results, is retried.
+            except Exception as e: # pylint: disable=broad-exception-caught
+                if self._queries.is_cancelled():
+                    break
+                if attempt == max_retries:
+                    logger.error(f"CloudTrail query shard {time_range} failed after {attempt + 1} attempts: {e}")
+                    raise
+                logger.warning(f"CloudTrail query shard {time_range} failed, retrying ({attempt + 1}/{max_retries}): {e}")
+                query_execution_id = None
+        raise CancelledError(f"CloudTrail query shard {time_range} was cancelled.")
+
+    def _read_shard_results(self, sql : str, query_execution_id : str | None) -> PermissionsList:
+        query_cache = self._options.get_query_cache()
+        if self._is_cached(sql):
+            results = query_cache.read(sql)
+        else:
+            if query_execution_id is None:
+                query_execution_id = self._queries.start(sql)
+            results = self._queries.read_results(query_execution_id)
+            if query_cache is not None:
+                results = query_cache.write(sql, results)
+        shard_permissions = PermissionsList()
+        # Each chunk is folded into the permissions list and released before the next one is read.
+        for results_df in results:
+            with self._add_permissions_lock:
+                self._add_permissions(shard_permissions, results_df)
+        return shard_permissions
+
+    def _is_cached(self, sql : str) -> bool:
+        query_cache = self._options.get_query_cache()
+        return query_cache is not None and query_cache.contains(sql)
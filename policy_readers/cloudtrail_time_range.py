@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+class CloudTrailTimeRange:
+    """A range of CloudTrail event times, from after start up to and including end, and the SQL predicate that selects
+    the events in it. Without a start, the range includes every event up to end.
+
+    If a partition column is given, ie the "timestamp" column of a CloudTrail table with partition projection, the
+    predicate is also bound to the partitions of the range, so Athena only scans those partitions. The partition format
+    uses the same tokens as partition projection, ie yyyy/MM/dd.
+    """
+
+    DEFAULT_PARTITION_FORMAT : str = "yyyy/MM/dd"
+    EVENT_TIME_FORMAT : str = "%Y-%m-%dT%H:%M:%SZ"
+
+    _PARTITION_FORMAT_TOKENS : dict[str, str] = {"yyyy": "%Y", "MM": "%m", "dd": "%d", "HH": "%H"}
+
+    def __init__(self, start : datetime | None, end : datetime, partition_column : str | None = None,
+                 partition_format : str = DEFAULT_PARTITION_FORMAT):
+        self._start = start
+        self._end = end
+        self._partition_column = partition_column
+        self._partition_format = partition_format
+
+    def get_start(self) -> datetime | None:
+        return self._start
+
+    def get_end(self) -> datetime:
+        return self._end
+
+    def get_query_predicate(self) -> str:
+        predicates = [f"eventtime <= '{self._end.strftime(CloudTrailTimeRange.EVENT_TIME_FORMAT)}'"]
+        if self._start is not None:
+            predicates.insert(0, f"eventtime > '{self._start.strftime(CloudTrailTimeRange.EVENT_TIME_FORMAT)}'")
+        if self._partition_column is not None:
+            # The partition column is a string, ie 2024/01/31, so it is compared as a string.
+            predicates.append(f"\"{self._partition_column}\" <= '{self.format_partition(self._end)}'")
+            if self._start is not None:
+                predicates.append(f"\"{self._partition_column}\" >= '{self.format_partition(self._start)}'")
+        return " AND ".join(predicates)
+
+    def format_partition(self, time : datetime) -> str:
+        partition_format = self._partition_format
+        for token, strftime_token in CloudTrailTimeRange._PARTITION_FORMAT_TOKENS.items():
+            partition_format = partition_format.replace(token, strftime_token)
+        return time.strftime(partition_format)
+
+    def split(self, count : int) -> list["CloudTrailTimeRange"]:
+        """Splits the range into count consecutive ranges of about the same length. The boundaries are whole seconds, as
+        CloudTrail event times are, so every event is in exactly one of the ranges."""
+        if self._start is None:
+            raise ValueError("A time range without a start cannot be split.")
+
+        seconds = int((self._end - self._start).total_seconds())
+        boundaries = sorted({self._start + timedelta(seconds=seconds * index // max(count, 1)) for index in range(max(count, 1))})
+        boundaries.append(self._end)
+        return [CloudTrailTimeRange(start, end, self._partition_column, self._partition_format)
+                for start, end in zip(boundaries, boundaries[1:])]
+
+    def __str__(self) -> str:
+        return f"({self._start}, {self._end}]"
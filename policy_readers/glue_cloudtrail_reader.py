@@ -1,10 +1,17 @@
 from permissions.permissions_list import PermissionsList
 from policy_readers.policy_reader_interface import PolicyReaderInterface
 from config.application_configuration import ApplicationConfiguration
+from config.config_helper import ConfigHelper
 from config.configuration_exceptions import ConfigurationInvalidException
+from aws_resources.readers.athena_query_reader import AthenaQueryReader
+from policy_readers.cloudtrail_incremental_state import CloudTrailIncrementalState
+from policy_readers.cloudtrail_query_options import CloudTrailQueryOptions
+from policy_readers.cloudtrail_query_runner import CloudTrailQueryRunner
+from policy_readers.cloudtrail_arrow_ingestion import CloudTrailArrowIngestion
 
-import awswrangler as wr
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import boto3
 
 import logging
@@ -33,13 +40,52 @@ class GlueEventCloudTrailPolicyReader(PolicyReaderInterface):
     def __init__(self, appConfig : ApplicationConfiguration, conf : dict[str]):
         super().__init__(appConfig, conf)
         self._boto3_session : boto3.Session = appConfig.get_boto3_session()
+        self._incremental_state : CloudTrailIncrementalState | None = None
+        self._query_runner : CloudTrailQueryRunner | None = None
 
-    def read_policies(self) -> PermissionsList:
-        """This function reads policies from CloudTrail by executing an Athena query. """
+    def submit(self) -> bool:
+        """Starts the Athena query without waiting for it, so it runs while the other readers are read. """
         self._validate_application_conf()
+        logger.info("Starting the CloudTrail query for Glue Data Catalog access.")
+        # In incremental mode, only the events since the previous run are read, and merged into its permissions.
+        self._incremental_state = CloudTrailIncrementalState.create(self._config)
+
+        # With Arrow ingestion, the results are read as Arrow arrays and converted without pandas operations on strings.
+        arrow_ingestion = ConfigHelper.get_config_boolean(self._config, "athena_arrow_ingestion")
+        athenaQueryReader = AthenaQueryReader(self._boto3_session, self._config["athena_workgroup"],
+                                              self._config["athena_cloudtrail_database"], self._config["athena_query_results_location"],
+                                              ConfigHelper.get_config_int(self._config, "athena_chunk_size"),
+                                              ConfigHelper.get_config_boolean(self._config, "athena_unload_approach"),
+                                              arrow_ingestion)
+        # The query is run as a single query, or as shards of the lookback window if query_shards is configured.
+        queryOptions = CloudTrailQueryOptions.create(self._config)
+        self._query_runner = CloudTrailQueryRunner(athenaQueryReader, self._get_sql,
+                                                   self._add_arrow_permissions if arrow_ingestion else self._add_permissions, queryOptions)
+        self._query_runner.submit(CloudTrailQueryRunner.get_time_ranges(self._config, self._incremental_state,
+                                                                        query_cache=queryOptions.get_query_cache()))
+        return True
+
+    def cancel(self):
+        """Stops the Athena queries started by submit, if any. """
+        if self._query_runner is not None:
+            self._query_runner.cancel()
+
+    def read_policies(self) -> PermissionsList:
+        """This function reads policies from CloudTrail by executing an Athena query. If the query was not submitted already, it is started now. """
+        if self._query_runner is None:
+            self.submit()
         logger.info("Reading policies from CloudTrail from Glue Data Catalog access.")
 
-        sql = f"""WITH cloudtrail as (
+        # Columns: user_arn, eventname, permission, resource_level, resource, database_name, table_name
+        permissions_list = self._query_runner.read_permissions()
+
+        if self._incremental_state is not None:
+            return self._incremental_state.save(permissions_list)
+        return permissions_list
+
+    def _get_sql(self, time_predicate : str) -> str:
+        """Returns the query, with the time predicate of a shard, ie "AND eventtime > ...", or an empty one."""
+        return f"""WITH cloudtrail as (
                 SELECT *, 
                     CASE
                         WHEN eventname in ('CreateDatabase', 'GetDatabases') THEN 'CATALOG'
@@ -83,6 +129,7 @@ class GlueEventCloudTrailPolicyReader(PolicyReaderInterface):
                     and errorcode IS NULL
                     -- We only support these useridentity types for now
                     and useridentity.type in ('IAMUser', 'AssumedRole')
+                    {time_predicate}
                 )
                 SELECT DISTINCT
                     CASE WHEN useridentity.type = 'IAMUser' THEN useridentity.arn
@@ -137,55 +184,73 @@ class GlueEventCloudTrailPolicyReader(PolicyReaderInterface):
                     cloudtrail
                 """
 
-        logger.debug(f"Running query: {sql}")
-
-        try:
-            results_df = wr.athena.read_sql_query(
-                    sql,
-                    database=self._config["athena_cloudtrail_database"],
-                    ctas_approach=False,
-                    s3_output=self._config["athena_query_results_location"],
-                    boto3_session=self._boto3_session,
-                    workgroup=self._config["athena_workgroup"]
-            )
-        except Exception as e:
-            logger.error(f"Was not able to run Athena Query with SQL: {sql} with error: {e}")
-            raise e
+    def _add_permissions(self, permissions_list : PermissionsList, results_df : pd.DataFrame):
+        """Converts the query results to permissions with columnar operations, and adds them to the permissions list
+        grouped by principal and resource."""
+        results_df = results_df.reset_index(drop=True)
+        valid = results_df[['resource_level', 'user_arn', 'awsRegion', 'aws_account_id', 'eventname']].notna().all(axis=1)
+        has_database = results_df['database_name'].notna()
+        has_table = has_database & results_df['table_name'].notna()
+        resource_level = results_df['resource_level']
 
-        # Columns: user_arn, eventname, permission, resource_level, resource, database_name, table_name
-        permissions_list = PermissionsList()
-
-        for _, row in results_df.iterrows():
-            if self._has_nulls(row, row['resource_level'], row['user_arn'], ['awsRegion'], row['aws_account_id'], row['eventname']):
-                continue
-            if row['resource_level'] == 'CATALOG':
-                permissions_list.add_permission(
-                    row['user_arn'],
-                    f"arn:aws:glue:{row['awsRegion']}:{row['aws_account_id']}:catalog",
-                    f"glue:{row['eventname']}"
-                )
-            elif row['resource_level'] == 'DATABASE':
-                if self._has_nulls(row, row['database_name']):
-                    continue
-                # Permission on the database
-                permissions_list.add_permission(
-                    row['user_arn'],
-                    f"arn:aws:glue:{row['awsRegion']}:{row['aws_account_id']}:database/{row['database_name']}",
-                    f"glue:{row['eventname']}"
-                )
-            elif row['resource_level'] == 'TABLE':
-                if self._has_nulls(row, row['database_name'], row['table_name']):
-                    continue
-                permissions_list.add_permission(
-                    row['user_arn'],
-                    f"arn:aws:glue:{row['awsRegion']}:{row['aws_account_id']}:table/{row['database_name']}/{row['table_name']}",
-                    f"glue:{row['eventname']}"
-                )
-            else:
-                logger.warning(f"Unknown resource type: {row['resource']}")
-                continue
+        catalogs = valid & (resource_level == 'CATALOG')
+        databases = valid & (resource_level == 'DATABASE') & has_database
+        tables = valid & (resource_level == 'TABLE') & has_table
+        unknown = valid & ~resource_level.isin(['CATALOG', 'DATABASE', 'TABLE'])
+        skipped = len(results_df) - int(catalogs.sum() + databases.sum() + tables.sum() + unknown.sum())
+        if unknown.any():
+            logger.warning(f"Unknown resource types: {results_df.loc[unknown, 'resource'].unique().tolist()}")
+        if skipped:
+            logger.debug(f"Skipped {skipped} rows with unexpected null values.")
 
-        return permissions_list
+        arn_prefix = "arn:aws:glue:" + results_df['awsRegion'].astype(str) + ":" + results_df['aws_account_id'].astype(str) + ":"
+        resource_arns = pd.concat([
+            arn_prefix[catalogs] + "catalog",
+            arn_prefix[databases] + "database/" + results_df.loc[databases, 'database_name'].astype(str),
+            arn_prefix[tables] + "table/" + results_df.loc[tables, 'database_name'].astype(str) + "/" + results_df.loc[tables, 'table_name'].astype(str),
+        ])
+
+        permissions = pd.DataFrame({
+            'principal_arn': results_df.loc[resource_arns.index, 'user_arn'].astype(str),
+            'resource_arn': resource_arns,
+            'action': "glue:" + results_df.loc[resource_arns.index, 'eventname'].astype(str),
+        }).drop_duplicates()
+        actions = permissions.groupby(['principal_arn', 'resource_arn'], sort=False)['action'].unique()
+        permissions_list.add_permissions((principal_arn, resource_arn, resource_actions)
+                                         for (principal_arn, resource_arn), resource_actions in actions.items())
+
+    def _add_arrow_permissions(self, permissions_list : PermissionsList, results_df : pd.DataFrame):
+        """Converts the query results to permissions with Arrow compute functions, see CloudTrailArrowIngestion, and
+        adds them to the permissions list grouped by principal and resource."""
+        table = CloudTrailArrowIngestion.to_table(results_df, ['user_arn', 'eventname', 'resource_level', 'resource',
+                                                               'awsRegion', 'aws_account_id', 'database_name', 'table_name'])
+        columns = {name: CloudTrailArrowIngestion.get_string_column(table, name) for name in table.column_names}
+        resource_level = columns['resource_level']
+
+        # The ARN of each row is null if any of its values are null, so those rows are skipped.
+        catalog_arn = pc.binary_join_element_wise("arn:aws:glue", columns['awsRegion'], columns['aws_account_id'], "catalog", ":")
+        database_arn = pc.binary_join_element_wise("arn:aws:glue", columns['awsRegion'], columns['aws_account_id'],
+                                                   pc.binary_join_element_wise("database", columns['database_name'], "/"), ":")
+        table_arn = pc.binary_join_element_wise("arn:aws:glue", columns['awsRegion'], columns['aws_account_id'],
+                                                pc.binary_join_element_wise("table", columns['database_name'], columns['table_name'], "/"), ":")
+        resource_arns = pc.case_when(pc.make_struct(pc.equal(resource_level, "CATALOG"), pc.equal(resource_level, "DATABASE"),
+                                                    pc.equal(resource_level, "TABLE")),
+                                     catalog_arn, database_arn, table_arn)
+
+        principal_arns = columns['user_arn']
+        eventnames = columns['eventname']
+        valid = pc.and_(pc.and_(pc.is_valid(resource_arns), pc.is_valid(principal_arns)), pc.is_valid(eventnames))
+        unknown = pc.and_(pc.and_(pc.is_valid(catalog_arn), pc.is_valid(resource_level)),
+                          pc.and_(pc.is_valid(principal_arns), pc.is_valid(eventnames)))
+        unknown = pc.and_(unknown, pc.invert(pc.is_in(resource_level, pa.array(['CATALOG', 'DATABASE', 'TABLE']))))
+        if pc.any(unknown).as_py():
+            logger.warning(f"Unknown resource types: {pc.unique(pc.filter(columns['resource'], unknown)).to_pylist()}")
+        skipped = len(valid) - (pc.sum(valid).as_py() or 0) - (pc.sum(unknown).as_py() or 0)
+        if skipped:
+            logger.debug(f"Skipped {skipped} rows with unexpected null values.")
+
+        CloudTrailArrowIngestion.add_permissions(permissions_list, pc.filter(principal_arns, valid), pc.filter(resource_arns, valid),
+                                                 pc.binary_join_element_wise("glue:", pc.filter(eventnames, valid), ""))
 
     def _validate_application_conf(self):
         for key in self._REQUIRED_CONFIGURATION:
@@ -205,11 +270,3 @@ class GlueEventCloudTrailPolicyReader(PolicyReaderInterface):
     @classmethod
     def get_config_section(cls) -> str:
         return GlueEventCloudTrailPolicyReader._CONFIGURATION_SECTION
-
-    def _has_nulls(self, row, *values):
-        for item in values:
-            if pd.isna(item):
-                with pd.option_context('expand_frame_repr', False):
-                    logger.debug(f"---------------------> Found unexpected null value in row: \n{row}")
-                return True
-        return False
@@ -21,8 +21,10 @@ class IamPolicyParser:
     Limitation: We do not support NotResource. Only Resource in Policies.
     """
     def __init__(self, appConfig : ApplicationConfiguration):
+        self._app_config = appConfig
         self._glue_data_catalog : GlueDataCatalog = appConfig.get_glue_data_catalog()
-        self._s3_to_table_mapper : S3ToTableMapper = appConfig.get_s3_to_table_translator()
+        # The S3 to table mapper reads every table in the catalog, so only create it once an S3 resource is seen.
+        self._s3_to_table_mapper : S3ToTableMapper | None = None
         self._iam_policy_reader : IamPolicyReader = appConfig.get_iam_policy_reader()
 
     def read_iam_principal_allow_policies(self, permissionsList : PermissionsList, principal : str, policy : dict[str | dict]) -> PermissionsList:
@@ -140,7 +142,10 @@ class IamPolicyParser:
     def _filter_resource(self, glue_resources : list[str], s3_resources : list[str], resource : str):
         if AwsArnUtils.isS3Arn(resource):
             if resource.endswith("*"):
-                tables = self._s3_to_table_mapper.get_all_tables_from_s3_arn_prefix(resource[:-1])
+                if "*" in resource[:-1] or "?" in resource[:-1]:
+                    tables = self._get_s3_to_table_mapper().get_all_tables_matching_s3_arn_pattern(resource)
+                else:
+                    tables = self._get_s3_to_table_mapper().get_all_tables_from_s3_arn_prefix(resource[:-1])
                 logger.debug(f"Resource is {resource} : Tables: {[table.get_database() + ":" + table.get_name() + ":" + table.get_location() for table in tables]}")
                 s3_resources.extend([AwsArnUtils.get_s3_arn_from_s3_path(table.get_location()) + "*" for table in tables if table.get_location()])
         elif AwsArnUtils.isGlueArn(resource):
@@ -156,24 +161,23 @@ class IamPolicyParser:
                 database = glueTable.get_database()
                 table = glueTable.get_name()
                 logger.debug(f"Catalog_id: {catalog_id} Database: {database} Table: {table}")
-                tables = self._glue_data_catalog.get_resources_by_wildcard(catalog_id, database, table)
-                glue_resources.extend([table.get_arn() for table in tables])
+                glue_resources.extend(self._glue_data_catalog.get_arns_by_wildcard(catalog_id, database, table))
             elif isinstance(awsObject, GlueDatabase):
                 logger.debug(f"Is Glue Database: {resource}")
                 database = awsObject.get_name()
-                databases = self._glue_data_catalog.get_resources_by_wildcard(catalog_id, database)
-                glue_resources.extend([database.get_arn() for database in databases])
+                glue_resources.extend(self._glue_data_catalog.get_arns_by_wildcard(catalog_id, database))
             elif isinstance(awsObject, GlueCatalog):
                 logger.debug(f"Is Glue Catalog: {resource}")
-                catalogs = self._glue_data_catalog.get_resources_by_wildcard(catalog_id)
-                glue_resources.extend([catalog.get_arn() for catalog in catalogs])
+                glue_resources.extend(self._glue_data_catalog.get_arns_by_wildcard(catalog_id))
         elif resource == "*":
-            catalogs = self._glue_data_catalog.get_resources_by_wildcard("*")
-            tables = self._glue_data_catalog.get_resources_by_wildcard("*", "*", "*")
-            databases = self._glue_data_catalog.get_resources_by_wildcard("*", "*")
-            glue_resources.extend([catalog.get_arn() for catalog in catalogs])
-            glue_resources.extend([database.get_arn() for database in databases])
-            glue_resources.extend([table.get_arn() for table in tables])
+            glue_resources.extend(self._glue_data_catalog.get_arns_by_wildcard("*"))
+            glue_resources.extend(self._glue_data_catalog.get_arns_by_wildcard("*", "*"))
+            glue_resources.extend(self._glue_data_catalog.get_arns_by_wildcard("*", "*", "*"))
+
+    def _get_s3_to_table_mapper(self) -> S3ToTableMapper:
+        if self._s3_to_table_mapper is None:
+            self._s3_to_table_mapper = self._app_config.get_s3_to_table_translator()
+        return self._s3_to_table_mapper
 
     def _filter_actions(self, actions) -> tuple[list[str], list[str]]:
         glue_actions : list[str] = []
@@ -16,7 +16,8 @@ class IamPolicyPermissionsReader(PolicyReaderInterface):
     Reads IAM policies and returns a list of permissions from it.
 
     LIMITATIONS:
-    - Wildcards in the S3 path that are not at the end ie s3://bucket/somelocation/*/someotherlocation/ is not currently supported
+    - Wildcards in the middle of an S3 path ie s3://bucket/somelocation/*/someotherlocation/* are only supported when the path
+      ends with a wildcard, and only tables whose whole location matches the path are included.
     '''
 
     _REQUIRED_CONFIGURATION = { }
@@ -8,6 +8,21 @@ class PolicyReaderInterface:
         self._appConfig = applicationConfig
         self._config = config
 
+    def submit(self) -> bool:
+        '''
+        Optionally starts any long running work, ie an Athena query, without waiting for it to complete. This is called
+        for every enabled reader before read_policies is called on any of them, so the work of several readers overlaps.
+        Returns True if work was started, so the reader is read after the readers that did not start any work.
+        '''
+        return False
+
+    def cancel(self):
+        '''
+        Stops any work started by submit, without waiting for it. This is called for every reader that was submitted
+        once the readers are read, including when reading one of them failed, so work that will not be read does not
+        keep running. It must do nothing for a reader that was read already.
+        '''
+
     def read_policies(self) -> PermissionsList:
         '''
         Reads policies and returns a PermissionsList. All Actions need to be IAM actions, ie "<service>:<action>", and 
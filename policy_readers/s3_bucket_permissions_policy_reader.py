@@ -14,7 +14,8 @@ class S3BucketPermissionsPolicyReader(PolicyReaderInterface):
         is explicity allowed to access the S3 bucket. 
 
             LIMITATIONS:
-    - Wildcards in the S3 path that are not at the end ie s3://bucket/somelocation/*/someotherlocation/ is not currently supported
+    - Wildcards in the middle of an S3 path ie s3://bucket/somelocation/*/someotherlocation/* are only supported when the path
+      ends with a wildcard, and only tables whose whole location matches the path are included.
     '''
 
     #_REQUIRED_CONFIGURATION = { "include_cross_account_permissions" : "A boolean that determines if we should add LF permissions to cross account principals." }
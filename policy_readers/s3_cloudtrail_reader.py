@@ -2,13 +2,20 @@
 
 from policy_readers.policy_reader_interface import PolicyReaderInterface
 from permissions.permissions_list import PermissionsList
-from permissions.permissions_list import PermissionRecord
 
 from config.application_configuration import ApplicationConfiguration
+from config.config_helper import ConfigHelper
 from config.configuration_exceptions import ConfigurationInvalidException
+from aws_resources.readers.athena_query_reader import AthenaQueryReader
+from policy_readers.cloudtrail_incremental_state import CloudTrailIncrementalState
+from policy_readers.cloudtrail_query_options import CloudTrailQueryOptions
+from policy_readers.cloudtrail_query_runner import CloudTrailQueryRunner
+from policy_readers.cloudtrail_arrow_ingestion import CloudTrailArrowIngestion
+from policy_readers.s3_table_location_lookup import S3TableLocationLookup
 
-import awswrangler as wr
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 import logging
 logger = logging.getLogger(__name__)
@@ -30,20 +37,77 @@ class S3CloudTrailDataEventsReader(PolicyReaderInterface):
 
     _CONFIGURATION_SECTION : str = "policy_reader_s3_event_cloudtrail"
 
+    _DEFAULT_TABLE_LOOKUP_NAME : str = "lf_migration_s3_table_locations"
+
     def __init__(self, appConfig : ApplicationConfiguration, conf : dict[str]):
         assert appConfig is not None
         super().__init__(appConfig, conf)
 
         self._boto3_session = appConfig.get_boto3_session()
         self._s3_to_table_mapper = appConfig.get_s3_to_table_translator()
+        self._incremental_state : CloudTrailIncrementalState | None = None
+        self._query_runner : CloudTrailQueryRunner | None = None
+        self._table_lookup : S3TableLocationLookup | None = None
 
-    def read_policies(self) -> PermissionsList:
-        """This function reads policies from CloudTrail by executing an Athena query for S3 Data Events. """
+    def submit(self) -> bool:
+        """Starts the Athena query without waiting for it, so it runs while the other readers are read. """
         self._validate_application_conf()
+        logger.info("Starting the CloudTrail query for S3 access.")
+        # In incremental mode, only the events since the previous run are read, and merged into its permissions.
+        self._incremental_state = CloudTrailIncrementalState.create(self._config)
+
+        # With the table lookup, the S3 paths are resolved to table locations in the query itself, so only the table
+        # locations that were accessed are returned rather than every S3 path. The lookup table is only uploaded once a
+        # query is started, so nothing is written if every query is read from the query cache.
+        if ConfigHelper.get_config_boolean(self._config, "athena_table_lookup"):
+            self._table_lookup = S3TableLocationLookup(self._boto3_session, self._config["athena_cloudtrail_database"],
+                                                       ConfigHelper.get_config_string(self._config, "athena_table_lookup_name", self._DEFAULT_TABLE_LOOKUP_NAME),
+                                                       ConfigHelper.get_config_string(self._config, "athena_table_lookup_location",
+                                                                                      self._config["athena_query_results_location"].rstrip("/") + "/table_locations/"),
+                                                       self._s3_to_table_mapper)
+
+        # With Arrow ingestion, the results are read as Arrow arrays and converted without pandas operations on strings.
+        arrow_ingestion = ConfigHelper.get_config_boolean(self._config, "athena_arrow_ingestion")
+        athenaQueryReader = AthenaQueryReader(self._boto3_session, self._config["athena_workgroup"],
+                                              self._config["athena_cloudtrail_database"], self._config["athena_query_results_location"],
+                                              ConfigHelper.get_config_int(self._config, "athena_chunk_size"),
+                                              ConfigHelper.get_config_boolean(self._config, "athena_unload_approach"),
+                                              arrow_ingestion)
+        # The query is run as a single query, or as shards of the lookback window if query_shards is configured.
+        queryOptions = CloudTrailQueryOptions.create(self._config, self._table_lookup.upload if self._table_lookup is not None else None)
+        self._query_runner = CloudTrailQueryRunner(athenaQueryReader, self._get_sql,
+                                                   self._add_arrow_permissions if arrow_ingestion else self._add_permissions, queryOptions)
+        self._query_runner.submit(CloudTrailQueryRunner.get_time_ranges(self._config, self._incremental_state,
+                                                                        query_cache=queryOptions.get_query_cache()))
+        return True
+
+    def cancel(self):
+        """Stops the Athena queries started by submit, if any. """
+        if self._query_runner is not None:
+            self._query_runner.cancel()
+
+    def read_policies(self) -> PermissionsList:
+        """This function reads policies from CloudTrail by executing an Athena query for S3 Data Events. If the query was not submitted already, it is started now. """
+        if self._query_runner is None:
+            self.submit()
         logger.info("Reading policies from CloudTrail for S3 access.")
 
-        sql = f"""WITH
-                    cloudtrail AS (
+        # Columns: principal_arn, s3_path, events
+        permissions_list = self._query_runner.read_permissions()
+
+        if self._incremental_state is not None:
+            return self._incremental_state.save(permissions_list)
+        return permissions_list
+
+    def _get_sql(self, time_predicate : str) -> str:
+        """Returns the query, with the time predicate of a shard, ie "AND eventtime > ...", or an empty one."""
+        return f"""WITH
+                    {self._get_cloudtrail_sql(time_predicate)}
+                    {self._get_aggregation_sql()}
+                """
+
+    def _get_cloudtrail_sql(self, time_predicate : str) -> str:
+        return f"""cloudtrail AS (
                         SELECT 
                             CASE WHEN useridentity.type = 'IAMUser' THEN
                                     useridentity.arn
@@ -68,55 +132,99 @@ class S3CloudTrailDataEventsReader(PolicyReaderInterface):
                         WHERE eventname in ('GetObject','HeadObject','PutObject','CreateMultipartUpload', 'UploadPart','UploadPartCopy','DeleteObject')
                             AND errorcode IS NULL
                             AND requestparameters NOT LIKE '%.hive-staging_%'
+                            {time_predicate}
                         GROUP BY 1, 2, 3
-                        )
-                    SELECT
+                        )"""
+
+    def _get_aggregation_sql(self) -> str:
+        if self._table_lookup is None:
+            return """SELECT
                         principal_arn,
                         s3_path,
                         array_distinct(array_agg(eventname)) as events
                     FROM
                         cloudtrail
                     where principal_arn is not null
-                    GROUP BY 1, 2
-                """
-
-        logger.debug(f"Running query: {sql}")
-
-        try:
-            results_df = wr.athena.read_sql_query(
-                    sql,
-                    database=self._config["athena_cloudtrail_database"],
-                    ctas_approach=False,
-                    s3_output=self._config["athena_query_results_location"],
-                    boto3_session=self._boto3_session,
-                    workgroup=self._config["athena_workgroup"]
-            )
-        except Exception as e:
-            logger.error(f"Was not able to run Athena Query with SQL: {sql} Exception: {e}")
-            raise
-
-        # Columns: user_arn, eventname, permission, resource_level, resource, database_name, table_name
-        permissions_list = PermissionsList()
-
-        for _, row in results_df.iterrows():
-            if self._has_nulls(row, row['principal_arn'], row['s3_path']):
-                logger.error(f"Found unexpected null value in either ARN or S3 Path row: {row}")
-                continue
-
-            # Filter out any s3 locations that do not map to a Glue Table.
-            tables = self._s3_to_table_mapper.get_tables_from_s3_location_postfix(row['s3_path'])
-            if not tables:
-                logger.debug(f"S3 Location {row['s3_path']} doesn't have any glue tables.")
-                continue
-
-            permission_record = PermissionRecord(
-                    row['principal_arn'],
-                    row["s3_path"],
-                    self._parse_events(row['events'])
-                )
-            logger.debug(f"Adding permission record for table: {permission_record}")
-            permissions_list.add_permission_record(permission_record)
-        return permissions_list
+                    GROUP BY 1, 2"""
+
+        # Each S3 path is joined to the table locations in its bucket that it starts with, and the longest one, ie the
+        # most specific table, is kept. The events are then rolled up to that table location.
+        return f""", table_paths AS (
+                        SELECT
+                            cloudtrail.principal_arn,
+                            cloudtrail.eventname,
+                            max_by(table_locations.location, length(table_locations.location)) as s3_path
+                        FROM
+                            cloudtrail
+                            JOIN \"{self._table_lookup.get_database()}\".\"{self._table_lookup.get_table()}\" table_locations
+                                ON table_locations.bucket = split_part(substr(cloudtrail.s3_path, 14), '/', 1)
+                                AND starts_with(cloudtrail.s3_path, table_locations.location)
+                        WHERE cloudtrail.principal_arn is not null
+                        GROUP BY cloudtrail.principal_arn, cloudtrail.eventname, cloudtrail.s3_path
+                        )
+                    SELECT
+                        principal_arn,
+                        s3_path,
+                        array_distinct(array_agg(eventname)) as events
+                    FROM
+                        table_paths
+                    GROUP BY 1, 2"""
+
+    def _add_permissions(self, permissions_list : PermissionsList, results_df : pd.DataFrame):
+        """Converts the query results to permissions with columnar operations, and adds them to the permissions list
+        grouped by principal and S3 path."""
+        results_df = results_df.reset_index(drop=True)
+        valid = results_df['principal_arn'].notna() & results_df['s3_path'].notna()
+        if not valid.all():
+            logger.error(f"Found {int((~valid).sum())} rows with unexpected null values in either ARN or S3 Path.")
+        results_df = results_df[valid]
+
+        # Filter out any s3 locations that do not map to a Glue Table. Each distinct location is only looked up once.
+        has_tables = {s3_path: bool(self._s3_to_table_mapper.get_tables_from_s3_arn_postfix(s3_path))
+                      for s3_path in results_df['s3_path'].unique()}
+        logger.debug(f"S3 Locations without any glue tables: {[s3_path for s3_path, found in has_tables.items() if not found]}")
+        results_df = results_df[results_df['s3_path'].map(has_tables).astype(bool)]
+
+        # events is a list when the results are read from Parquet, or an array formatted as a string, ie
+        # "[GetObject, PutObject]", when they are read as CSV.
+        events = results_df['events']
+        is_text = events.map(lambda value: isinstance(value, str))
+        if is_text.any():
+            events = pd.concat([events[is_text].str.strip("[]").str.split(","), events[~is_text]])
+        events = events.explode().str.strip()
+        events = events[events.notna() & (events != "")]
+        permissions = pd.DataFrame({
+            'principal_arn': results_df.loc[events.index, 'principal_arn'].astype(str),
+            'resource_arn': results_df.loc[events.index, 's3_path'].astype(str),
+            'action': "s3:" + events,
+        }).drop_duplicates()
+        actions = permissions.groupby(['principal_arn', 'resource_arn'], sort=False)['action'].unique()
+        permissions_list.add_permissions((principal_arn, resource_arn, resource_actions)
+                                         for (principal_arn, resource_arn), resource_actions in actions.items())
+
+    def _add_arrow_permissions(self, permissions_list : PermissionsList, results_df : pd.DataFrame):
+        """Converts the query results to permissions with Arrow compute functions, see CloudTrailArrowIngestion, and
+        adds them to the permissions list grouped by principal and S3 path."""
+        table = CloudTrailArrowIngestion.to_table(results_df, ['principal_arn', 's3_path', 'events'])
+        principal_arns = CloudTrailArrowIngestion.get_string_column(table, 'principal_arn')
+        s3_paths = pc.dictionary_encode(CloudTrailArrowIngestion.get_string_column(table, 's3_path'))
+        valid = pc.and_(pc.is_valid(principal_arns), pc.is_valid(s3_paths))
+        invalid_count = len(valid) - (pc.sum(valid).as_py() or 0)
+        if invalid_count:
+            logger.error(f"Found {invalid_count} rows with unexpected null values in either ARN or S3 Path.")
+
+        # Filter out any s3 locations that do not map to a Glue Table. Each distinct location is only looked up once.
+        distinct_s3_paths = s3_paths.dictionary.to_pylist()
+        has_tables = [bool(self._s3_to_table_mapper.get_tables_from_s3_arn_postfix(s3_path)) for s3_path in distinct_s3_paths]
+        logger.debug(f"S3 Locations without any glue tables: {[s3_path for s3_path, found in zip(distinct_s3_paths, has_tables) if not found]}")
+        valid = pc.and_(valid, pc.fill_null(pc.take(pa.array(has_tables, pa.bool_()), s3_paths.indices), False))
+
+        events, row_indices = CloudTrailArrowIngestion.flatten_events(table.column('events').combine_chunks())
+        valid_events = pc.take(valid, row_indices)
+        events, row_indices = pc.filter(events, valid_events), pc.filter(row_indices, valid_events)
+        CloudTrailArrowIngestion.add_permissions(permissions_list, pc.take(principal_arns, row_indices),
+                                                 pc.take(s3_paths.dictionary_decode(), row_indices),
+                                                 pc.binary_join_element_wise("s3:", events, ""))
 
     def _validate_application_conf(self):
         for key in self._REQUIRED_CONFIGURATION:
@@ -136,18 +244,3 @@ class S3CloudTrailDataEventsReader(PolicyReaderInterface):
     @classmethod
     def get_config_section(cls) -> str:
         return S3CloudTrailDataEventsReader._CONFIGURATION_SECTION
-
-    def _has_nulls(self, row, *values):
-        for item in values:
-            if pd.isna(item):
-                with pd.option_context('expand_frame_repr', False):
-                    logger.debug(f"---------------------> Found unexpected null value in row: \n{row}")
-                return True
-        return False
-
-    def _parse_events(self, events):
-        """Parses the events from a CloudTrail row. """
-        events = events[1:-1]
-        events = events.split(',')
-        events = {f"s3:{event.strip()}" for event in events}
-        return events
@@ -0,0 +1,61 @@
+from lakeformation_utils.s3_to_table_mapper import S3ToTableMapper
+from lakeformation_utils.s3_location_index import S3LocationIndex
+
+import awswrangler as wr
+import boto3
+import hashlib
+import pandas as pd
+
+import logging
+logger = logging.getLogger(__name__)
+
+class S3TableLocationLookup:
+    """Uploads the S3 locations of the Glue tables, ie the locations of S3ToTableMapper, as a small Athena table, so a
+    CloudTrail query can join S3 data events to table locations in Athena rather than returning every S3 path.
+
+    The table has the columns bucket and location, where location is an S3 ARN ending with a "/", ie
+    arn:aws:s3:::bucket/database/table/, the same format as the S3 paths of the CloudTrail query. It is written as
+    Parquet.
+
+    The table name and S3 location end with a hash of the locations, so runs with the same tables share one table, and
+    runs with different tables, ie different filters, never replace a table another run is querying. An existing table
+    is not written again. The tables are left in place for later runs, and can be dropped once the migration is done.
+    """
+
+    def __init__(self, boto3Session : boto3.Session, database : str, table_prefix : str, s3_location_prefix : str,
+                 s3_to_table_mapper : S3ToTableMapper | S3LocationIndex):
+        self._boto3Session = boto3Session
+        self._database = database
+        self._locations = sorted({"arn:aws:s3:::" + location[len("s3://"):] for location, _ in s3_to_table_mapper.get_location_entries()})
+        self._version = hashlib.sha256("\n".join(self._locations).encode("utf-8")).hexdigest()[:16]
+        self._table = f"{table_prefix}_{self._version}"
+        self._s3_location = f"{s3_location_prefix.rstrip('/')}/{self._version}/"
+
+    def upload(self) -> int:
+        """Creates the lookup table if it does not exist yet, and returns the number of locations."""
+        if wr.catalog.does_table_exist(database=self._database, table=self._table, boto3_session=self._boto3Session):
+            logger.info(f"Using the existing table locations in \"{self._database}\".\"{self._table}\".")
+            return len(self._locations)
+
+        locations_df = pd.DataFrame({
+            "bucket": [location[len("arn:aws:s3:::"):].split("/", 1)[0] for location in self._locations],
+            "location": self._locations,
+        }, dtype="string")
+
+        # Appended rather than overwritten, so a run creating the same table at the same time does not delete the files
+        # another run is reading. Duplicate rows do not change the results of the join.
+        wr.s3.to_parquet(df=locations_df, path=self._s3_location, dataset=True, mode="append",
+                         database=self._database, table=self._table, boto3_session=self._boto3Session)
+        logger.info(f"Uploaded {len(locations_df)} table locations to \"{self._database}\".\"{self._table}\" at {self._s3_location}. "
+                    "The table is kept for later runs with the same tables, and can be dropped once the migration is done.")
+        return len(locations_df)
+
+    def get_database(self) -> str:
+        return self._database
+
+    def get_table(self) -> str:
+        return self._table
+
+    def get_version(self) -> str:
+        """Returns the hash of the table locations."""
+        return self._version
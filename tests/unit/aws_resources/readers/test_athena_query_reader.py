@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import awswrangler as wr
+import pandas as pd
+
+from aws_resources.readers.athena_query_reader import AthenaQueryReader
+
+
+class TestAthenaQueryReader(unittest.TestCase):
+    """Tests for reading Athena query results, whole or in chunks."""
+
+    def setUp(self):
+        patcher = patch("aws_resources.readers.athena_query_reader.wr.athena.start_query_execution", return_value="query-id")
+        self._start_query_execution = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_reads_whole_result(self, get_query_results):
+        get_query_results.return_value = pd.DataFrame({"a": [1, 2, 3]})
+        session = Mock()
+
+        results = list(AthenaQueryReader(session, "wg", "db", "s3://results/").read_sql_query("SELECT 1"))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(results[0]), 3)
+        get_query_results.assert_called_once_with("query-id", boto3_session=session, chunksize=None, dtype_backend="numpy_nullable")
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_reads_chunks_lazily(self, get_query_results):
+        chunks_read = []
+
+        def chunks():
+            for start in range(0, 5, 2):
+                chunks_read.append(start)
+                yield pd.DataFrame({"a": list(range(start, min(start + 2, 5)))})
+
+        get_query_results.return_value = chunks()
+
+        results = AthenaQueryReader(Mock(), "wg", "db", "s3://results/", chunk_size=2).read_sql_query("SELECT 1")
+        first_chunk = next(results)
+
+        self.assertEqual(list(first_chunk["a"]), [0, 1])
+        self.assertEqual(chunks_read, [0])
+        self.assertEqual([len(chunk) for chunk in results], [2, 1])
+        self.assertEqual(get_query_results.call_args.kwargs["chunksize"], 2)
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_starts_query_without_waiting(self, get_query_results):
+        session = Mock()
+
+        query_execution_id = AthenaQueryReader(session, "wg", "db", "s3://results/").start_query("SELECT 1")
+
+        self.assertEqual(query_execution_id, "query-id")
+        self._start_query_execution.assert_called_once_with("SELECT 1", database="db", s3_output="s3://results/", workgroup="wg",
+                                                            boto3_session=session)
+        get_query_results.assert_not_called()
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.stop_query_execution")
+    def test_stops_query(self, stop_query_execution):
+        session = Mock()
+
+        AthenaQueryReader(session, "wg", "db", "s3://results/").stop_query("query-id")
+
+        stop_query_execution.assert_called_once_with("query-id", boto3_session=session)
+
+    def test_unload_approach_unloads_to_parquet(self):
+        reader = AthenaQueryReader(Mock(), "wg", "db", "s3://results/", unload_approach=True)
+
+        reader.start_query("SELECT 1")
+        reader.start_query("SELECT 1")
+
+        unload_sql = [call.args[0] for call in self._start_query_execution.call_args_list]
+        for sql in unload_sql:
+            self.assertRegex(sql, r"^UNLOAD \(SELECT 1\) TO 's3://results/unload/[0-9a-f-]+/' WITH \(format = 'PARQUET'\)$")
+        self.assertNotEqual(unload_sql[0], unload_sql[1])
+
+    @patch("aws_resources.readers.athena_query_reader.wr.s3.delete_objects")
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_unloaded_results_are_deleted_once_read(self, get_query_results, delete_objects):
+        session = Mock()
+        get_query_results.side_effect = lambda *args, **kwargs: iter([pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [2]})])
+        self._start_query_execution.side_effect = ["query-1", "query-2"]
+        reader = AthenaQueryReader(session, "wg", "db", "s3://results/", chunk_size=1, unload_approach=True)
+
+        results = reader.read_sql_query("SELECT 1")
+        next(results)
+        delete_objects.assert_not_called()
+        list(results)
+
+        unload_location = self._start_query_execution.call_args.args[0].split("'")[1]
+        delete_objects.assert_called_once_with(unload_location, boto3_session=session)
+
+        # Results of a failed query, or that are not read to the end, are deleted too.
+        get_query_results.side_effect = RuntimeError("FAILED")
+        with self.assertRaises(RuntimeError):
+            list(reader.read_sql_query("SELECT 1"))
+        self.assertEqual(delete_objects.call_args.args[0], self._start_query_execution.call_args.args[0].split("'")[1])
+        self.assertEqual(delete_objects.call_count, 2)
+
+    @patch("aws_resources.readers.athena_query_reader.wr.s3.delete_objects")
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_results_are_read_when_unloaded_results_cannot_be_deleted(self, get_query_results, delete_objects):
+        get_query_results.return_value = pd.DataFrame({"a": [1, 2]})
+        delete_objects.side_effect = wr.exceptions.ServiceApiError([{"Code": "AccessDenied"}])
+
+        with self.assertLogs("aws_resources.readers.athena_query_reader", level="WARNING"):
+            results = list(AthenaQueryReader(Mock(), "wg", "db", "s3://results/", unload_approach=True).read_sql_query("SELECT 1"))
+
+        self.assertEqual(len(results[0]), 2)
+
+    @patch("aws_resources.readers.athena_query_reader.wr.s3.delete_objects")
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_csv_results_are_not_deleted(self, get_query_results, delete_objects):
+        get_query_results.return_value = pd.DataFrame({"a": [1]})
+
+        list(AthenaQueryReader(Mock(), "wg", "db", "s3://results/").read_sql_query("SELECT 1"))
+
+        delete_objects.assert_not_called()
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_query_errors_are_raised(self, get_query_results):
+        get_query_results.side_effect = RuntimeError("FAILED")
+
+        with self.assertRaises(RuntimeError):
+            list(AthenaQueryReader(Mock(), "wg", "db", "s3://results/").read_sql_query("SELECT 1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,15 @@
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, MagicMock, PropertyMock
 
+import boto3
+from botocore.awsrequest import AWSResponse
+
 from aws_resources.readers.glue_data_catalog_reader import GlueDataCatalogReaderAPI
+from aws_resources.readers.glue_data_catalog_snapshot import GlueDataCatalogSnapshot
+from aws_resources.readers.glue_resource_filter import GlueResourceFilter
 
 
 def _mock_paginator(pages):
@@ -176,6 +184,506 @@ class TestGlueDataCatalogReaderAPI(unittest.TestCase):
 
         self.assertIsNotNone(catalog.get_database("123456789012", "mydb"))
 
+    def test_concurrent_read_matches_sequential_read(self):
+        """Reading tables concurrently should produce the same catalog, with failures isolated per database."""
+        glue_client = Mock()
+        glue_client.exceptions.AccessDeniedException = type("AccessDeniedException", (Exception,), {})
+        glue_client.exceptions.EntityNotFoundException = type("EntityNotFoundException", (Exception,), {})
+
+        db_pages = [{"DatabaseList": [{"Name": f"db{i}", "CatalogId": "123456789012"} for i in range(20)]},
+                    {"DatabaseList": [{"Name": "denied_db", "CatalogId": "123456789012"},
+                                      {"Name": "shared_db", "CatalogId": "210987654321"}]}]
+
+        def get_tables(**kwargs):
+            if kwargs["DatabaseName"] == "denied_db":
+                raise glue_client.exceptions.AccessDeniedException("Denied")
+            return [{"TableList": [{"Name": f"table{i}", "StorageDescriptor": {"Location": f"s3://bucket/{kwargs['DatabaseName']}/table{i}/"}}
+                                   for i in range(3)]},
+                    {"TableList": [{"Name": "view1"}]}]
+
+        def get_paginator(operation):
+            if operation == "get_databases":
+                return _mock_paginator(db_pages)
+            paginator = Mock()
+            paginator.paginate.side_effect = get_tables
+            return paginator
+
+        glue_client.get_paginator.side_effect = get_paginator
+
+        reader = self._make_reader(glue_client)
+        sequential_catalog = reader.read_catalog()
+        concurrent_catalog = reader.read_catalog(max_workers=4)
+
+        self.assertEqual(len(concurrent_catalog.get_catalogs()), 2)
+        self.assertEqual(sorted(table.get_arn() for table in concurrent_catalog.get_tables()),
+                         sorted(table.get_arn() for table in sequential_catalog.get_tables()))
+        self.assertEqual(len(list(concurrent_catalog.get_tables())), 21 * 4)
+        self.assertIsNotNone(concurrent_catalog.get_database("123456789012", "denied_db"))
+        self.assertEqual(concurrent_catalog.get_table("210987654321", "shared_db", "table1").get_location(), "s3://bucket/shared_db/table1/")
+
+    def test_read_partition_locations_outside_table_location(self):
+        """Only partition locations outside of the table location are returned, deduplicated by prefix."""
+        glue_client = Mock()
+        glue_client.exceptions.AccessDeniedException = type("AccessDeniedException", (Exception,), {})
+        glue_client.exceptions.EntityNotFoundException = type("EntityNotFoundException", (Exception,), {})
+
+        db_pages = [{"DatabaseList": [{"Name": "mydb", "CatalogId": "123456789012"}]}]
+        table_pages = [{"TableList": [
+            {"Name": "table1", "StorageDescriptor": {"Location": "s3://bucket/mydb/table1/"}},
+            {"Name": "table2", "StorageDescriptor": {"Location": "s3://bucket/mydb/table2/"}},
+            {"Name": "table3", "StorageDescriptor": {"Location": "s3://bucket/mydb/table3"}},
+            {"Name": "table4", "StorageDescriptor": {"Location": "s3a://bucket/mydb/table4"}},
+        ]}]
+        partition_pages = {
+            "table1": [{"Partitions": [
+                {"StorageDescriptor": {"Location": "s3://bucket/mydb/table1/dt=1"}},
+                {"StorageDescriptor": {"Location": "s3://archive/table1/dt=2"}},
+                {"StorageDescriptor": {"Location": "s3://archive/table1/dt=2/hour=1/"}},
+                {"StorageDescriptor": {"Location": "s3a://archive/table1/dt=3/"}},
+            ]}, {"Partitions": [
+                {"StorageDescriptor": {"Location": "s3://archive/table1/dt=2/"}},
+                {}
+            ]}],
+            "table2": [{"Partitions": [
+                {"StorageDescriptor": {"Location": "s3://bucket/mydb/table2/dt=1/"}},
+            ]}],
+            # A sibling location that starts with the table location is not inside it.
+            "table3": [{"Partitions": [
+                {"StorageDescriptor": {"Location": "s3://bucket/mydb/table3/dt=1/"}},
+                {"StorageDescriptor": {"Location": "s3://bucket/mydb/table3_archive/dt=2/"}},
+            ]}],
+            "table4": [{"Partitions": [
+                {"StorageDescriptor": {"Location": "s3://bucket/mydb/table4/dt=1/"}},
+            ]}],
+        }
+
+        def get_partitions_paginator():
+            paginator = Mock()
+            paginator.paginate.side_effect = lambda **kwargs: partition_pages[kwargs["TableName"]]
+            return paginator
+
+        def get_paginator(operation):
+            if operation == "get_databases":
+                return _mock_paginator(db_pages)
+            if operation == "get_tables":
+                return _mock_paginator(table_pages)
+            if operation == "get_partitions":
+                return get_partitions_paginator()
+            return _mock_paginator([])
+
+        glue_client.get_paginator.side_effect = get_paginator
+
+        reader = self._make_reader(glue_client)
+        catalog = reader.read_catalog()
+        partition_locations = reader.read_partition_locations(catalog, max_workers=2)
+
+        table1 = catalog.get_table("123456789012", "mydb", "table1")
+        table3 = catalog.get_table("123456789012", "mydb", "table3")
+        self.assertEqual(sorted(partition_locations.keys()), sorted([table1, table3]))
+        self.assertEqual(partition_locations[table1], ["s3://archive/table1/dt=2/", "s3://archive/table1/dt=3/"])
+        self.assertEqual(partition_locations[table3], ["s3://bucket/mydb/table3_archive/dt=2/"])
+        self.assertEqual(reader.read_partition_locations(catalog, catalog_id="123456789012"), partition_locations)
+        self.assertEqual(reader.read_partition_locations(catalog, catalog_id="210987654321"), {})
+
+    def test_read_partition_locations_access_denied_continues(self):
+        glue_client = Mock()
+        glue_client.exceptions.AccessDeniedException = type("AccessDeniedException", (Exception,), {})
+        glue_client.exceptions.EntityNotFoundException = type("EntityNotFoundException", (Exception,), {})
+
+        db_pages = [{"DatabaseList": [{"Name": "mydb", "CatalogId": "123456789012"}]}]
+        table_pages = [{"TableList": [{"Name": "table1", "StorageDescriptor": {"Location": "s3://bucket/mydb/table1/"}}]}]
+
+        def get_paginator(operation):
+            if operation == "get_databases":
+                return _mock_paginator(db_pages)
+            if operation == "get_tables":
+                return _mock_paginator(table_pages)
+            paginator = Mock()
+            paginator.paginate.side_effect = glue_client.exceptions.AccessDeniedException("Denied")
+            return paginator
+
+        glue_client.get_paginator.side_effect = get_paginator
+
+        reader = self._make_reader(glue_client)
+        catalog = reader.read_catalog()
+        self.assertEqual(reader.read_partition_locations(catalog), {})
+
+
+class TestGlueDataCatalogReaderAPITableLoaders(unittest.TestCase):
+    """Compares the get_tables and search_tables loaders, including the number of Glue calls they make."""
+
+    GET_TABLES_PAGE_SIZE = 100
+
+    def _make_glue_client(self, layout):
+        """layout is a dict of database name to number of tables. Pages are sized like the Glue API."""
+        glue_client = Mock()
+        glue_client.exceptions.AccessDeniedException = type("AccessDeniedException", (Exception,), {})
+        glue_client.exceptions.EntityNotFoundException = type("EntityNotFoundException", (Exception,), {})
+        tables = [{"Name": f"table{i}", "DatabaseName": database, "CatalogId": "123456789012",
+                   "StorageDescriptor": {"Location": f"s3://bucket/{database}/table{i}/"}}
+                  for database, table_count in layout.items() for i in range(table_count)]
+        calls = {"get_tables": 0, "search_tables": 0}
+
+        def get_tables(**kwargs):
+            database_tables = [table for table in tables if table["DatabaseName"] == kwargs["DatabaseName"]]
+            for start in range(0, max(len(database_tables), 1), self.GET_TABLES_PAGE_SIZE):
+                calls["get_tables"] += 1
+                yield {"TableList": database_tables[start:start + self.GET_TABLES_PAGE_SIZE]}
+
+        def search_tables(**kwargs):
+            calls["search_tables"] += 1
+            start = int(kwargs.get("NextToken", 0))
+            end = start + kwargs["MaxResults"]
+            page = {"TableList": tables[start:end]}
+            if end < len(tables):
+                page["NextToken"] = str(end)
+            return page
+
+        def get_paginator(operation):
+            if operation == "get_databases":
+                return _mock_paginator([{"DatabaseList": [{"Name": database, "CatalogId": "123456789012"} for database in layout]}])
+            paginator = Mock()
+            paginator.paginate.side_effect = get_tables
+            return paginator
+
+        glue_client.get_paginator.side_effect = get_paginator
+        glue_client.search_tables.side_effect = search_tables
+        return glue_client, calls
+
+    def _make_reader(self, glue_client, resourceFilter=None):
+        session = Mock()
+        session.client.return_value = glue_client
+        session.region_name = "us-east-1"
+        return GlueDataCatalogReaderAPI(session, "123456789012", resourceFilter=resourceFilter)
+
+    def _read_and_count_calls(self, layout, table_loader):
+        glue_client, calls = self._make_glue_client(layout)
+        catalog = self._make_reader(glue_client).read_catalog(table_loader=table_loader)
+        return sorted((table.get_arn(), table.get_location()) for table in catalog.get_tables()), calls
+
+    def test_loaders_read_the_same_catalog(self):
+        layouts = {
+            "many_small_databases": {f"db{i}": 2 for i in range(500)},
+            "few_huge_databases": {f"db{i}": 5000 for i in range(2)},
+        }
+        expected_calls = {
+            "many_small_databases": ({"get_tables": 500, "search_tables": 0}, {"get_tables": 0, "search_tables": 1}),
+            "few_huge_databases": ({"get_tables": 100, "search_tables": 0}, {"get_tables": 0, "search_tables": 10}),
+        }
+        for name, layout in layouts.items():
+            with self.subTest(layout=name):
+                get_tables_catalog, get_tables_calls = self._read_and_count_calls(layout, GlueDataCatalogReaderAPI.TABLE_LOADER_GET_TABLES)
+                search_tables_catalog, search_tables_calls = self._read_and_count_calls(layout, GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES)
+
+                self.assertEqual(get_tables_catalog, search_tables_catalog)
+                self.assertEqual(len(search_tables_catalog), sum(layout.values()))
+                self.assertEqual((get_tables_calls, search_tables_calls), expected_calls[name])
+
+    def test_search_tables_ignores_tables_of_unread_databases(self):
+        glue_client, _ = self._make_glue_client({"db1": 1})
+        glue_client.search_tables.side_effect = lambda **kwargs: {"TableList": [
+            {"Name": "table1", "DatabaseName": "db1", "StorageDescriptor": {"Location": "s3://bucket/db1/table1/"}},
+            {"Name": "table1", "DatabaseName": "unread_db"}]}
+
+        catalog = self._make_reader(glue_client).read_catalog(table_loader=GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES)
+
+        self.assertEqual([table.get_arn() for table in catalog.get_tables()], [catalog.get_table("123456789012", "db1", "table1").get_arn()])
+
+    def test_search_tables_access_denied_falls_back_to_get_tables(self):
+        glue_client, calls = self._make_glue_client({"db1": 3})
+        glue_client.search_tables.side_effect = glue_client.exceptions.AccessDeniedException("Denied")
+
+        catalog = self._make_reader(glue_client).read_catalog(table_loader=GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES)
+
+        self.assertEqual(len(list(catalog.get_tables())), 3)
+        self.assertEqual(calls["get_tables"], 1)
+
+    def test_read_single_catalog(self):
+        for table_loader in (GlueDataCatalogReaderAPI.TABLE_LOADER_GET_TABLES, GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES):
+            with self.subTest(table_loader=table_loader):
+                glue_client, _ = self._make_glue_client({"db1": 2})
+                paginators = {}
+                get_paginator = glue_client.get_paginator.side_effect
+                glue_client.get_paginator.side_effect = lambda operation: paginators.setdefault(operation, get_paginator(operation))
+
+                catalog = self._make_reader(glue_client).read_catalog(table_loader=table_loader, catalog_id="123456789012")
+
+                self.assertEqual(len(list(catalog.get_tables())), 2)
+                paginators["get_databases"].paginate.assert_called_once_with(CatalogId="123456789012")
+                if table_loader == GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES:
+                    self.assertEqual(glue_client.search_tables.call_args.kwargs["CatalogId"], "123456789012")
+                    self.assertNotIn("ResourceShareType", glue_client.search_tables.call_args.kwargs)
+
+    def test_filtered_databases_are_not_read(self):
+        layout = {"sales_eu": 2, "sales_us": 2, "sales_tmp": 2, "finance": 2}
+        resourceFilter = GlueResourceFilter(include_databases=["sales_*"], exclude_databases=["*_tmp"], exclude_tables=["table1"])
+        for table_loader in (GlueDataCatalogReaderAPI.TABLE_LOADER_GET_TABLES, GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES):
+            with self.subTest(table_loader=table_loader):
+                glue_client, calls = self._make_glue_client(layout)
+
+                catalog = self._make_reader(glue_client, resourceFilter).read_catalog(table_loader=table_loader)
+
+                self.assertEqual(sorted(catalog.get_catalog("123456789012").get_databases()), ["sales_eu", "sales_us"])
+                self.assertEqual(sorted((table.get_database(), table.get_name()) for table in catalog.get_tables()),
+                                 [("sales_eu", "table0"), ("sales_us", "table0")])
+                if table_loader == GlueDataCatalogReaderAPI.TABLE_LOADER_GET_TABLES:
+                    self.assertEqual(calls["get_tables"], 2)
+
+    def test_filtered_database_is_not_read_directly(self):
+        glue_client, _ = self._make_glue_client({})
+        reader = self._make_reader(glue_client, GlueResourceFilter(exclude_databases=["tmp_*"]))
+
+        self.assertIsNone(reader.read_database("123456789012", "tmp_db"))
+        glue_client.get_database.assert_not_called()
+
+    def test_unknown_loader(self):
+        glue_client, _ = self._make_glue_client({})
+        with self.assertRaises(ValueError):
+            self._make_reader(glue_client).read_catalog(table_loader="unknown")
+
+
+class TestGlueDataCatalogReaderAPIResourceLinks(unittest.TestCase):
+    """Tests that resource links are recorded as aliases, and that their target databases are only read once."""
+
+    def _make_glue_client(self, databases, readable_databases):
+        """databases is the DatabaseList returned by get_databases, readable_databases the ones get_database can read."""
+        glue_client = Mock()
+        glue_client.exceptions.AccessDeniedException = type("AccessDeniedException", (Exception,), {})
+        glue_client.exceptions.EntityNotFoundException = type("EntityNotFoundException", (Exception,), {})
+        table_reads = []
+
+        def get_tables(**kwargs):
+            table_reads.append((kwargs["CatalogId"], kwargs["DatabaseName"]))
+            return [{"TableList": [{"Name": "table1", "StorageDescriptor": {"Location": f"s3://bucket/{kwargs['DatabaseName']}/table1/"}}]}]
+
+        def get_paginator(operation):
+            if operation == "get_databases":
+                return _mock_paginator([{"DatabaseList": databases}])
+            paginator = Mock()
+            paginator.paginate.side_effect = get_tables
+            return paginator
+
+        def get_database(CatalogId, Name):
+            if (CatalogId, Name) not in readable_databases:
+                raise glue_client.exceptions.AccessDeniedException("Denied")
+            return {"Database": {"Name": Name, "CatalogId": CatalogId, "Location": f"s3://bucket/{Name}/"}}
+
+        glue_client.get_paginator.side_effect = get_paginator
+        glue_client.get_database.side_effect = get_database
+        return glue_client, table_reads
+
+    def _make_reader(self, glue_client):
+        session = Mock()
+        session.client.return_value = glue_client
+        session.region_name = "us-east-1"
+        return GlueDataCatalogReaderAPI(session, "111111111111")
+
+    def test_links_to_a_shared_database_are_read_once(self):
+        glue_client, table_reads = self._make_glue_client([
+            {"Name": "shared_db", "CatalogId": "222222222222"},
+            {"Name": "link1", "CatalogId": "111111111111", "TargetDatabase": {"CatalogId": "222222222222", "DatabaseName": "shared_db"}},
+            {"Name": "link2", "CatalogId": "111111111111", "TargetDatabase": {"CatalogId": "222222222222", "DatabaseName": "shared_db"}},
+        ], set())
+
+        catalog = self._make_reader(glue_client).read_catalog()
+
+        self.assertEqual(table_reads, [("222222222222", "shared_db")])
+        self.assertEqual(len(list(catalog.get_tables())), 1)
+        self.assertEqual(catalog.get_catalog("111111111111").get_database_links(),
+                         {"link1": ("222222222222", "shared_db"), "link2": ("222222222222", "shared_db")})
+        self.assertIs(catalog.get_table("111111111111", "link1", "table1"), catalog.get_table("222222222222", "shared_db", "table1"))
+        glue_client.get_database.assert_not_called()
+
+    def test_link_target_not_listed_is_read_directly(self):
+        glue_client, table_reads = self._make_glue_client([
+            {"Name": "link1", "CatalogId": "111111111111", "TargetDatabase": {"CatalogId": "222222222222", "DatabaseName": "shared_db"}},
+        ], {("222222222222", "shared_db")})
+
+        catalog = self._make_reader(glue_client).read_catalog()
+
+        self.assertEqual(table_reads, [("222222222222", "shared_db")])
+        self.assertEqual(catalog.get_database("111111111111", "link1").get_location(), "s3://bucket/shared_db/")
+
+    def test_link_with_unreadable_target_is_read_as_database(self):
+        glue_client, table_reads = self._make_glue_client([
+            {"Name": "link1", "CatalogId": "111111111111", "TargetDatabase": {"CatalogId": "222222222222", "DatabaseName": "shared_db"}},
+        ], set())
+
+        catalog = self._make_reader(glue_client).read_catalog()
+
+        self.assertEqual(table_reads, [("111111111111", "link1")])
+        self.assertIsNotNone(catalog.get_table("111111111111", "link1", "table1"))
+        self.assertEqual(catalog.get_catalog("111111111111").get_database_links(), {})
+
+    def test_read_database_follows_link(self):
+        glue_client, _ = self._make_glue_client([], {("222222222222", "shared_db")})
+        get_database = glue_client.get_database.side_effect
+        glue_client.get_database.side_effect = lambda CatalogId, Name: {"Database": {
+            "Name": Name, "CatalogId": CatalogId, "TargetDatabase": {"CatalogId": "222222222222", "DatabaseName": "shared_db"}}} \
+            if Name == "link1" else get_database(CatalogId, Name)
+
+        glueDatabase = self._make_reader(glue_client).read_database("111111111111", "link1")
+
+        self.assertEqual((glueDatabase.get_catalog_id(), glueDatabase.get_name()), ("222222222222", "shared_db"))
+
+
+class TestGlueDataCatalogReaderAPIRefresh(unittest.TestCase):
+    """Tests for refreshing the catalog from a local snapshot."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot = GlueDataCatalogSnapshot(os.path.join(self.temp_dir.name, "snapshot.db"))
+        # database name -> table name -> location
+        self.databases = {"db1": {"table1": "s3://bucket/db1/table1/", "table2": "s3://bucket/db1/table2/"},
+                          "db2": {"table1": "s3://bucket/db2/table1/"}}
+        self.changed_tables = []
+        self.calls = []
+
+        glue_client = Mock()
+        glue_client.exceptions.AccessDeniedException = type("AccessDeniedException", (Exception,), {})
+        glue_client.exceptions.EntityNotFoundException = type("EntityNotFoundException", (Exception,), {})
+
+        def get_tables(**kwargs):
+            self.calls.append(("get_tables", kwargs["DatabaseName"], tuple(kwargs.get("AttributesToGet", ()))))
+            tables = self.databases[kwargs["DatabaseName"]]
+            if "AttributesToGet" in kwargs:
+                return [{"TableList": [{"Name": name} for name in tables]}]
+            return [{"TableList": [{"Name": name, "StorageDescriptor": {"Location": location}} for name, location in tables.items()]}]
+
+        def get_paginator(operation):
+            if operation == "get_databases":
+                return _mock_paginator([{"DatabaseList": [{"Name": name, "CatalogId": "123456789012"} for name in self.databases]}])
+            paginator = Mock()
+            paginator.paginate.side_effect = get_tables
+            return paginator
+
+        def search_tables(**kwargs):
+            self.calls.append(("search_tables", kwargs["Filters"][0]["Key"]))
+            return {"TableList": [{"Name": name, "DatabaseName": database, "CatalogId": "123456789012",
+                                   "StorageDescriptor": {"Location": self.databases[database][name]}}
+                                  for database, name in self.changed_tables]}
+
+        def get_table(**kwargs):
+            self.calls.append(("get_table", kwargs["DatabaseName"], kwargs["Name"]))
+            return {"Table": {"Name": kwargs["Name"], "StorageDescriptor": {"Location": self.databases[kwargs["DatabaseName"]][kwargs["Name"]]}}}
+
+        glue_client.get_paginator.side_effect = get_paginator
+        glue_client.search_tables.side_effect = search_tables
+        glue_client.get_table.side_effect = get_table
+
+        session = Mock()
+        session.client.return_value = glue_client
+        session.region_name = "us-east-1"
+        self.reader = GlueDataCatalogReaderAPI(session, "123456789012")
+
+    def tearDown(self):
+        self.snapshot.close()
+        self.temp_dir.cleanup()
+
+    def _table_locations(self, catalog):
+        return sorted((table.get_database(), table.get_name(), table.get_location()) for table in catalog.get_tables())
+
+    def _expected_table_locations(self):
+        return sorted((database, name, location) for database, tables in self.databases.items() for name, location in tables.items())
+
+    def test_first_refresh_reads_whole_catalog(self):
+        catalog = self.reader.refresh_catalog(self.snapshot)
+
+        self.assertEqual(self._table_locations(catalog), self._expected_table_locations())
+        self.assertIsNotNone(self.snapshot.get_watermark())
+        self.assertEqual(self._table_locations(self.snapshot.load()), self._expected_table_locations())
+        self.assertNotIn("search_tables", [call[0] for call in self.calls])
+
+    def test_refresh_applies_changes_since_watermark(self):
+        self.reader.refresh_catalog(self.snapshot)
+        first_watermark = self.snapshot.get_watermark()
+        self.calls.clear()
+
+        self.databases["db1"]["table1"] = "s3://bucket/db1/moved_table1/"
+        del self.databases["db1"]["table2"]
+        self.databases["db2"]["table2"] = "s3://bucket/db2/table2/"
+        self.databases["db3"] = {"table1": "s3://bucket/db3/table1/"}
+        # table2 in db2 is new, but is not returned by the search, so it is read directly.
+        self.changed_tables = [("db1", "table1")]
+
+        catalog = self.reader.refresh_catalog(self.snapshot)
+
+        self.assertEqual(self._table_locations(catalog), self._expected_table_locations())
+        self.assertEqual(self._table_locations(self.snapshot.load()), self._expected_table_locations())
+        self.assertGreaterEqual(self.snapshot.get_watermark(), first_watermark)
+        self.assertCountEqual(self.calls, [
+            ("search_tables", "CreateTime"), ("search_tables", "UpdateTime"),
+            ("get_tables", "db1", ("NAME",)), ("get_tables", "db2", ("NAME",)),
+            ("get_table", "db2", "table2"),
+            ("get_tables", "db3", ())])
+
+    def test_refresh_reads_whole_catalog_when_search_is_denied(self):
+        self.reader.refresh_catalog(self.snapshot)
+        self.reader._glueClient.search_tables.side_effect = self.reader._glueClient.exceptions.AccessDeniedException("Denied")
+        self.databases["db1"]["table1"] = "s3://bucket/db1/moved_table1/"
+
+        catalog = self.reader.refresh_catalog(self.snapshot)
+
+        self.assertEqual(self._table_locations(catalog), self._expected_table_locations())
+
+
+class _RawResponse:
+    def __init__(self, body):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+class TestGlueDataCatalogReaderAPISlimReads(unittest.TestCase):
+    """Tests that slim reads parse real botocore responses into name and location only records."""
+
+    def _make_reader(self, responses, slim_reads=True):
+        session = boto3.Session(region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test")
+        reader = GlueDataCatalogReaderAPI(session, "123456789012", slim_reads)
+
+        def send(request, **kwargs):
+            operation, status, body = responses.pop(0)
+            self.assertIn(operation, request.headers["X-Amz-Target"].decode())
+            return AWSResponse(request.url, status, {}, _RawResponse(json.dumps(body).encode()))
+
+        reader._glueClient.meta.events.register("before-send.glue", send)
+        return reader
+
+    def test_slim_reads_keep_name_and_location(self):
+        full_table = {"Name": "table1", "CreateTime": 1700000000.0, "Parameters": {"classification": "parquet"},
+                      "StorageDescriptor": {"Location": "s3://bucket/mydb/table1/", "Columns": [{"Name": "c1", "Type": "int"}],
+                                            "SerdeInfo": {"SerializationLibrary": "parquet"}}}
+        responses = [
+            ("GetDatabases", 200, {"DatabaseList": [{"Name": "mydb", "CatalogId": "123456789012", "LocationUri": "s3://bucket/mydb/"}]}),
+            ("GetTables", 200, {"TableList": [full_table], "NextToken": "token"}),
+            ("GetTables", 200, {"TableList": [{"Name": "view1", "TableType": "VIRTUAL_VIEW"}]}),
+            ("GetTables", 200, {"TableList": [full_table]}),
+        ]
+
+        reader = self._make_reader(responses)
+        catalog = reader.read_catalog()
+
+        self.assertEqual(catalog.get_table("123456789012", "mydb", "table1").get_location(), "s3://bucket/mydb/table1/")
+        self.assertIsNone(catalog.get_table("123456789012", "mydb", "view1").get_location())
+
+        response = reader._glueClient.get_tables(DatabaseName="mydb")
+        self.assertEqual(responses, [])
+        self.assertEqual(response["TableList"], [{"Name": "table1", "StorageDescriptor": {"Location": "s3://bucket/mydb/table1/"}}])
+        self.assertNotIn("NextToken", response)
+
+    def test_slim_reads_parse_errors(self):
+        responses = [
+            ("GetDatabases", 200, {"DatabaseList": [{"Name": "mydb", "CatalogId": "123456789012"}]}),
+            ("GetTables", 400, {"__type": "AccessDeniedException", "Message": "Denied"}),
+        ]
+
+        reader = self._make_reader(responses)
+        catalog = reader.read_catalog()
+
+        self.assertIsNotNone(catalog.get_database("123456789012", "mydb"))
+        self.assertEqual(list(catalog.get_tables()), [])
+
 
 if __name__ == '__main__':
     unittest.main()
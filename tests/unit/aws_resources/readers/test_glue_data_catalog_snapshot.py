@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from aws_resources.glue_data_catalog import GlueDataCatalog
+from aws_resources.glue_catalog import GlueCatalog
+from aws_resources.glue_database import GlueDatabase
+from aws_resources.glue_table import GlueTable
+from aws_resources.readers.glue_data_catalog_snapshot import GlueDataCatalogSnapshot
+
+
+class TestGlueDataCatalogSnapshot(unittest.TestCase):
+    """Tests for saving and loading the local Glue Data Catalog snapshot."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_file = os.path.join(self.temp_dir.name, "snapshot.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _make_catalog(self):
+        catalog = GlueDataCatalog()
+        catalog.add_catalog(GlueCatalog("us-east-1", "123456789012"))
+        catalog.add_catalog(GlueCatalog("us-east-1", "210987654321"))
+        catalog.add_database(GlueDatabase("us-east-1", "123456789012", "db1", "s3://bucket/db1/"))
+        catalog.add_database(GlueDatabase("us-east-1", "210987654321", "shared_db"))
+        catalog.add_table(GlueTable("us-east-1", "123456789012", "db1", "table1", "s3://bucket/db1/table1/"))
+        catalog.add_table(GlueTable("us-east-1", "123456789012", "db1", "view1"))
+        catalog.add_table(GlueTable("us-east-1", "210987654321", "shared_db", "table1", "s3://shared/table1/"))
+        return catalog
+
+    def test_empty_snapshot_has_no_watermark(self):
+        snapshot = GlueDataCatalogSnapshot(self.snapshot_file)
+        self.assertIsNone(snapshot.get_watermark())
+        self.assertEqual(list(snapshot.load()), [])
+        snapshot.close()
+
+    def test_save_and_load(self):
+        watermark = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        snapshot = GlueDataCatalogSnapshot(self.snapshot_file)
+        snapshot.save(self._make_catalog(), watermark)
+        snapshot.close()
+
+        snapshot = GlueDataCatalogSnapshot(self.snapshot_file)
+        catalog = snapshot.load()
+        self.assertEqual(snapshot.get_watermark(), watermark)
+        snapshot.close()
+
+        self.assertEqual(sorted(item.get_arn() for item in catalog), sorted(item.get_arn() for item in self._make_catalog()))
+        self.assertEqual(catalog.get_database("123456789012", "db1").get_location(), "s3://bucket/db1/")
+        self.assertEqual(catalog.get_table("123456789012", "db1", "table1").get_location(), "s3://bucket/db1/table1/")
+        self.assertIsNone(catalog.get_table("123456789012", "db1", "view1").get_location())
+
+    def test_save_replaces_previous_snapshot(self):
+        snapshot = GlueDataCatalogSnapshot(self.snapshot_file)
+        snapshot.save(self._make_catalog(), datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+        catalog = GlueDataCatalog()
+        catalog.add_catalog(GlueCatalog("us-east-1", "123456789012"))
+        catalog.add_database(GlueDatabase("us-east-1", "123456789012", "db2"))
+        snapshot.save(catalog, datetime(2024, 1, 2, tzinfo=timezone.utc))
+
+        self.assertEqual(sorted(item.get_arn() for item in snapshot.load()), sorted(item.get_arn() for item in catalog))
+        self.assertEqual(snapshot.get_watermark(), datetime(2024, 1, 2, tzinfo=timezone.utc))
+        snapshot.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import threading
+import unittest
+from unittest.mock import Mock
+
+from aws_resources.glue_catalog import GlueCatalog
+from aws_resources.glue_data_catalog import GlueDataCatalog
+from aws_resources.glue_database import GlueDatabase
+from aws_resources.glue_table import GlueTable
+from aws_resources.readers.glue_data_catalog_reader import GlueDataCatalogReaderAPI
+from aws_resources.readers.glue_multi_catalog_reader import GlueMultiCatalogReader
+
+REGION = "us-east-1"
+
+
+def _make_catalog(catalog_id, database_names):
+    glueDataCatalog = GlueDataCatalog()
+    glueDataCatalog.add_catalog(GlueCatalog(REGION, catalog_id))
+    for database_name in database_names:
+        glueDataCatalog.add_database(GlueDatabase(REGION, catalog_id, database_name, f"s3://{catalog_id}/{database_name}/"))
+        glueDataCatalog.add_table(GlueTable(REGION, catalog_id, database_name, "table1", f"s3://{catalog_id}/{database_name}/table1/"))
+    return glueDataCatalog
+
+
+def _make_reader(read_catalog):
+    reader = Mock(spec=GlueDataCatalogReaderAPI)
+    reader.read_catalog.side_effect = read_catalog
+    return reader
+
+
+def _make_factories(readers):
+    return {catalog_id: (lambda reader=reader: reader) for catalog_id, reader in readers.items()}
+
+
+class TestGlueMultiCatalogReader(unittest.TestCase):
+    """Tests for reading several Glue Data Catalogs into one."""
+
+    def test_merges_catalogs(self):
+        readers = {
+            "111111111111": _make_reader(lambda max_workers, table_loader, catalog_id: _make_catalog(catalog_id, ["db1", "db2"])),
+            "222222222222": _make_reader(lambda max_workers, table_loader, catalog_id: _make_catalog(catalog_id, ["db1"])),
+        }
+        multiReader = GlueMultiCatalogReader(_make_factories(readers))
+
+        glueDataCatalog = multiReader.read_catalogs(2, 4, GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES)
+
+        self.assertEqual(sorted(glueDataCatalog.get_catalogs()), ["111111111111", "222222222222"])
+        self.assertEqual(len(list(glueDataCatalog.get_tables())), 3)
+        self.assertIsNotNone(glueDataCatalog.get_table("222222222222", "db1", "table1"))
+        readers["111111111111"].read_catalog.assert_called_once_with(4, GlueDataCatalogReaderAPI.TABLE_LOADER_SEARCH_TABLES, "111111111111")
+        self.assertEqual(sorted(multiReader.get_load_times()), ["111111111111", "222222222222"])
+        self.assertEqual(multiReader.get_failed_catalogs(), {})
+
+    def test_failed_catalog_is_left_out(self):
+        def fail(max_workers, table_loader, catalog_id):
+            raise RuntimeError("AccessDenied")
+
+        readers = {
+            "111111111111": _make_reader(fail),
+            "222222222222": _make_reader(lambda max_workers, table_loader, catalog_id: _make_catalog(catalog_id, ["db1"])),
+        }
+        multiReader = GlueMultiCatalogReader(_make_factories(readers))
+
+        glueDataCatalog = multiReader.read_catalogs()
+
+        self.assertEqual(list(glueDataCatalog.get_catalogs()), ["222222222222"])
+        self.assertEqual(list(multiReader.get_failed_catalogs()), ["111111111111"])
+        self.assertEqual(list(multiReader.get_load_times()), ["222222222222"])
+
+    def test_failed_reader_factory_is_reported(self):
+        def assume_role():
+            raise RuntimeError("Unable to assume role")
+
+        factories = _make_factories({"222222222222": _make_reader(lambda max_workers, table_loader, catalog_id: _make_catalog(catalog_id, ["db1"]))})
+        factories["111111111111"] = assume_role
+        multiReader = GlueMultiCatalogReader(factories)
+
+        glueDataCatalog = multiReader.read_catalogs()
+
+        self.assertEqual(list(glueDataCatalog.get_catalogs()), ["222222222222"])
+        self.assertEqual(list(multiReader.get_failed_catalogs()), ["111111111111"])
+        self.assertEqual(str(multiReader.get_failed_catalogs()["111111111111"]), "Unable to assume role")
+
+    def test_slow_reader_factory_does_not_block_others(self):
+        # The slow role is only assumed once the other catalog has been read, which needs the factories to run on the workers.
+        fast_catalog_read = threading.Event()
+
+        def assume_slow_role():
+            if not fast_catalog_read.wait(timeout=5):
+                raise TimeoutError("Roles were not assumed concurrently")
+            return _make_reader(lambda max_workers, table_loader, catalog_id: _make_catalog(catalog_id, ["slow_db"]))
+
+        def read_fast(max_workers, table_loader, catalog_id):
+            fast_catalog_read.set()
+            return _make_catalog(catalog_id, ["fast_db"])
+
+        factories = _make_factories({"222222222222": _make_reader(read_fast)})
+        factories["111111111111"] = assume_slow_role
+        multiReader = GlueMultiCatalogReader(factories)
+
+        glueDataCatalog = multiReader.read_catalogs(max_catalog_workers=2)
+
+        self.assertEqual(sorted(glueDataCatalog.get_catalogs()), ["111111111111", "222222222222"])
+        self.assertEqual(sorted(multiReader.get_load_times()), ["111111111111", "222222222222"])
+
+    def test_slow_catalog_does_not_block_others(self):
+        # The slow catalog only completes once the fast one has been read, which needs them to be read concurrently.
+        fast_catalog_read = threading.Event()
+
+        def read_slow(max_workers, table_loader, catalog_id):
+            if not fast_catalog_read.wait(timeout=5):
+                raise TimeoutError("Catalogs were not read concurrently")
+            return _make_catalog(catalog_id, ["slow_db"])
+
+        def read_fast(max_workers, table_loader, catalog_id):
+            fast_catalog_read.set()
+            return _make_catalog(catalog_id, ["fast_db"])
+
+        multiReader = GlueMultiCatalogReader(_make_factories({"111111111111": _make_reader(read_slow), "222222222222": _make_reader(read_fast)}))
+
+        glueDataCatalog = multiReader.read_catalogs(max_catalog_workers=2)
+
+        self.assertEqual(sorted(glueDataCatalog.get_catalogs()), ["111111111111", "222222222222"])
+
+    def test_catalog_read_twice_is_merged_once(self):
+        shared_catalog = lambda max_workers, table_loader, catalog_id: _make_catalog("111111111111", ["db1"])
+        multiReader = GlueMultiCatalogReader(_make_factories({"111111111111": _make_reader(shared_catalog), "222222222222": _make_reader(shared_catalog)}))
+
+        glueDataCatalog = multiReader.read_catalogs()
+
+        self.assertEqual(list(glueDataCatalog.get_catalogs()), ["111111111111"])
+        self.assertEqual(len(list(glueDataCatalog.get_tables())), 1)
+
+    def test_link_target_read_from_both_catalogs_is_merged(self):
+        def read_consumer(max_workers, table_loader, catalog_id):
+            # The consumer catalog has a resource link, so the producer's database was read with it.
+            glueDataCatalog = _make_catalog("222222222222", ["db1"])
+            glueDataCatalog.add_catalog(GlueCatalog(REGION, catalog_id))
+            glueDataCatalog.add_database_link(catalog_id, "link1", "222222222222", "db1")
+            return glueDataCatalog
+
+        readers = {
+            "111111111111": _make_reader(read_consumer),
+            "222222222222": _make_reader(lambda max_workers, table_loader, catalog_id: _make_catalog(catalog_id, ["db1", "db2"])),
+        }
+
+        glueDataCatalog = GlueMultiCatalogReader(_make_factories(readers)).read_catalogs()
+
+        self.assertEqual(sorted(glueDataCatalog.get_catalog("222222222222").get_databases()), ["db1", "db2"])
+        self.assertEqual(len(list(glueDataCatalog.get_tables())), 2)
+        self.assertIsNotNone(glueDataCatalog.get_table("111111111111", "link1", "table1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from aws_resources.readers.glue_resource_filter import GlueResourceFilter
+
+class TestGlueResourceFilter(unittest.TestCase):
+    """Tests for including and excluding Glue databases and tables by pattern."""
+
+    def test_no_patterns_includes_everything(self):
+        resourceFilter = GlueResourceFilter()
+        self.assertTrue(resourceFilter.is_database_included("sales"))
+        self.assertTrue(resourceFilter.is_table_included("orders"))
+
+    def test_include_patterns(self):
+        resourceFilter = GlueResourceFilter(include_databases=["sales_*", "finance"], include_tables=["orders_??"])
+        self.assertTrue(resourceFilter.is_database_included("sales_eu"))
+        self.assertTrue(resourceFilter.is_database_included("finance"))
+        self.assertFalse(resourceFilter.is_database_included("finance_archive"))
+        self.assertTrue(resourceFilter.is_table_included("orders_01"))
+        self.assertFalse(resourceFilter.is_table_included("orders_2024"))
+
+    def test_exclude_wins_over_include(self):
+        resourceFilter = GlueResourceFilter(include_databases=["sales_*"], exclude_databases=["*_tmp"], exclude_tables=["tmp_*"])
+        self.assertTrue(resourceFilter.is_database_included("sales_eu"))
+        self.assertFalse(resourceFilter.is_database_included("sales_tmp"))
+        self.assertFalse(resourceFilter.is_table_included("tmp_orders"))
+        self.assertTrue(resourceFilter.is_table_included("orders"))
+
+    def test_patterns_are_case_sensitive(self):
+        resourceFilter = GlueResourceFilter(include_databases=["Sales*"])
+        self.assertFalse(resourceFilter.is_database_included("sales"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import Mock
+
+from aws_resources.glue_database import GlueDatabase
+from aws_resources.glue_table import GlueTable
+from aws_resources.readers.glue_data_catalog_reader import GlueDataCatalogReaderAPI
+from aws_resources.readers.lazy_glue_data_catalog import LazyGlueDataCatalog
+
+REGION = "us-east-1"
+CATALOG_ID = "123456789012"
+
+
+class TestLazyGlueDataCatalog(unittest.TestCase):
+    """Tests that the lazy catalog only reads what is accessed, and caches it."""
+
+    def setUp(self):
+        # database name -> table names
+        self.databases = {"db1": ["table1", "table2"], "db2": ["table1"], "db3": []}
+        self.reader = Mock(spec=GlueDataCatalogReaderAPI)
+
+        def read_database(catalog_id, database_name):
+            if database_name not in self.databases:
+                return None
+            return GlueDatabase(REGION, catalog_id, database_name, f"s3://bucket/{database_name}/")
+
+        def read_databases(glueDataCatalog):
+            return [GlueDatabase(REGION, CATALOG_ID, name, f"s3://bucket/{name}/") for name in self.databases]
+
+        def read_table(glueDatabase, table_name):
+            if table_name not in self.databases[glueDatabase.get_name()]:
+                return None
+            return self._make_table(glueDatabase.get_name(), table_name)
+
+        def read_tables(glueDatabases, max_workers):
+            for glueDatabase in glueDatabases:
+                yield [self._make_table(glueDatabase.get_name(), name) for name in self.databases[glueDatabase.get_name()]]
+
+        self.reader.read_database.side_effect = read_database
+        self.reader.read_databases.side_effect = read_databases
+        self.reader.read_table.side_effect = read_table
+        self.reader.read_tables.side_effect = read_tables
+        self.catalog = LazyGlueDataCatalog(self.reader)
+
+    def _make_table(self, database_name, table_name):
+        return GlueTable(REGION, CATALOG_ID, database_name, table_name, f"s3://bucket/{database_name}/{table_name}/")
+
+    def _arns(self, resources):
+        return sorted(resource.get_arn() for resource in resources)
+
+    def test_get_table_reads_only_that_table(self):
+        table = self.catalog.get_table(CATALOG_ID, "db1", "table1")
+        self.assertEqual(table.get_location(), "s3://bucket/db1/table1/")
+        self.assertIsNone(self.catalog.get_table(CATALOG_ID, "db1", "missing"))
+        self.assertIsNone(self.catalog.get_table(CATALOG_ID, "missing_db", "table1"))
+
+        # Cached, including the resources that were not found.
+        self.catalog.get_table(CATALOG_ID, "db1", "table1")
+        self.catalog.get_table(CATALOG_ID, "db1", "missing")
+        self.catalog.get_database(CATALOG_ID, "missing_db")
+        self.assertEqual(self.reader.read_database.call_count, 2)
+        self.assertEqual(self.reader.read_table.call_count, 2)
+        self.reader.read_databases.assert_not_called()
+        self.reader.read_tables.assert_not_called()
+
+    def test_wildcard_table_reads_database_in_batch(self):
+        tables = self.catalog.get_resources_by_wildcard(CATALOG_ID, "db1", "*")
+        self.assertEqual(self._arns(tables), self._arns([self._make_table("db1", "table1"), self._make_table("db1", "table2")]))
+
+        # The database has all of its tables, so no more tables are read for it.
+        self.assertIsNone(self.catalog.get_table(CATALOG_ID, "db1", "missing"))
+        self.catalog.get_resources_by_wildcard(CATALOG_ID, "db1", "*")
+        self.reader.read_table.assert_not_called()
+        self.assertEqual(self.reader.read_tables.call_count, 1)
+        self.reader.read_databases.assert_not_called()
+
+    def test_wildcard_database_reads_all_databases(self):
+        self.catalog.get_database(CATALOG_ID, "db1")
+        databases = self.catalog.get_resources_by_wildcard(CATALOG_ID, "*")
+        self.assertEqual([database.get_name() for database in sorted(databases)], ["db1", "db2", "db3"])
+
+        tables = self.catalog.get_resources_by_wildcard("*", "*", "table1")
+        self.assertEqual(self._arns(tables), self._arns([self._make_table("db1", "table1"), self._make_table("db2", "table1")]))
+        self.reader.read_tables.assert_not_called()
+
+    def test_glob_patterns_read_matching_databases(self):
+        tables = self.catalog.get_resources_by_wildcard(CATALOG_ID, "db?", "table*")
+        self.assertEqual(self._arns(tables), self._arns([self._make_table("db1", "table1"), self._make_table("db1", "table2"),
+                                                         self._make_table("db2", "table1")]))
+        self.assertEqual(self.reader.read_databases.call_count, 1)
+        self.assertEqual(self.reader.read_tables.call_count, 1)
+        self.reader.read_table.assert_not_called()
+
+    def test_resource_link_resolves_to_target(self):
+        read_database = self.reader.read_database.side_effect
+        self.reader.read_database.side_effect = lambda catalog_id, database_name: \
+            read_database(catalog_id, "db1") if database_name == "link1" else read_database(catalog_id, database_name)
+
+        table = self.catalog.get_table(CATALOG_ID, "link1", "table1")
+
+        self.assertIs(table, self.catalog.get_table(CATALOG_ID, "db1", "table1"))
+        self.assertEqual(self.catalog.get_catalog(CATALOG_ID).get_database_links(), {"link1": (CATALOG_ID, "db1")})
+        self.assertEqual(self.reader.read_table.call_count, 1)
+
+    def test_iterating_reads_whole_catalog(self):
+        self.catalog.get_table(CATALOG_ID, "db1", "table1")
+        tables = list(self.catalog.get_tables())
+
+        self.assertEqual(len(tables), 3)
+        self.assertEqual(len(list(self.catalog)), 1 + 3 + 3)
+        self.assertEqual(self.reader.read_databases.call_count, 1)
+        self.assertEqual(self.reader.read_tables.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -90,5 +90,99 @@ class TestGlueDataCatalog(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].get_name(), "test_database")
 
+    def test_glob_pattern_search(self):
+        catalog_id : str = PermissionsListTestHelper.test_catalog_id
+        glueDataCatalog : GlueDataCatalog = PermissionsListTestHelper.create_glue_data_catalog()
+
+        results = glueDataCatalog.get_resources_by_wildcard(catalog_id, "test_data*")
+        self.assertEqual(sorted(database.get_name() for database in results), ["test_database", "test_database2"])
+
+        results = glueDataCatalog.get_resources_by_wildcard(catalog_id, "test_database?")
+        self.assertEqual([database.get_name() for database in results], ["test_database2"])
+
+        results = glueDataCatalog.get_resources_by_wildcard(catalog_id, "*", "test_table?")
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(len(table.get_name()) == len("test_table") + 1 for table in results))
+
+        results = glueDataCatalog.get_resources_by_wildcard(catalog_id, "test_database", "*_table*")
+        self.assertEqual(len(results), 3)
+
+        results = glueDataCatalog.get_resources_by_wildcard(catalog_id, "missing_*", "*")
+        self.assertEqual(results, [])
+
+    def test_database_links(self):
+        catalog_id : str = PermissionsListTestHelper.test_catalog_id
+        test_region : str = PermissionsListTestHelper.test_region
+        glueDataCatalog : GlueDataCatalog = PermissionsListTestHelper.create_glue_data_catalog()
+        glueDataCatalog.add_catalog(GlueCatalog(test_region, "111122223333"))
+        glueDataCatalog.add_database_link("111122223333", "link_database", catalog_id, "test_database")
+
+        self.assertIs(glueDataCatalog.get_database("111122223333", "link_database"), glueDataCatalog.get_database(catalog_id, "test_database"))
+        self.assertIsNotNone(glueDataCatalog.get_table("111122223333", "link_database", "test_table"))
+        self.assertEqual(len(glueDataCatalog.get_resources_by_wildcard("111122223333", "link_database", "*")), 3)
+        # Links are aliases, so they are not returned for wildcards over databases.
+        self.assertEqual(glueDataCatalog.get_resources_by_wildcard("111122223333", "*"), [])
+
+        with self.assertRaises(CatalogEntityAlreadyExistsException):
+            glueDataCatalog.add_database_link("111122223333", "link_database", catalog_id, "test_database2")
+        with self.assertRaises(CatalogEntityAlreadyExistsException):
+            glueDataCatalog.add_database(GlueDatabase(test_region, "111122223333", "link_database"))
+
+        glueDataCatalog.add_database_link("111122223333", "dangling_link", catalog_id, "missing_database")
+        self.assertIsNone(glueDataCatalog.get_database("111122223333", "dangling_link"))
+
+    def test_wildcard_arns_are_cached_until_catalog_changes(self):
+        catalog_id : str = PermissionsListTestHelper.test_catalog_id
+        test_region : str = PermissionsListTestHelper.test_region
+        glueDataCatalog : GlueDataCatalog = PermissionsListTestHelper.create_glue_data_catalog()
+
+        arns = glueDataCatalog.get_arns_by_wildcard(catalog_id, "test_database", "*")
+        self.assertEqual(sorted(arns), sorted(table.get_arn() for table in glueDataCatalog.get_resources_by_wildcard(catalog_id, "test_database", "*")))
+        self.assertIs(glueDataCatalog.get_arns_by_wildcard(catalog_id, "test_database", "*"), arns)
+
+        glueDataCatalog.add_table(GlueTable(test_region, catalog_id, "test_database", "test_table4", "s3://mybucket/mydatabases/test_table4/"))
+        arns = glueDataCatalog.get_arns_by_wildcard(catalog_id, "test_database", "*")
+        self.assertEqual(len(arns), 4)
+
+        database_arns = glueDataCatalog.get_arns_by_wildcard(catalog_id, "*")
+        self.assertEqual(len(database_arns), 2)
+        glueDataCatalog.add_database(GlueDatabase(test_region, catalog_id, "test_database3"))
+        self.assertEqual(len(glueDataCatalog.get_arns_by_wildcard(catalog_id, "*")), 3)
+
+        catalog_arns = glueDataCatalog.get_arns_by_wildcard("*")
+        self.assertEqual(len(catalog_arns), 1)
+        glueDataCatalog.add_catalog(GlueCatalog(test_region, "111122223333"))
+        self.assertEqual(len(glueDataCatalog.get_arns_by_wildcard("*")), 2)
+
+    def test_wildcard_arns_are_cached_until_database_changes(self):
+        catalog_id : str = PermissionsListTestHelper.test_catalog_id
+        test_region : str = PermissionsListTestHelper.test_region
+        glueDataCatalog : GlueDataCatalog = PermissionsListTestHelper.create_glue_data_catalog()
+
+        table_arns = glueDataCatalog.get_arns_by_wildcard(catalog_id, "test_database", "*")
+        database_arns = glueDataCatalog.get_arns_by_wildcard(catalog_id, "*")
+
+        # Tables and databases added through a database or catalog of the data catalog, rather than the data catalog.
+        glueDataCatalog.get_database(catalog_id, "test_database").add_table(
+            GlueTable(test_region, catalog_id, "test_database", "test_table4", "s3://mybucket/mydatabases/test_table4/"))
+        self.assertEqual(len(glueDataCatalog.get_arns_by_wildcard(catalog_id, "test_database", "*")), len(table_arns) + 1)
+        self.assertIn(f"arn:aws:glue:{test_region}:{catalog_id}:table/test_database/test_table4",
+                      glueDataCatalog.get_arns_by_wildcard(catalog_id, "test_database", "*"))
+
+        glueDataCatalog.get_catalog(catalog_id).add_database(GlueDatabase(test_region, catalog_id, "test_database3"))
+        self.assertEqual(len(glueDataCatalog.get_arns_by_wildcard(catalog_id, "*")), len(database_arns) + 1)
+
+        glueDataCatalog.get_database(catalog_id, "test_database3").add_table(
+            GlueTable(test_region, catalog_id, "test_database3", "test_table5", "s3://mybucket/mydatabases/test_table5/"))
+        self.assertEqual(len(glueDataCatalog.get_arns_by_wildcard(catalog_id, "test_database3", "*")), 1)
+
+    def test_wildcard_arns_for_table_names_are_not_cached(self):
+        catalog_id : str = PermissionsListTestHelper.test_catalog_id
+        glueDataCatalog : GlueDataCatalog = PermissionsListTestHelper.create_glue_data_catalog()
+
+        arns = glueDataCatalog.get_arns_by_wildcard(catalog_id, "*", "test_table")
+        self.assertEqual(len(arns), 2)
+        self.assertIsNot(glueDataCatalog.get_arns_by_wildcard(catalog_id, "*", "test_table"), arns)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from aws_resources.glue_name_index import GlueNameIndex
+
+class TestGlueNameIndex(unittest.TestCase):
+    """Tests for matching names against glob patterns with GlueNameIndex."""
+
+    def setUp(self):
+        self.index = GlueNameIndex()
+        for name in ["sales_eu", "tmp_01", "sales", "tmp_1", "sales_us", "tmp_ab", "marketing", "sale", "tmp_abc"]:
+            self.index.add(name)
+
+    def test_prefix_pattern(self):
+        self.assertEqual(self.index.get_names_matching("sales_*"), ["sales_eu", "sales_us"])
+        self.assertEqual(self.index.get_names_matching("sales*"), ["sales", "sales_eu", "sales_us"])
+        self.assertEqual(self.index.get_names_matching("none*"), [])
+
+    def test_star_matches_all(self):
+        self.assertEqual(len(self.index.get_names_matching("*")), 9)
+
+    def test_question_mark_matches_single_character(self):
+        self.assertEqual(self.index.get_names_matching("tmp_??"), ["tmp_01", "tmp_ab"])
+        self.assertEqual(self.index.get_names_matching("sale?"), ["sales"])
+
+    def test_general_globs(self):
+        self.assertEqual(self.index.get_names_matching("*_us"), ["sales_us"])
+        self.assertEqual(self.index.get_names_matching("tmp_*b?"), ["tmp_abc"])
+        self.assertEqual(self.index.get_names_matching("s*e*_*"), ["sales_eu", "sales_us"])
+
+    def test_pattern_characters_are_literal(self):
+        self.index.add("a.b")
+        self.index.add("axb")
+        self.assertEqual(self.index.get_names_matching("a.*"), ["a.b"])
+
+    def test_names_added_after_query(self):
+        self.assertEqual(self.index.get_names_matching("sales_*"), ["sales_eu", "sales_us"])
+        self.index.add("sales_ap")
+        self.assertEqual(self.index.get_names_matching("sales_*"), ["sales_ap", "sales_eu", "sales_us"])
+
+    def test_is_pattern(self):
+        self.assertTrue(GlueNameIndex.is_pattern("*"))
+        self.assertTrue(GlueNameIndex.is_pattern("tmp_??"))
+        self.assertFalse(GlueNameIndex.is_pattern("sales"))
+        self.assertFalse(GlueNameIndex.is_pattern(None))
+
+if __name__ == '__main__':
+    unittest.main()
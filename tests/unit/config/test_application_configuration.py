@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from aws_resources.glue_catalog import GlueCatalog
+from aws_resources.glue_data_catalog import GlueDataCatalog
+from aws_resources.glue_database import GlueDatabase
+from aws_resources.glue_table import GlueTable
+from aws_resources.readers.glue_data_catalog_snapshot import GlueDataCatalogSnapshot
+from config.application_configuration import ApplicationConfiguration
+from config.boto3_factory import Boto3Factory
+from lakeformation_utils.s3_location_index import S3LocationIndex
+from lakeformation_utils.s3_to_table_mapper import S3ToTableMapper
+
+REGION = "us-east-1"
+ACCOUNT_ID = "111111111111"
+PRODUCER_ACCOUNT_ID = "222222222222"
+LINKED_ACCOUNT_ID = "333333333333"
+
+
+def _make_catalog(catalog_ids=(ACCOUNT_ID, PRODUCER_ACCOUNT_ID, LINKED_ACCOUNT_ID)):
+    glueDataCatalog = GlueDataCatalog()
+    for catalog_id in catalog_ids:
+        glueDataCatalog.add_catalog(GlueCatalog(REGION, catalog_id))
+        glueDataCatalog.add_database(GlueDatabase(REGION, catalog_id, "db1"))
+        glueDataCatalog.add_table(GlueTable(REGION, catalog_id, "db1", "table1", f"s3://bucket-{catalog_id}/db1/table1/"))
+    return glueDataCatalog
+
+
+class TestApplicationConfigurationCatalogSessions(unittest.TestCase):
+    """Tests that the partitions of each catalog in catalog_ids are read with that catalog's session."""
+
+    def setUp(self):
+        self._default_session = Mock()
+        self._assumed_session = Mock()
+        self._readers = []
+
+    def _create_reader(self, catalog_args, boto3_session, account_id):
+        # The catalog of this account has a resource link to a database in another account, which is read with it.
+        catalog_ids = [ACCOUNT_ID, LINKED_ACCOUNT_ID] if account_id == ACCOUNT_ID else [account_id]
+        reader = Mock()
+        reader.read_catalog.side_effect = lambda max_workers, table_loader, catalog_id: _make_catalog(catalog_ids)
+        reader.read_partition_locations.side_effect = lambda catalog, concurrency, catalog_id: \
+            {catalog.get_table(PRODUCER_ACCOUNT_ID, "db1", "table1"): ["s3://archive/table1/"]} if catalog_id == PRODUCER_ACCOUNT_ID else {}
+        self._readers.append((boto3_session, account_id, reader))
+        return reader
+
+    def _create_app_config(self):
+        args = {"glue_data_catalog": {"catalog_ids": f"{ACCOUNT_ID}, {PRODUCER_ACCOUNT_ID}", "catalog_role_name": "Reader",
+                                      "index_partition_locations": "true"}}
+        return ApplicationConfiguration(args, boto3_session=self._default_session, account_id=ACCOUNT_ID)
+
+    def test_partition_locations_are_read_with_catalog_session(self):
+        appConfig = self._create_app_config()
+
+        with patch.object(Boto3Factory, "createAssumedRoleBoto3Session", return_value=self._assumed_session) as assume_role, \
+                patch.object(ApplicationConfiguration, "_create_glue_data_catalog_reader", side_effect=self._create_reader):
+            translator = appConfig.get_s3_to_table_translator()
+
+        assume_role.assert_called_once_with(self._default_session, f"arn:aws:iam::{PRODUCER_ACCOUNT_ID}:role/Reader",
+                                            "policy-migrator-glue-catalog-reader")
+        partition_sessions = {reader.read_partition_locations.call_args.args[2]: boto3_session
+                              for boto3_session, _, reader in self._readers if reader.read_partition_locations.called}
+        self.assertEqual(partition_sessions, {ACCOUNT_ID: self._default_session, PRODUCER_ACCOUNT_ID: self._assumed_session,
+                                              LINKED_ACCOUNT_ID: self._default_session})
+        producer_table = appConfig.get_glue_data_catalog().get_table(PRODUCER_ACCOUNT_ID, "db1", "table1")
+        self.assertEqual(translator.get_tables_from_s3_location_postfix("s3://archive/table1/dt=1/"), [producer_table])
+
+    def test_catalog_whose_role_cannot_be_assumed_is_left_out(self):
+        appConfig = self._create_app_config()
+
+        with patch.object(Boto3Factory, "createAssumedRoleBoto3Session", side_effect=RuntimeError("AccessDenied")), \
+                patch.object(ApplicationConfiguration, "_create_glue_data_catalog_reader", side_effect=self._create_reader), \
+                self.assertLogs("aws_resources.readers.glue_multi_catalog_reader", level="ERROR") as logs:
+            glueDataCatalog = appConfig.get_glue_data_catalog()
+
+        self.assertEqual(sorted(glueDataCatalog.get_catalogs()), [ACCOUNT_ID, LINKED_ACCOUNT_ID])
+        self.assertIn(f"Failed to read Glue Data Catalog {PRODUCER_ACCOUNT_ID}", "\n".join(logs.output))
+
+
+class TestApplicationConfigurationS3LocationIndex(unittest.TestCase):
+    """Tests that an S3 location index file is only reused when it was built with the same catalog settings and snapshot."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self._index_file = os.path.join(self._directory.name, "s3_location.idx")
+        self._snapshot_file = os.path.join(self._directory.name, "glue_data_catalog.db")
+
+    def _get_translator(self, catalog_args):
+        appConfig = ApplicationConfiguration({"glue_data_catalog": catalog_args}, glue_data_catalog=_make_catalog(), account_id=ACCOUNT_ID)
+        translator = appConfig.get_s3_to_table_translator()
+        if isinstance(translator, S3LocationIndex):
+            self.addCleanup(translator.close)
+        return translator
+
+    def _save_snapshot(self, watermark):
+        snapshot = GlueDataCatalogSnapshot(self._snapshot_file)
+        try:
+            snapshot.save(_make_catalog(), watermark)
+        finally:
+            snapshot.close()
+
+    def test_index_is_rebuilt_when_catalog_settings_change(self):
+        catalog_args = {"s3_location_index_file": self._index_file, "include_databases": "db1"}
+        self.assertIsInstance(self._get_translator(catalog_args), S3ToTableMapper)
+        self.assertIsInstance(self._get_translator(catalog_args), S3LocationIndex)
+        # Settings that only change how the catalog is read keep the index.
+        self.assertIsInstance(self._get_translator(dict(catalog_args, read_concurrency="16")), S3LocationIndex)
+
+        for changed_args in [dict(catalog_args, include_databases="db2"), dict(catalog_args, exclude_tables="tmp_*"),
+                             dict(catalog_args, index_partition_locations="false"), dict(catalog_args, catalog_ids=ACCOUNT_ID)]:
+            with self.subTest(changed_args=changed_args):
+                self.assertIsInstance(self._get_translator(changed_args), S3ToTableMapper)
+                self.assertIsInstance(self._get_translator(catalog_args), S3ToTableMapper)
+
+        self.assertIsInstance(self._get_translator(dict(catalog_args, rebuild_s3_location_index="true")), S3ToTableMapper)
+
+    def test_index_is_rebuilt_when_snapshot_is_refreshed(self):
+        catalog_args = {"s3_location_index_file": self._index_file, "snapshot_file": self._snapshot_file}
+        self._save_snapshot(datetime(2024, 2, 1, tzinfo=timezone.utc))
+        self.assertIsInstance(self._get_translator(catalog_args), S3ToTableMapper)
+        self.assertIsInstance(self._get_translator(catalog_args), S3LocationIndex)
+
+        self._save_snapshot(datetime(2024, 2, 2, tzinfo=timezone.utc))
+        self.assertIsInstance(self._get_translator(catalog_args), S3ToTableMapper)
+        self.assertIsInstance(self._get_translator(catalog_args), S3LocationIndex)
+
+
+if __name__ == '__main__':
+    unittest.main()
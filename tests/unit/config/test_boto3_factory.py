@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from config.boto3_factory import Boto3Factory
+
+
+def _credentials(access_key_id, expires_in):
+    return {"Credentials": {"AccessKeyId": access_key_id, "SecretAccessKey": f"{access_key_id}-secret",
+                            "SessionToken": f"{access_key_id}-token", "Expiration": datetime.now(timezone.utc) + expires_in}}
+
+
+class TestBoto3FactoryAssumedRole(unittest.TestCase):
+    """Tests for sessions with the credentials of an assumed role."""
+
+    def setUp(self):
+        self._boto3_session = Mock()
+        self._boto3_session.region_name = "us-west-2"
+        self._boto3_session.profile_name = "default"
+        self._boto3_session.available_profiles = []
+        self._sts_client = self._boto3_session.client.return_value
+
+    def test_credentials_are_refreshed_before_they_expire(self):
+        self._sts_client.assume_role.side_effect = [_credentials("first", timedelta(minutes=5)), _credentials("second", timedelta(hours=1))]
+
+        session = Boto3Factory.createAssumedRoleBoto3Session(self._boto3_session, "arn:aws:iam::111122223333:role/Reader", "reader")
+        self.assertEqual(session.region_name, "us-west-2")
+        self._sts_client.assume_role.assert_called_once_with(RoleArn="arn:aws:iam::111122223333:role/Reader", RoleSessionName="reader")
+
+        credentials = session.get_credentials().get_frozen_credentials()
+        self.assertEqual(credentials.access_key, "second")
+        self.assertEqual(credentials.token, "second-token")
+        self.assertEqual(self._sts_client.assume_role.call_count, 2)
+
+    def test_credentials_are_not_refreshed_while_valid(self):
+        self._sts_client.assume_role.side_effect = [_credentials("first", timedelta(hours=1))]
+
+        session = Boto3Factory.createAssumedRoleBoto3Session(self._boto3_session, "arn:aws:iam::111122223333:role/Reader", "reader")
+        self.assertEqual(session.get_credentials().get_frozen_credentials().access_key, "first")
+        self.assertEqual(self._sts_client.assume_role.call_count, 1)
+
+    def test_source_session_profile_is_kept(self):
+        self._sts_client.assume_role.side_effect = [_credentials("first", timedelta(hours=1))]
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = os.path.join(directory, "config")
+            with open(config_file, "w") as f:
+                f.write("[profile source]\naws_access_key_id = profile-key\naws_secret_access_key = profile-secret\n")
+            self._boto3_session.profile_name = "source"
+            self._boto3_session.available_profiles = ["source"]
+
+            with patch.dict(os.environ, {"AWS_CONFIG_FILE": config_file}):
+                session = Boto3Factory.createAssumedRoleBoto3Session(self._boto3_session, "arn:aws:iam::111122223333:role/Reader", "reader")
+                self.assertEqual(session.profile_name, "source")
+                credentials = session.get_credentials()
+                self.assertEqual(credentials.method, "sts-assume-role")
+                self.assertEqual(credentials.get_frozen_credentials().access_key, "first")
+
+    def test_assume_role_errors_are_raised(self):
+        self._sts_client.assume_role.side_effect = RuntimeError("Access denied")
+
+        with self.assertRaises(RuntimeError):
+            Boto3Factory.createAssumedRoleBoto3Session(self._boto3_session, "arn:aws:iam::111122223333:role/Reader", "reader")
+
+
+if __name__ == '__main__':
+    unittest.main()
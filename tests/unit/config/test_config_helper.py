@@ -72,6 +72,40 @@ class TestConfigHelperGetConfigBoolean(unittest.TestCase):
             ConfigHelper.get_config_boolean({"k": True}, "k")
 
 
+class TestConfigHelperGetConfigInt(unittest.TestCase):
+    """Tests for ConfigHelper.get_config_int."""
+
+    def test_returns_int_value(self):
+        self.assertEqual(ConfigHelper.get_config_int({"k": "8"}, "k"), 8)
+        self.assertEqual(ConfigHelper.get_config_int({"k": " 16 "}, "k"), 16)
+
+    def test_returns_default_when_missing(self):
+        self.assertIsNone(ConfigHelper.get_config_int({}, "k"))
+        self.assertEqual(ConfigHelper.get_config_int({}, "k", 4), 4)
+
+    def test_raises_when_not_an_integer(self):
+        with self.assertRaises(ConfigException):
+            ConfigHelper.get_config_int({"k": "eight"}, "k")
+        with self.assertRaises(ConfigException):
+            ConfigHelper.get_config_int({"k": 8}, "k")
+
+
+class TestConfigHelperGetConfigList(unittest.TestCase):
+    """Tests for ConfigHelper.get_config_list."""
+
+    def test_returns_comma_and_newline_separated_values(self):
+        self.assertEqual(ConfigHelper.get_config_list({"k": "a, b,c"}, "k"), ["a", "b", "c"])
+        self.assertEqual(ConfigHelper.get_config_list({"k": "\na\n b\n\n"}, "k"), ["a", "b"])
+
+    def test_returns_default_when_missing(self):
+        self.assertIsNone(ConfigHelper.get_config_list({}, "k"))
+        self.assertEqual(ConfigHelper.get_config_list({}, "k", []), [])
+
+    def test_raises_when_not_string(self):
+        with self.assertRaises(ConfigException):
+            ConfigHelper.get_config_list({"k": ["a"]}, "k")
+
+
 class TestConfigHelperConfigureLogger(unittest.TestCase):
     """Tests for ConfigHelper.configure_logger."""
 
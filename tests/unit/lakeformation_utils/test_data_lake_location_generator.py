@@ -1,3 +1,4 @@
+import random
 import unittest
 from aws_resources.glue_data_catalog import GlueDataCatalog
 from aws_resources.glue_data_catalog import GlueCatalog
@@ -6,6 +7,43 @@ from aws_resources.glue_data_catalog import GlueTable
 
 from lakeformation_utils.data_lake_location_generator import LakeFormationS3DataLakeLocationGenerator
 from tests.unit.helpers.global_test_variables import GlobalTestVariables
+
+
+def _merge_sorted_locations(s3_locations : list[str]) -> list[str]:
+    """The sorted list merge that the data lake locations were computed with before the S3Tree."""
+    s3_locations = sorted(location if location.endswith("/") else location + "/" for location in s3_locations)
+
+    i = 0
+    while i < len(s3_locations) - 1:
+        if s3_locations[i] == s3_locations[i+1] or s3_locations[i+1].startswith(s3_locations[i]):
+            s3_locations.pop(i+1)
+        else:
+            i += 1
+
+    i = 0
+    while i < len(s3_locations):
+        current_location = s3_locations[i][:-1]
+        current_location = current_location[:current_location.rindex("/")] + "/"
+        if current_location == 's3://':
+            i += 1
+            continue
+
+        j = i + 1
+        has_changes = False
+        while j < len(s3_locations):
+            if s3_locations[j].startswith(current_location):
+                s3_locations.pop(j)
+                s3_locations[i] = current_location
+                has_changes = True
+            else:
+                break
+
+        if not has_changes:
+            i = i + 1
+
+    return s3_locations
+
+
 class TestDataLakeLocationGenerator(unittest.TestCase):
     """Tests for data lake location generation from Glue catalog."""
 
@@ -51,5 +89,88 @@ class TestDataLakeLocationGenerator(unittest.TestCase):
         for s3Location in s3Locations:
             self.assertTrue(s3Location in expected_results)
 
+    def test_generate_data_lake_location_coverage(self):
+        test_catalog = GlobalTestVariables.test_catalog_id
+        test_region = GlobalTestVariables.test_region
+
+        gdcCatalog = GlueDataCatalog()
+        gdcCatalog.add_catalog(GlueCatalog(test_region, test_catalog))
+        gdcCatalog.add_database(GlueDatabase(test_region, test_catalog, "test_database"))
+
+        # Only one location under these parents, so the table location itself is registered.
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table", "s3://mybucket/a/b/test_table/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table_nested", "s3://mybucket/a/b/test_table/nested/"))
+        # Locations in the same directory are registered at that directory.
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table2", "s3://mybucket_2/x/y/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table3", "s3://mybucket_2/x/z/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table4", "s3a://mybucket_3/test_table4"))
+        # Locations that only share a directory further up are registered as is, rather than the whole bucket.
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table5", "s3://mybucket_4/a/test_table5/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table6", "s3://mybucket_4/c/test_table6/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_view"))
+
+        coverage = LakeFormationS3DataLakeLocationGenerator().generate_data_lake_location_coverage(gdcCatalog)
+
+        self.assertEqual(sorted(coverage.keys()), ["s3://mybucket/a/b/test_table/", "s3://mybucket_2/x/", "s3://mybucket_3/test_table4/",
+                                                   "s3://mybucket_4/a/test_table5/", "s3://mybucket_4/c/test_table6/"])
+        self.assertEqual([table.get_name() for table in coverage["s3://mybucket/a/b/test_table/"]], ["test_table", "test_table_nested"])
+        self.assertEqual([table.get_name() for table in coverage["s3://mybucket_2/x/"]], ["test_table2", "test_table3"])
+        self.assertEqual([table.get_name() for table in coverage["s3://mybucket_3/test_table4/"]], ["test_table4"])
+
+    def test_generate_data_lake_locations_within_budget(self):
+        test_catalog = GlobalTestVariables.test_catalog_id
+        test_region = GlobalTestVariables.test_region
+
+        gdcCatalog = GlueDataCatalog()
+        gdcCatalog.add_catalog(GlueCatalog(test_region, test_catalog))
+        gdcCatalog.add_database(GlueDatabase(test_region, test_catalog, "test_database"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table1", "s3://mybucket/x/test_table1/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table2", "s3://mybucket/x/test_table2/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table3", "s3://mybucket/y/deep/test_table3/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table4", "s3://mybucket_2/test_table4/"))
+
+        generator = LakeFormationS3DataLakeLocationGenerator()
+        expected_locations = {
+            # With enough budget, every location is registered as is.
+            10: ["s3://mybucket/x/test_table1/", "s3://mybucket/x/test_table2/", "s3://mybucket/y/deep/test_table3/", "s3://mybucket_2/test_table4/"],
+            4: ["s3://mybucket/x/test_table1/", "s3://mybucket/x/test_table2/", "s3://mybucket/y/deep/test_table3/", "s3://mybucket_2/test_table4/"],
+            # Widening test_table1 and test_table2 by one level is cheaper than widening test_table3 by two levels.
+            3: ["s3://mybucket/x/", "s3://mybucket/y/deep/test_table3/", "s3://mybucket_2/test_table4/"],
+            2: ["s3://mybucket/", "s3://mybucket_2/test_table4/"],
+        }
+        for max_locations, expected in expected_locations.items():
+            with self.subTest(max_locations=max_locations):
+                self.assertEqual(generator.generate_data_lake_locations(gdcCatalog, max_locations), expected)
+
+        coverage = generator.generate_data_lake_location_coverage(gdcCatalog, 2)
+        self.assertEqual([table.get_name() for table in coverage["s3://mybucket/"]], ["test_table1", "test_table2", "test_table3"])
+
+        # Buckets are never combined, so the budget cannot be lower than the number of buckets.
+        with self.assertRaises(ValueError):
+            generator.generate_data_lake_locations(gdcCatalog, 1)
+
+    def test_generate_data_lake_locations_matches_sorted_list_merge(self):
+        test_catalog = GlobalTestVariables.test_catalog_id
+        test_region = GlobalTestVariables.test_region
+        generator = LakeFormationS3DataLakeLocationGenerator()
+        random.seed(28)
+
+        for catalog_index in range(300):
+            gdcCatalog = GlueDataCatalog()
+            gdcCatalog.add_catalog(GlueCatalog(test_region, test_catalog))
+            gdcCatalog.add_database(GlueDatabase(test_region, test_catalog, "test_database"))
+            for table_index in range(random.randint(1, 12)):
+                directories = [random.choice(["a", "a-b", "ab", "c", "t1", "t3"]) for _ in range(random.randint(0, 4))]
+                location = "s3://" + "/".join([random.choice(["b", "b2"])] + directories) + random.choice(["", "/"])
+                gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", f"test_table{table_index}", location))
+
+            with self.subTest(catalog_index=catalog_index):
+                self.assertEqual(generator.generate_data_lake_locations(gdcCatalog),
+                                 sorted(_merge_sorted_locations([table.get_location() for table in gdcCatalog.get_tables()])))
+
+    def test_generate_data_lake_locations_requires_catalog(self):
+        with self.assertRaises(ValueError):
+            LakeFormationS3DataLakeLocationGenerator().generate_data_lake_locations(None)
+
 if __name__ == '__main__':
     unittest.main()
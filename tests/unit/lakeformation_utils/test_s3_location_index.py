@@ -0,0 +1,122 @@
+from lakeformation_utils.s3_location_index import S3LocationIndex
+from lakeformation_utils.s3_to_table_mapper import S3ToTableMapper
+from aws_resources.glue_data_catalog import GlueDataCatalog
+from aws_resources.glue_catalog import GlueCatalog
+from aws_resources.glue_database import GlueDatabase
+from aws_resources.glue_table import GlueTable
+from tests.unit.helpers.global_test_variables import GlobalTestVariables
+
+import os
+import tempfile
+import unittest
+
+class TestS3LocationIndex(unittest.TestCase):
+    """Tests that the memory mapped S3 location index answers the same as S3ToTableMapper."""
+
+    def setUp(self):
+        test_catalog = GlobalTestVariables.test_catalog_id
+        test_region = GlobalTestVariables.test_region
+
+        gdcCatalog = GlueDataCatalog()
+        gdcCatalog.add_catalog(GlueCatalog(test_region, test_catalog))
+        gdcCatalog.add_database(GlueDatabase(test_region, test_catalog, "test_database", "s3://mybucket/mydatabases/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table", "s3://mybucket/mydatabases/test_table/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table2", "s3://mybucket/mydatabases/test_table2/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table3", "s3://mybucket/mydatabases/test_table3/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table_nested", "s3://mybucket/mydatabases/test_table3/nested/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table_deep", "s3://mybucket_2/a/b/c/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table_same1", "s3://mybucket_3/shared/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table_same2", "s3://mybucket_3/shared/"))
+        gdcCatalog.add_table(GlueTable(test_region, test_catalog, "test_database", "test_table_view"))
+
+        self.mapper = S3ToTableMapper(gdcCatalog)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.temp_dir.name, "s3_location.idx")
+        S3LocationIndex.write(self.index_file, self.mapper)
+        self.index = S3LocationIndex(self.index_file)
+
+    def tearDown(self):
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def _assert_same_tables(self, expected, actual):
+        self.assertEqual(sorted(expected), sorted(actual))
+
+    def test_postfix_lookup_matches_mapper(self):
+        for s3_path in ["s3://mybucket/mydatabases/test_table/part=1/file.parquet",
+                        "s3://mybucket/mydatabases/test_table3/nested/file.parquet",
+                        "s3://mybucket/mydatabases/test_table3/other/",
+                        "s3://mybucket/mydatabases/",
+                        "s3://mybucket_2/a/b/",
+                        "s3://mybucket_2/a/x/",
+                        "s3://mybucket_3/shared/file.csv",
+                        "s3://unknown_bucket/path/",
+                        "s3://"]:
+            with self.subTest(s3_path=s3_path):
+                self._assert_same_tables(self.mapper.get_tables_from_s3_location_postfix(s3_path),
+                                         self.index.get_tables_from_s3_location_postfix(s3_path))
+
+    def test_prefix_lookup_matches_mapper(self):
+        for s3_path in ["s3://", "s3://mybucket/", "s3://mybucket/mydatabases/", "s3://mybucket/mydatabases/test_table3/",
+                        "s3://mybucket/mydata", "s3://mybucket_2/a/b/c/", "s3://mybucket_2/a/bc/", "s3://missing/"]:
+            with self.subTest(s3_path=s3_path):
+                self._assert_same_tables(self.mapper.get_all_tables_from_s3_path_prefix(s3_path),
+                                         self.index.get_all_tables_from_s3_path_prefix(s3_path))
+
+    def test_pattern_lookup_matches_mapper(self):
+        for s3_pattern in ["s3://mybucket/*/test_table?/*", "s3://*/nested/*", "s3://mybucket*/*", "s3://mybucket_?/a/*",
+                           "s3://mybucket/*/test_table", "s3://*", "s3://missing/*/x/*"]:
+            with self.subTest(s3_pattern=s3_pattern):
+                self._assert_same_tables(self.mapper.get_all_tables_matching_s3_path_pattern(s3_pattern),
+                                         self.index.get_all_tables_matching_s3_path_pattern(s3_pattern))
+
+    def test_arn_lookups(self):
+        tables = self.index.get_tables_from_s3_arn_postfix("arn:aws:s3:::mybucket_3/shared/")
+        self.assertEqual(sorted(table.get_name() for table in tables), ["test_table_same1", "test_table_same2"])
+
+        tables = self.index.get_all_tables_from_s3_arn_prefix("arn:aws:s3:::mybucket/mydatabases/")
+        self.assertEqual(len(tables), 4)
+
+    def test_tables_are_rebuilt_from_records(self):
+        tables = self.index.get_tables_from_s3_location_postfix("s3://mybucket_2/a/b/c/")
+        self.assertEqual(len(tables), 1)
+        table = tables[0]
+        self.assertEqual(table.get_region(), GlobalTestVariables.test_region)
+        self.assertEqual(table.get_catalog_id(), GlobalTestVariables.test_catalog_id)
+        self.assertEqual(table.get_database(), "test_database")
+        self.assertEqual(table.get_location(), "s3://mybucket_2/a/b/c/")
+
+    def test_get_all_tables(self):
+        self._assert_same_tables(self.mapper.get_all_tables(), self.index.get_all_tables())
+
+    def test_get_location_entries(self):
+        self.assertEqual(sorted((location, str(table)) for location, table in self.mapper.get_location_entries()),
+                         sorted((location, str(table)) for location, table in self.index.get_location_entries()))
+
+    def test_rejects_arn_for_path_lookup(self):
+        with self.assertRaises(ValueError):
+            self.index.get_all_tables_from_s3_path_prefix("arn:aws:s3:::mybucket/")
+
+    def test_rejects_invalid_file(self):
+        invalid_file = os.path.join(self.temp_dir.name, "invalid.idx")
+        with open(invalid_file, mode='wb') as f:
+            f.write(b"not an index file at all")
+        with self.assertRaises(ValueError):
+            S3LocationIndex(invalid_file)
+
+    def test_matches_fingerprint(self):
+        fingerprint_file = os.path.join(self.temp_dir.name, "fingerprint.idx")
+        S3LocationIndex.write(fingerprint_file, self.mapper, '{"include_databases": "sales_*"}')
+
+        self.assertTrue(S3LocationIndex.matches_fingerprint(fingerprint_file, '{"include_databases": "sales_*"}'))
+        self.assertFalse(S3LocationIndex.matches_fingerprint(fingerprint_file, '{"include_databases": "finance"}'))
+        self.assertFalse(S3LocationIndex.matches_fingerprint(self.index_file, '{"include_databases": "sales_*"}'))
+        self.assertFalse(S3LocationIndex.matches_fingerprint(os.path.join(self.temp_dir.name, "missing.idx"), ""))
+
+        invalid_file = os.path.join(self.temp_dir.name, "invalid.idx")
+        with open(invalid_file, mode='wb') as f:
+            f.write(b"not an index file at all")
+        self.assertFalse(S3LocationIndex.matches_fingerprint(invalid_file, ""))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -111,5 +111,50 @@ class TestS3ToTableMapper(unittest.TestCase):
         self.assertIsNotNone(tables)
         self.assertEqual(len(tables), 3)
 
+    def test_get_all_tables_matching_s3_path_pattern(self):
+        mapper = TestS3ToTableMapper.s3ToTableMapper
+        expected_tables = {
+            "s3://mybucket/mydatabases*/test_table2/*": ["test_table2", "test_table2"],
+            "s3://mybucket/mydatabases/test_table?/*": ["test_table2", "test_table3"],
+            # "*" matches across "/" like it does in IAM policies.
+            "s3://*/test_table/*": ["test_table", "test_table", "test_table14", "test_table15", "test_table16"],
+            "s3://mybucket_?/test_database4/*": ["test_table10", "test_table11", "test_table12", "test_table13",
+                                                 "test_table14", "test_table15", "test_table16"],
+            # Tables are only included when their whole location matches.
+            "s3://mybucket/*/test_table/part*": [],
+            "s3://mybucket/*/test_table/": [],
+            "s3://missing_bucket/*/test_table/*": [],
+        }
+        for s3_pattern, expected in expected_tables.items():
+            with self.subTest(s3_pattern=s3_pattern):
+                tables = mapper.get_all_tables_matching_s3_path_pattern(s3_pattern)
+                self.assertEqual(sorted(table.get_name() for table in tables), sorted(expected))
+
+    def test_get_all_tables_matching_s3_arn_pattern(self):
+        tables = TestS3ToTableMapper.s3ToTableMapper.get_all_tables_matching_s3_arn_pattern("arn:aws:s3:::mybucket/*s/test_table?/*")
+        self.assertEqual(sorted(table.get_name() for table in tables), ["test_table2", "test_table3"])
+
+        with self.assertRaises(ValueError):
+            TestS3ToTableMapper.s3ToTableMapper.get_all_tables_matching_s3_path_pattern("arn:aws:s3:::mybucket/*/test_table?/*")
+
+    def test_partition_locations_map_to_parent_table(self):
+        test_catalog = GlobalTestVariables.test_catalog_id
+        test_region = GlobalTestVariables.test_region
+
+        gdcCatalog = GlueDataCatalog()
+        gdcCatalog.add_catalog(GlueCatalog(test_region, test_catalog))
+        gdcCatalog.add_database(GlueDatabase(test_region, test_catalog, "test_database"))
+        table = GlueTable(test_region, test_catalog, "test_database", "test_table", "s3://mybucket/test_table/")
+        gdcCatalog.add_table(table)
+
+        s3ToTableMapper = S3ToTableMapper(gdcCatalog, { table: ["s3://archive/test_table/dt=1/", "s3://archive/test_table/dt=2/"] })
+
+        tables = s3ToTableMapper.get_tables_from_s3_location_postfix("s3://archive/test_table/dt=2/file.parquet")
+        self.assertEqual(tables, [table])
+        tables = s3ToTableMapper.get_tables_from_s3_location_postfix("s3://archive/test_table/dt=3/file.parquet")
+        self.assertEqual(tables, [])
+        self.assertEqual(s3ToTableMapper.get_all_tables_from_s3_path_prefix("s3://archive/"), [table])
+        self.assertEqual(s3ToTableMapper.get_all_tables(), [table])
+
 if __name__ == '__main__':
     unittest.main()
@@ -103,6 +103,37 @@ class TestPermissionsList(unittest.TestCase):
         permissionsForPrincipal3 = list(permissionsList.get_permissions_for_principal("principal3"))
         self.assertListEqual(permissionsForPrincipal3, [])
 
+    def test_permissions_list_add_permissions_in_bulk(self):
+        permissionsList = PermissionsList()
+        permissionsList.add_permission("principal1", "resource1", "glue:GetTable")
+
+        changed = permissionsList.add_permissions([
+            ("principal1", "resource1", ["glue:GetTable", "glue:UpdateTable"]),
+            ("principal1", "resource2", {"glue:GetTable"}),
+            ("principal2", "resource1", ("glue:GetTable",)),
+            ("principal2", "resource2", []),
+        ])
+
+        self.assertEqual(changed, 3)
+        self.assertEqual(permissionsList.get_permissions_count(), 3)
+        self.assertSetEqual(permissionsList.get_permission_actions("principal1", "resource1"), {"glue:GetTable", "glue:UpdateTable"})
+        self.assertIsNone(permissionsList.get_permission_actions("principal2", "resource2"))
+        self.assertEqual(permissionsList.add_permissions([("principal1", "resource2", ["glue:GetTable"])]), 0)
+
+    def test_permissions_list_add_encoded_permissions(self):
+        permissionsList = PermissionsList()
+        principal_arns = ["principal1", "principal2"]
+        resource_arns = ["resource1", "resource2"]
+
+        changed = permissionsList.add_encoded_permissions(principal_arns, resource_arns, ["glue:GetTable", "glue:UpdateTable"],
+                                                          [(0, 0, [0, 1]), (0, 1, [0]), (1, 0, [1]), (1, 1, [])])
+
+        self.assertEqual(changed, 3)
+        self.assertEqual(permissionsList.get_permissions_count(), 3)
+        self.assertSetEqual(permissionsList.get_permission_actions("principal1", "resource1"), {"glue:GetTable", "glue:UpdateTable"})
+        self.assertSetEqual(permissionsList.get_permission_actions("principal2", "resource1"), {"glue:UpdateTable"})
+        self.assertIsNone(permissionsList.get_permission_actions("principal2", "resource2"))
+
     def test_permissions_list_iteration(self):
         permissionsList = PermissionsList()
 
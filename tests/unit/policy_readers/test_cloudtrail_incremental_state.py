@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+from permissions.permissions_list import PermissionsList
+from policy_readers.cloudtrail_incremental_state import CloudTrailIncrementalState
+from policy_readers.glue_cloudtrail_reader import GlueEventCloudTrailPolicyReader
+
+# pylint: disable=all
+
+PRINCIPAL = "arn:aws:iam::123456789012:role/role1"
+NOW = datetime(2024, 2, 1, 0, 10, 0, tzinfo=timezone.utc)
+
+
+class TestCloudTrailIncrementalState(unittest.TestCase):
+    """Tests the watermark and aggregated permissions kept between incremental CloudTrail runs."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self._state_filename = os.path.join(self._directory.name, "state.json")
+
+    def _permissions(self, *permissions):
+        permissionsList = PermissionsList()
+        for principal_arn, resource_arn, action in permissions:
+            permissionsList.add_permission(principal_arn, resource_arn, action)
+        return permissionsList
+
+    def test_create_is_none_without_state_file(self):
+        self.assertIsNone(CloudTrailIncrementalState.create({}))
+        self.assertIsNotNone(CloudTrailIncrementalState.create({"incremental_state_file": self._state_filename}))
+
+    def test_first_run_reads_up_to_lag(self):
+        state = CloudTrailIncrementalState(self._state_filename, partition_column="timestamp")
+
+        self.assertIsNone(state.get_watermark())
+        self.assertEqual(state.get_time_range(NOW).get_query_predicate(), "eventtime <= '2024-01-31T23:55:00Z' AND \"timestamp\" <= '2024/01/31'")
+
+    def test_later_runs_read_since_watermark_and_merge(self):
+        state = CloudTrailIncrementalState(self._state_filename, partition_column="timestamp")
+        state.get_time_range(NOW)
+        state.save(self._permissions((PRINCIPAL, "resource1", "glue:GetTable")))
+
+        state = CloudTrailIncrementalState(self._state_filename, lag_minutes=0, partition_column="timestamp",
+                                           partition_format="yyyy/MM/dd/HH")
+        self.assertEqual(state.get_watermark(), datetime(2024, 1, 31, 23, 55, 0, tzinfo=timezone.utc))
+        self.assertEqual(state.get_time_range(datetime(2024, 2, 2, 1, 0, 0, tzinfo=timezone.utc)).get_query_predicate(),
+                         "eventtime > '2024-01-31T23:55:00Z' AND eventtime <= '2024-02-02T01:00:00Z' AND "
+                         "\"timestamp\" <= '2024/02/02/01' AND \"timestamp\" >= '2024/01/31/23'")
+        permissions = state.save(self._permissions((PRINCIPAL, "resource1", "glue:UpdateTable"), (PRINCIPAL, "resource2", "glue:GetTable")))
+
+        self.assertEqual(permissions.get_permissions_count(), 2)
+        self.assertSetEqual(permissions.get_permission_actions(PRINCIPAL, "resource1"), {"glue:GetTable", "glue:UpdateTable"})
+        self.assertEqual(CloudTrailIncrementalState(self._state_filename).get_watermark(), datetime(2024, 2, 2, 1, 0, 0, tzinfo=timezone.utc))
+
+    def test_state_is_not_saved_without_a_query(self):
+        state = CloudTrailIncrementalState(self._state_filename)
+
+        with self.assertRaises(AssertionError):
+            state.save(PermissionsList())
+        self.assertFalse(os.path.exists(self._state_filename))
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.start_query_execution", return_value="query-id")
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_reader_queries_since_watermark(self, get_query_results, start_query_execution):
+        get_query_results.side_effect = lambda *args, **kwargs: pd.DataFrame([
+            {"user_arn": PRINCIPAL, "eventname": "GetDatabase", "permission": "DESCRIBE", "resource_level": "DATABASE",
+             "resource": "{}", "awsRegion": "us-east-1", "aws_account_id": "123456789012", "database_name": f"db{get_query_results.call_count}",
+             "table_name": None}])
+        config = {"athena_workgroup": "primary", "athena_cloudtrail_database": "cloudtrail_db", "athena_cloudtrail_table": "cloudtrail",
+                  "athena_query_results_location": "s3://results/", "incremental_state_file": self._state_filename}
+
+        GlueEventCloudTrailPolicyReader(Mock(), config).read_policies()
+        self.assertNotIn("eventtime >", start_query_execution.call_args.args[0])
+        permissions = GlueEventCloudTrailPolicyReader(Mock(), config).read_policies()
+
+        self.assertIn("eventtime >", start_query_execution.call_args.args[0])
+        self.assertEqual(sorted(permission.resource_arn() for permission in permissions),
+                         ["arn:aws:glue:us-east-1:123456789012:database/db1", "arn:aws:glue:us-east-1:123456789012:database/db2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
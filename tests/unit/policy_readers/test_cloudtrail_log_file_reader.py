@@ -0,0 +1,152 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from config.configuration_exceptions import ConfigurationInvalidException
+from policy_readers.cloudtrail_log_file_reader import CloudTrailLogFilePolicyReader
+from policy_readers.cloudtrail_log_parser import CloudTrailLogParser
+
+# pylint: disable=all
+
+ROLE_ARN = "arn:aws:iam::123456789012:role/role1"
+USER_ARN = "arn:aws:iam::123456789012:user/user1"
+
+
+def _glue_record(event_name, request_parameters, identity_type="AssumedRole", error_code=None):
+    user_identity = {"type": identity_type, "accountId": "123456789012"}
+    if identity_type == "AssumedRole":
+        user_identity["sessionContext"] = {"sessionIssuer": {"arn": ROLE_ARN}}
+    else:
+        user_identity["arn"] = USER_ARN
+    record = {"eventSource": "glue.amazonaws.com", "eventName": event_name, "awsRegion": "us-east-1",
+              "userIdentity": user_identity, "requestParameters": request_parameters}
+    if error_code is not None:
+        record["errorCode"] = error_code
+    return record
+
+
+def _s3_record(event_name, bucket, key):
+    return {"eventSource": "s3.amazonaws.com", "eventName": event_name, "awsRegion": "us-east-1",
+            "userIdentity": {"type": "IAMUser", "arn": USER_ARN, "accountId": "123456789012"},
+            "requestParameters": {"bucketName": bucket, "key": key}}
+
+
+def _write_log_file(path, records):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as log_file:
+        json.dump({"Records": records}, log_file)
+
+
+class TestCloudTrailLogParser(unittest.TestCase):
+    """Tests that CloudTrail records are mapped to the same resources as the Athena queries."""
+
+    def test_glue_events_are_mapped_to_resource_levels(self):
+        glue_events, s3_events = {}, {}
+        CloudTrailLogParser.add_records([
+            _glue_record("GetDatabases", {}),
+            _glue_record("CreateDatabase", {"databaseInput": {"name": "db1"}}, identity_type="IAMUser"),
+            _glue_record("GetDatabase", {"name": "db1"}),
+            _glue_record("GetTables", {"databaseName": "db1"}),
+            _glue_record("CreateTable", {"databaseName": "db1", "tableInput": {"name": "table1"}}),
+            _glue_record("GetTable", {"databaseName": "db1", "name": "table1"}),
+            _glue_record("GetPartitions", {"catalogId": "111122223333", "databaseName": "db2", "tableName": "table2"}),
+        ], glue_events, s3_events)
+
+        self.assertDictEqual(glue_events, {
+            (ROLE_ARN, "arn:aws:glue:us-east-1:123456789012:catalog"): {"GetDatabases"},
+            (USER_ARN, "arn:aws:glue:us-east-1:123456789012:catalog"): {"CreateDatabase"},
+            (ROLE_ARN, "arn:aws:glue:us-east-1:123456789012:database/db1"): {"GetDatabase", "GetTables", "CreateTable"},
+            (ROLE_ARN, "arn:aws:glue:us-east-1:123456789012:table/db1/table1"): {"GetTable"},
+            (ROLE_ARN, "arn:aws:glue:us-east-1:111122223333:table/db2/table2"): {"GetPartitions"},
+        })
+        self.assertDictEqual(s3_events, {})
+
+    def test_unsupported_glue_events_are_skipped(self):
+        glue_events, s3_events = {}, {}
+        CloudTrailLogParser.add_records([
+            _glue_record("GetTable", {"databaseName": "db1", "name": "table1"}, error_code="EntityNotFoundException"),
+            _glue_record("GetTable", {"databaseName": "db1", "name": "table1"}, identity_type="AWSService"),
+            _glue_record("GetTable", {"name": "table1"}),
+            _glue_record("GetDatabase", {"name": {"nested": "db1"}}),
+            _glue_record("GetJobs", {}),
+        ], glue_events, s3_events)
+
+        self.assertDictEqual(glue_events, {})
+
+    def test_s3_events_are_mapped_to_key_prefixes(self):
+        glue_events, s3_events = {}, {}
+        CloudTrailLogParser.add_records([
+            _s3_record("GetObject", "bucket", "table1/part=1/file.parquet"),
+            _s3_record("PutObject", "bucket", "table1/part=1/file2.parquet"),
+            _s3_record("GetObject", "bucket", "file.csv"),
+            _s3_record("PutObject", "bucket", "table1/.hive-staging_hive_1/file"),
+            _s3_record("ListObjects", "bucket", "table1/"),
+        ], glue_events, s3_events)
+
+        self.assertDictEqual(s3_events, {
+            (USER_ARN, "arn:aws:s3:::bucket/table1/part=1/"): {"GetObject", "PutObject"},
+            (USER_ARN, "arn:aws:s3:::bucket/"): {"GetObject"},
+        })
+        self.assertDictEqual(glue_events, {})
+
+
+class TestCloudTrailLogFilePolicyReader(unittest.TestCase):
+    """Tests reading permissions from CloudTrail log files on disk."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        for day in range(1, 5):
+            _write_log_file(os.path.join(self._directory.name, "us-east-1", "2024", "01", f"{day:02}", f"log{day}.json.gz"), [
+                _glue_record("GetTable", {"databaseName": "db1", "name": f"table{day % 2}"}),
+                _glue_record("UpdateTable", {"databaseName": "db1", "name": "table1"}),
+                _s3_record("GetObject", "bucket", f"table{day % 2}/file{day}.parquet"),
+                _s3_record("DeleteObject", "bucket", "unknown/file.parquet"),
+            ])
+        with open(os.path.join(self._directory.name, "us-east-1", "2024", "01", "01", "digest.json"), "w") as other_file:
+            other_file.write("{}")
+        with open(os.path.join(self._directory.name, "us-east-1", "2024", "01", "01", "corrupt.json.gz"), "wb") as corrupt_file:
+            corrupt_file.write(b"not gzip")
+
+        self._app_config = Mock()
+        self._app_config.get_s3_to_table_translator.return_value.get_tables_from_s3_arn_postfix.side_effect = \
+            lambda s3_path: [] if "unknown" in s3_path else [Mock()]
+
+    def _read_policies(self, **config):
+        config = {"cloudtrail_log_directory": self._directory.name, **config}
+        return CloudTrailLogFilePolicyReader(self._app_config, config).read_policies()
+
+    def _assert_permissions(self, permissions):
+        self.assertEqual(permissions.get_permissions_count(), 4)
+        self.assertSetEqual(permissions.get_permission_actions(ROLE_ARN, "arn:aws:glue:us-east-1:123456789012:table/db1/table1"),
+                            {"glue:GetTable", "glue:UpdateTable"})
+        self.assertSetEqual(permissions.get_permission_actions(ROLE_ARN, "arn:aws:glue:us-east-1:123456789012:table/db1/table0"),
+                            {"glue:GetTable"})
+        self.assertSetEqual(permissions.get_permission_actions(USER_ARN, "arn:aws:s3:::bucket/table0/"), {"s3:GetObject"})
+        self.assertSetEqual(permissions.get_permission_actions(USER_ARN, "arn:aws:s3:::bucket/table1/"), {"s3:GetObject"})
+
+    def test_read_policies_in_one_process(self):
+        self._assert_permissions(self._read_policies(max_workers="1"))
+
+    def test_read_policies_in_process_pool(self):
+        self._assert_permissions(self._read_policies(max_workers="2"))
+
+    def test_read_only_glue_events(self):
+        permissions = self._read_policies(max_workers="1", read_s3_events="false")
+
+        self.assertEqual(permissions.get_permissions_count(), 2)
+        self.assertIsNone(permissions.get_permission_actions(USER_ARN, "arn:aws:s3:::bucket/table1/"))
+
+    def test_missing_directory_is_invalid(self):
+        with self.assertRaises(ConfigurationInvalidException):
+            CloudTrailLogFilePolicyReader(self._app_config, {"cloudtrail_log_directory": os.path.join(self._directory.name, "missing")}).read_policies()
+
+        with self.assertRaises(ConfigurationInvalidException):
+            CloudTrailLogFilePolicyReader(self._app_config, {}).read_policies()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pandas as pd
+
+from policy_readers.cloudtrail_query_cache import CloudTrailQueryCache
+from policy_readers.cloudtrail_query_options import CloudTrailQueryOptions
+from policy_readers.cloudtrail_query_runner import CloudTrailQueryRunner
+from policy_readers.s3_cloudtrail_reader import S3CloudTrailDataEventsReader
+
+# pylint: disable=all
+
+PRINCIPAL = "arn:aws:iam::123456789012:role/role1"
+NOW = datetime(2024, 2, 1, 10, 42, 7, tzinfo=timezone.utc)
+
+
+def _add_permissions(permissions_list, results_df):
+    for row in results_df.itertuples():
+        permissions_list.add_permission(PRINCIPAL, row.resource, "glue:GetTable")
+
+
+class TestCloudTrailQueryCache(unittest.TestCase):
+    """Tests caching CloudTrail query results in local Parquet files."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self._cache = CloudTrailQueryCache(os.path.join(self._directory.name, "cache"), max_age_minutes=60)
+
+    def test_results_are_cached_once_read_completely(self):
+        chunks = [pd.DataFrame({"s3_path": ["arn:aws:s3:::bucket/table1/"], "events": [np.array(["GetObject", "PutObject"])]}),
+                  pd.DataFrame({"s3_path": ["arn:aws:s3:::bucket/table2/"], "events": [np.array(["GetObject"])]})]
+
+        results = self._cache.write("SELECT 1", iter(chunks))
+        next(results)
+        self.assertFalse(self._cache.contains("SELECT 1"))
+        list(results)
+
+        self.assertTrue(self._cache.contains("SELECT 1"))
+        self.assertFalse(self._cache.contains("SELECT 2"))
+        cached = list(self._cache.read("SELECT 1"))
+        self.assertEqual(len(cached), 2)
+        self.assertEqual(cached[0]["s3_path"].tolist(), ["arn:aws:s3:::bucket/table1/"])
+        self.assertEqual(list(cached[0]["events"][0]), ["GetObject", "PutObject"])
+
+    def test_failed_read_is_not_cached(self):
+        def failing_results():
+            yield pd.DataFrame({"resource": ["table1"]})
+            raise RuntimeError("Query failed")
+
+        with self.assertRaises(RuntimeError):
+            list(self._cache.write("SELECT 1", failing_results()))
+
+        self.assertFalse(self._cache.contains("SELECT 1"))
+        self.assertEqual(os.listdir(os.path.join(self._directory.name, "cache")), [])
+
+    def test_expired_entry_is_not_used(self):
+        list(self._cache.write("SELECT 1", iter([pd.DataFrame({"resource": ["table1"]})])))
+        entry_directory = os.path.join(self._directory.name, "cache", os.listdir(os.path.join(self._directory.name, "cache"))[0])
+        expired = time.time() - 61 * 60
+        os.utime(entry_directory, (expired, expired))
+
+        self.assertFalse(self._cache.contains("SELECT 1"))
+
+    def test_time_window_is_aligned_to_max_age(self):
+        self.assertEqual(self._cache.align(NOW), datetime(2024, 2, 1, 10, 0, 0, tzinfo=timezone.utc))
+
+        config = {"query_lookback_days": "30", "query_cache_directory": os.path.join(self._directory.name, "cache")}
+        first_run = CloudTrailQueryRunner.get_time_ranges(config, None, NOW, self._cache)
+        second_run = CloudTrailQueryRunner.get_time_ranges(config, None, NOW.replace(minute=59), self._cache)
+        self.assertEqual(first_run[0].get_end(), datetime(2024, 2, 1, 10, 0, 0, tzinfo=timezone.utc))
+        self.assertEqual(first_run[0].get_query_predicate(), second_run[0].get_query_predicate())
+
+    def test_rerun_reads_from_cache(self):
+        reader = Mock()
+        reader.start_query.side_effect = lambda sql: sql
+        reader.read_query_results.side_effect = lambda sql: iter([pd.DataFrame({"resource": [sql]})])
+        config = {"query_lookback_days": "30", "query_shards": "3", "query_cache_directory": os.path.join(self._directory.name, "cache")}
+
+        for _ in range(2):
+            options = CloudTrailQueryOptions.create(config)
+            runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions, options)
+            runner.submit(CloudTrailQueryRunner.get_time_ranges(config, None, NOW, options.get_query_cache()))
+            permissions = runner.read_permissions()
+            self.assertEqual(permissions.get_permissions_count(), 3)
+
+        self.assertEqual(reader.start_query.call_count, 3)
+        self.assertEqual(reader.read_query_results.call_count, 3)
+
+
+class TestCloudTrailQueryCacheWithTableLookup(unittest.TestCase):
+    """Tests that results joined to the S3 table location lookup are only reused for the same table locations."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self._config = {"athena_workgroup": "primary", "athena_cloudtrail_database": "cloudtrail_db", "athena_cloudtrail_table": "cloudtrail",
+                        "athena_query_results_location": "s3://results/", "athena_table_lookup": "true",
+                        "query_cache_directory": os.path.join(self._directory.name, "cache")}
+        for target, kwargs in [("aws_resources.readers.athena_query_reader.wr.athena.start_query_execution", {"return_value": "query-id"}),
+                               ("aws_resources.readers.athena_query_reader.wr.athena.get_query_results",
+                                {"side_effect": lambda *args, **kwargs: pd.DataFrame([{"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table1/", "events": "[GetObject]"}])}),
+                               ("policy_readers.s3_table_location_lookup.wr.catalog.does_table_exist", {"return_value": False}),
+                               ("policy_readers.s3_table_location_lookup.wr.s3.to_parquet", {})]:
+            patcher = patch(target, **kwargs)
+            setattr(self, "_" + target.rsplit(".", 1)[1], patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def _read_policies(self, locations):
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value.get_location_entries.side_effect = lambda: iter([(location, Mock()) for location in locations])
+        app_config.get_s3_to_table_translator.return_value.get_tables_from_s3_arn_postfix.return_value = [Mock()]
+        return S3CloudTrailDataEventsReader(app_config, self._config).read_policies()
+
+    def test_changed_table_locations_are_not_read_from_cache(self):
+        self._read_policies(["s3://bucket/table1/", "s3://bucket/table2/"])
+        self.assertEqual(self._start_query_execution.call_count, 1)
+
+        # The same table locations are read from the cache, without uploading the lookup table again.
+        permissions = self._read_policies(["s3://bucket/table2/", "s3://bucket/table1/"])
+        self.assertEqual(self._start_query_execution.call_count, 1)
+        self.assertEqual(self._to_parquet.call_count, 1)
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/table1/"), {"s3:GetObject"})
+
+        # Other table locations, ie with other filters, are rolled up to other locations, so the query is run again.
+        self._read_policies(["s3://bucket/"])
+        self.assertEqual(self._start_query_execution.call_count, 2)
+        self.assertEqual(self._to_parquet.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
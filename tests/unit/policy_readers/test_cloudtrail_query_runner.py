@@ -0,0 +1,193 @@
+import threading
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+import pandas as pd
+
+from config.configuration_exceptions import ConfigurationInvalidException
+from policy_readers.cloudtrail_query_options import CloudTrailQueryOptions
+from policy_readers.cloudtrail_query_runner import CloudTrailQueryRunner
+from policy_readers.cloudtrail_time_range import CloudTrailTimeRange
+
+# pylint: disable=all
+
+PRINCIPAL = "arn:aws:iam::123456789012:role/role1"
+NOW = datetime(2024, 2, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def _add_permissions(permissions_list, results_df):
+    for row in results_df.itertuples():
+        permissions_list.add_permission(PRINCIPAL, row.resource, "glue:GetTable")
+
+
+class TestCloudTrailTimeRange(unittest.TestCase):
+    """Tests the predicates of CloudTrail time ranges, and splitting them into shards."""
+
+    def test_split_into_consecutive_ranges(self):
+        time_range = CloudTrailTimeRange(datetime(2024, 1, 1, tzinfo=timezone.utc), NOW, "timestamp")
+
+        shards = time_range.split(3)
+
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(shards[0].get_start(), time_range.get_start())
+        self.assertEqual(shards[-1].get_end(), NOW)
+        for shard, next_shard in zip(shards, shards[1:]):
+            self.assertEqual(shard.get_end(), next_shard.get_start())
+            self.assertEqual(shard.get_end().microsecond, 0)
+        self.assertEqual(shards[1].get_query_predicate(),
+                         "eventtime > '2024-01-11T08:00:00Z' AND eventtime <= '2024-01-21T16:00:00Z' AND "
+                         "\"timestamp\" <= '2024/01/21' AND \"timestamp\" >= '2024/01/11'")
+
+    def test_short_range_is_not_split_below_a_second(self):
+        time_range = CloudTrailTimeRange(NOW.replace(second=0), NOW.replace(second=2))
+
+        self.assertEqual(len(time_range.split(10)), 2)
+
+    def test_range_without_start_cannot_be_split(self):
+        with self.assertRaises(ValueError):
+            CloudTrailTimeRange(None, NOW).split(2)
+
+
+class TestCloudTrailQueryRunner(unittest.TestCase):
+    """Tests running CloudTrail queries in shards, with retries."""
+
+    def _reader(self, failures : dict[str, int] | None = None):
+        failures = failures or {}
+        reader = Mock()
+        attempts = {}
+        lock = threading.Lock()
+
+        def start_query(sql):
+            return sql
+
+        def read_query_results(sql):
+            with lock:
+                attempts[sql] = attempts.get(sql, 0) + 1
+                if attempts[sql] <= failures.get(sql, 0):
+                    raise RuntimeError("Query timed out")
+            yield pd.DataFrame({"resource": [sql]})
+
+        reader.start_query.side_effect = start_query
+        reader.read_query_results.side_effect = read_query_results
+        return reader
+
+    def test_time_ranges_without_sharding(self):
+        self.assertEqual(CloudTrailQueryRunner.get_time_ranges({}, None, NOW), [None])
+
+        time_ranges = CloudTrailQueryRunner.get_time_ranges({"query_lookback_days": "31"}, None, NOW)
+        self.assertEqual(len(time_ranges), 1)
+        self.assertEqual(time_ranges[0].get_start(), datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    def test_time_ranges_with_sharding(self):
+        time_ranges = CloudTrailQueryRunner.get_time_ranges({"query_lookback_days": "30", "query_shards": "30"}, None, NOW)
+
+        self.assertEqual(len(time_ranges), 30)
+        self.assertEqual(time_ranges[0].get_end(), datetime(2024, 1, 3, tzinfo=timezone.utc))
+
+        with self.assertRaises(ConfigurationInvalidException):
+            CloudTrailQueryRunner.get_time_ranges({"query_shards": "30"}, None, NOW)
+
+    def test_shards_are_merged(self):
+        reader = self._reader()
+        runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions, CloudTrailQueryOptions(max_concurrency=2))
+        time_ranges = CloudTrailTimeRange(datetime(2024, 1, 1, tzinfo=timezone.utc), NOW).split(5)
+
+        runner.submit(time_ranges)
+        permissions = runner.read_permissions()
+
+        self.assertEqual(permissions.get_permissions_count(), 5)
+        self.assertEqual(reader.start_query.call_count, 5)
+
+    def test_first_shards_are_started_on_submit(self):
+        reader = self._reader()
+        queries_complete = threading.Event()
+        reader.read_query_results.side_effect = lambda query_execution_id: iter([]) if queries_complete.wait(5) else None
+        runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions, CloudTrailQueryOptions(max_concurrency=2))
+
+        runner.submit(CloudTrailTimeRange(datetime(2024, 1, 1, tzinfo=timezone.utc), NOW).split(4))
+
+        # The other shards are only started once a running shard completes.
+        self.assertEqual(reader.start_query.call_count, 2)
+        queries_complete.set()
+        runner.read_permissions()
+        self.assertEqual(reader.start_query.call_count, 4)
+
+    def test_query_is_prepared_once_before_the_first_query(self):
+        reader = self._reader()
+        prepare_query = Mock(side_effect=lambda: self.assertEqual(reader.start_query.call_count, 0))
+        runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions,
+                                       CloudTrailQueryOptions(max_concurrency=2, prepare_query=prepare_query))
+
+        runner.submit(CloudTrailTimeRange(datetime(2024, 1, 1, tzinfo=timezone.utc), NOW).split(4))
+        runner.read_permissions()
+
+        prepare_query.assert_called_once()
+        self.assertEqual(reader.start_query.call_count, 4)
+
+    def test_failed_shard_is_retried_alone(self):
+        time_ranges = CloudTrailTimeRange(datetime(2024, 1, 1, tzinfo=timezone.utc), NOW).split(3)
+        failed_sql = f"shard AND {time_ranges[1].get_query_predicate()}"
+        reader = self._reader({failed_sql: 2})
+        runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions, CloudTrailQueryOptions(max_retries=2))
+
+        runner.submit(time_ranges)
+        permissions = runner.read_permissions()
+
+        self.assertEqual(permissions.get_permissions_count(), 3)
+        self.assertEqual(reader.start_query.call_count, 5)
+        self.assertEqual([call.args[0] for call in reader.start_query.call_args_list].count(failed_sql), 3)
+
+    def test_shard_failing_every_retry_fails_the_read(self):
+        reader = self._reader({"shard ": 3})
+        runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions, CloudTrailQueryOptions(max_retries=2))
+
+        runner.submit([None])
+        with self.assertRaises(RuntimeError):
+            runner.read_permissions()
+
+
+    def test_cancel_stops_running_queries_without_retrying(self):
+        reader = self._reader()
+        stopped = set()
+        all_stopped = threading.Event()
+
+        def read_query_results(query_execution_id):
+            if not all_stopped.wait(5):
+                raise TimeoutError("The queries were not stopped")
+            raise RuntimeError("Query was cancelled")
+            yield
+
+        def stop_query(query_execution_id):
+            stopped.add(query_execution_id)
+            if len(stopped) == 2:
+                all_stopped.set()
+
+        reader.read_query_results.side_effect = read_query_results
+        reader.stop_query.side_effect = stop_query
+        runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions, CloudTrailQueryOptions(max_concurrency=2, max_retries=2))
+        time_ranges = CloudTrailTimeRange(datetime(2024, 1, 1, tzinfo=timezone.utc), NOW).split(4)
+
+        runner.submit(time_ranges)
+        runner.cancel()
+        for future in list(runner._futures):
+            with self.assertRaises(Exception):
+                future.result(timeout=5)
+
+        self.assertEqual(stopped, {f"shard AND {time_range.get_query_predicate()}" for time_range in time_ranges[:2]})
+        # The stopped queries are not retried, and the other shards are not started.
+        self.assertEqual(reader.start_query.call_count, 2)
+
+    def test_cancel_after_read_does_nothing(self):
+        reader = self._reader()
+        runner = CloudTrailQueryRunner(reader, lambda predicate: f"shard {predicate}", _add_permissions)
+
+        runner.submit([None])
+        runner.read_permissions()
+        runner.cancel()
+
+        reader.stop_query.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pandas as pd
+
+from aws_resources.glue_catalog import GlueCatalog
+from aws_resources.glue_data_catalog import GlueDataCatalog
+from aws_resources.glue_database import GlueDatabase
+from aws_resources.glue_table import GlueTable
+from lakeformation_utils.s3_to_table_mapper import S3ToTableMapper
+from policy_readers.glue_cloudtrail_reader import GlueEventCloudTrailPolicyReader
+from policy_readers.s3_cloudtrail_reader import S3CloudTrailDataEventsReader
+
+# pylint: disable=all
+
+PRINCIPAL = "arn:aws:iam::123456789012:role/role1"
+CONFIG = {
+    "athena_workgroup": "primary",
+    "athena_cloudtrail_database": "cloudtrail_db",
+    "athena_cloudtrail_table": "cloudtrail",
+    "athena_query_results_location": "s3://results/",
+    "athena_chunk_size": "2",
+}
+
+
+def _glue_event(eventname, resource_level, database_name=None, table_name=None):
+    return {"user_arn": PRINCIPAL, "eventname": eventname, "permission": "DESCRIBE", "resource_level": resource_level,
+            "resource": "{}", "awsRegion": "us-east-1", "aws_account_id": "123456789012",
+            "database_name": database_name, "table_name": table_name}
+
+
+class TestCloudTrailReadersChunks(unittest.TestCase):
+    """Tests that the CloudTrail readers fold every chunk of the Athena results into the permissions list."""
+
+    def setUp(self):
+        patcher = patch("aws_resources.readers.athena_query_reader.wr.athena.start_query_execution", return_value="query-id")
+        self._start_query_execution = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_glue_events_are_read_in_chunks(self, get_query_results):
+        get_query_results.return_value = iter([
+            pd.DataFrame([_glue_event("GetDatabases", "CATALOG"), _glue_event("GetDatabase", "DATABASE", "db1")]),
+            pd.DataFrame([_glue_event("GetTable", "TABLE", "db1", "table1")]),
+        ])
+
+        permissions = GlueEventCloudTrailPolicyReader(Mock(), CONFIG).read_policies()
+
+        self.assertEqual(get_query_results.call_args.kwargs["chunksize"], 2)
+        self.assertEqual(sorted(permission.resource_arn() for permission in permissions.get_permissions()),
+                         ["arn:aws:glue:us-east-1:123456789012:catalog",
+                          "arn:aws:glue:us-east-1:123456789012:database/db1",
+                          "arn:aws:glue:us-east-1:123456789012:table/db1/table1"])
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_s3_events_are_read_in_chunks(self, get_query_results):
+        get_query_results.return_value = iter([
+            pd.DataFrame([{"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table1/", "events": "[GetObject, PutObject]"},
+                          {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/unknown/", "events": "[GetObject]"}]),
+            pd.DataFrame([{"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table2/", "events": "[GetObject]"}]),
+        ])
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value.get_tables_from_s3_arn_postfix.side_effect = \
+            lambda s3_path: [] if "unknown" in s3_path else [Mock()]
+
+        permissions = S3CloudTrailDataEventsReader(app_config, CONFIG).read_policies()
+
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/table1/"), {"s3:GetObject", "s3:PutObject"})
+        self.assertEqual(permissions.get_permissions_count(), 2)
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_glue_events_with_nulls_are_skipped(self, get_query_results):
+        get_query_results.return_value = iter([pd.DataFrame([
+            _glue_event("GetTable", "TABLE", "db1", "table1"),
+            _glue_event("UpdateTable", "TABLE", "db1", "table1"),
+            _glue_event("GetTable", "TABLE", "db1", None),
+            _glue_event("GetDatabase", "DATABASE", None),
+            dict(_glue_event("GetDatabase", "DATABASE", "db2"), user_arn=None),
+            dict(_glue_event("GetDatabase", "DATABASE", "db3"), awsRegion=None),
+            _glue_event("GetSomething", "UNKNOWN"),
+        ])])
+
+        permissions = GlueEventCloudTrailPolicyReader(Mock(), CONFIG).read_policies()
+
+        self.assertEqual(permissions.get_permissions_count(), 1)
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:glue:us-east-1:123456789012:table/db1/table1"),
+                         {"glue:GetTable", "glue:UpdateTable"})
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_s3_events_with_nulls_are_skipped(self, get_query_results):
+        get_query_results.return_value = iter([pd.DataFrame([
+            {"principal_arn": None, "s3_path": "arn:aws:s3:::bucket/table1/", "events": "[GetObject]"},
+            {"principal_arn": PRINCIPAL, "s3_path": None, "events": "[GetObject]"},
+            {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table1/", "events": "[DeleteObject]"},
+        ])])
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value.get_tables_from_s3_arn_postfix.return_value = [Mock()]
+
+        permissions = S3CloudTrailDataEventsReader(app_config, CONFIG).read_policies()
+
+        self.assertEqual(permissions.get_permissions_count(), 1)
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/table1/"), {"s3:DeleteObject"})
+
+    @patch("aws_resources.readers.athena_query_reader.wr.s3.delete_objects")
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_s3_events_are_read_as_lists_with_unload(self, get_query_results, delete_objects):
+        get_query_results.return_value = pd.DataFrame([
+            {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table1/", "events": np.array(["GetObject", "PutObject"])},
+            {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table2/", "events": []},
+        ])
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value.get_tables_from_s3_arn_postfix.return_value = [Mock()]
+
+        permissions = S3CloudTrailDataEventsReader(app_config, {**CONFIG, "athena_unload_approach": "true"}).read_policies()
+
+        self.assertTrue(self._start_query_execution.call_args.args[0].startswith("UNLOAD ("))
+        delete_objects.assert_called_once()
+        self.assertEqual(permissions.get_permissions_count(), 1)
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/table1/"), {"s3:GetObject", "s3:PutObject"})
+
+    @patch("policy_readers.s3_table_location_lookup.wr.catalog.does_table_exist", return_value=False)
+    @patch("policy_readers.s3_table_location_lookup.wr.s3.to_parquet")
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_s3_paths_are_joined_to_table_lookup(self, get_query_results, to_parquet, does_table_exist):
+        get_query_results.return_value = pd.DataFrame([
+            {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table1/", "events": "[GetObject]"},
+        ])
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value.get_location_entries.side_effect = lambda: iter([
+            ("s3://bucket/table1/", Mock()), ("s3://bucket/table1/", Mock()), ("s3://other_bucket/table2/", Mock())])
+        app_config.get_s3_to_table_translator.return_value.get_tables_from_s3_arn_postfix.return_value = [Mock()]
+
+        reader = S3CloudTrailDataEventsReader(app_config, {**CONFIG, "athena_table_lookup": "true"})
+        permissions = reader.read_policies()
+
+        locations_df = to_parquet.call_args.kwargs["df"]
+        self.assertEqual(locations_df["location"].tolist(), ["arn:aws:s3:::bucket/table1/", "arn:aws:s3:::other_bucket/table2/"])
+        self.assertEqual(locations_df["bucket"].tolist(), ["bucket", "other_bucket"])
+        table = to_parquet.call_args.kwargs["table"]
+        self.assertRegex(table, r"^lf_migration_s3_table_locations_[0-9a-f]{16}$")
+        self.assertEqual(to_parquet.call_args.kwargs["path"], f"s3://results/table_locations/{table[-16:]}/")
+        self.assertEqual(to_parquet.call_args.kwargs["mode"], "append")
+        self.assertIn(f"JOIN \"cloudtrail_db\".\"{table}\" table_locations", self._start_query_execution.call_args.args[0])
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/table1/"), {"s3:GetObject"})
+
+        # The same locations use the same table, and other locations, ie with other filters, use another one.
+        same_reader = S3CloudTrailDataEventsReader(app_config, {**CONFIG, "athena_table_lookup": "true"})
+        same_reader.submit()
+        self.assertEqual(to_parquet.call_args.kwargs["table"], table)
+        app_config.get_s3_to_table_translator.return_value.get_location_entries.side_effect = lambda: iter([("s3://bucket/table1/", Mock())])
+        S3CloudTrailDataEventsReader(app_config, {**CONFIG, "athena_table_lookup": "true"}).submit()
+        self.assertNotEqual(to_parquet.call_args.kwargs["table"], table)
+
+    @patch("policy_readers.s3_table_location_lookup.wr.catalog.does_table_exist", return_value=True)
+    @patch("policy_readers.s3_table_location_lookup.wr.s3.to_parquet")
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_existing_table_lookup_is_not_written(self, get_query_results, to_parquet, does_table_exist):
+        get_query_results.return_value = pd.DataFrame(columns=["principal_arn", "s3_path", "events"])
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value.get_location_entries.return_value = iter([("s3://bucket/table1/", Mock())])
+
+        S3CloudTrailDataEventsReader(app_config, {**CONFIG, "athena_table_lookup": "true"}).read_policies()
+
+        does_table_exist.assert_called_once()
+        to_parquet.assert_not_called()
+        self._start_query_execution.assert_called_once()
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_s3_paths_are_mapped_with_s3_to_table_mapper(self, get_query_results):
+        # S3 paths are ARNs, so they are looked up with the ARN lookups of the mapper, not the s3:// path lookups.
+        get_query_results.return_value = pd.DataFrame([
+            {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/db/table1/dt=1/", "events": "[GetObject]"},
+            {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/db/", "events": "[GetObject]"},
+        ])
+        glueDataCatalog = GlueDataCatalog()
+        glueDataCatalog.add_catalog(GlueCatalog("us-east-1", "123456789012"))
+        glueDataCatalog.add_database(GlueDatabase("us-east-1", "123456789012", "db"))
+        glueDataCatalog.add_table(GlueTable("us-east-1", "123456789012", "db", "table1", "s3://bucket/db/table1/"))
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value = S3ToTableMapper(glueDataCatalog)
+
+        permissions = S3CloudTrailDataEventsReader(app_config, CONFIG).read_policies()
+
+        self.assertEqual(permissions.get_permissions_count(), 1)
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/db/table1/dt=1/"), {"s3:GetObject"})
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_submitted_query_is_read_later(self, get_query_results):
+        get_query_results.return_value = pd.DataFrame([_glue_event("GetDatabase", "DATABASE", "db1")])
+        reader = GlueEventCloudTrailPolicyReader(Mock(), CONFIG)
+
+        self.assertTrue(reader.submit())
+        self._start_query_execution.assert_called_once()
+
+        permissions = reader.read_policies()
+
+        self._start_query_execution.assert_called_once()
+        get_query_results.assert_called_once()
+        self.assertEqual(get_query_results.call_args.args[0], "query-id")
+        self.assertEqual(permissions.get_permissions_count(), 1)
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results", side_effect=RuntimeError("Query was cancelled"))
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.stop_query_execution")
+    def test_cancel_stops_submitted_query(self, stop_query_execution, get_query_results):
+        reader = GlueEventCloudTrailPolicyReader(Mock(), CONFIG)
+        reader.cancel()
+        stop_query_execution.assert_not_called()
+
+        reader.submit()
+        reader.cancel()
+
+        self.assertEqual(stop_query_execution.call_args.args[0], "query-id")
+
+
+class TestCloudTrailReadersArrowIngestion(unittest.TestCase):
+    """Tests that the Arrow ingestion path of the CloudTrail readers finds the same permissions as the pandas one."""
+
+    def setUp(self):
+        patcher = patch("aws_resources.readers.athena_query_reader.wr.athena.start_query_execution", return_value="query-id")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._config = {**CONFIG, "athena_arrow_ingestion": "true"}
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_glue_events(self, get_query_results):
+        get_query_results.return_value = iter([
+            pd.DataFrame([_glue_event("GetDatabases", "CATALOG"), _glue_event("GetDatabase", "DATABASE", "db1"),
+                          _glue_event("GetTable", "TABLE", "db1", "table1"), _glue_event("UpdateTable", "TABLE", "db1", "table1")]
+                         ).convert_dtypes(dtype_backend="pyarrow"),
+            pd.DataFrame([_glue_event("GetTable", "TABLE", "db1", None), _glue_event("GetDatabase", "DATABASE", None),
+                          dict(_glue_event("GetDatabase", "DATABASE", "db2"), user_arn=None),
+                          dict(_glue_event("GetDatabase", "DATABASE", "db3"), awsRegion=None),
+                          _glue_event("GetSomething", "UNKNOWN"), _glue_event("GetTable", "TABLE", "db1", "table1")]),
+        ])
+
+        permissions = GlueEventCloudTrailPolicyReader(Mock(), self._config).read_policies()
+
+        self.assertEqual(get_query_results.call_args.kwargs["dtype_backend"], "pyarrow")
+        self.assertEqual(permissions.get_permissions_count(), 3)
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:glue:us-east-1:123456789012:catalog"), {"glue:GetDatabases"})
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:glue:us-east-1:123456789012:database/db1"), {"glue:GetDatabase"})
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:glue:us-east-1:123456789012:table/db1/table1"),
+                         {"glue:GetTable", "glue:UpdateTable"})
+
+    @patch("aws_resources.readers.athena_query_reader.wr.athena.get_query_results")
+    def test_s3_events_as_strings_and_lists(self, get_query_results):
+        get_query_results.return_value = iter([
+            pd.DataFrame([{"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table1/", "events": "[GetObject, PutObject]"},
+                          {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/unknown/", "events": "[GetObject]"},
+                          {"principal_arn": None, "s3_path": "arn:aws:s3:::bucket/table2/", "events": "[GetObject]"},
+                          {"principal_arn": PRINCIPAL, "s3_path": None, "events": "[GetObject]"}]).convert_dtypes(dtype_backend="pyarrow"),
+            pd.DataFrame([{"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table2/", "events": np.array(["DeleteObject"])},
+                          {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table1/", "events": np.array(["GetObject", ""])},
+                          {"principal_arn": PRINCIPAL, "s3_path": "arn:aws:s3:::bucket/table3/", "events": []}]),
+        ])
+        app_config = Mock()
+        app_config.get_s3_to_table_translator.return_value.get_tables_from_s3_arn_postfix.side_effect = \
+            lambda s3_path: [] if "unknown" in s3_path else [Mock()]
+
+        permissions = S3CloudTrailDataEventsReader(app_config, self._config).read_policies()
+
+        self.assertEqual(permissions.get_permissions_count(), 2)
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/table1/"), {"s3:GetObject", "s3:PutObject"})
+        self.assertEqual(permissions.get_permission_actions(PRINCIPAL, "arn:aws:s3:::bucket/table2/"), {"s3:DeleteObject"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -306,6 +306,38 @@ class TestIamPolicyParserGlueResourceWildcards(unittest.TestCase):
         self.assertIn(f"arn:aws:glue:{REGION}:{CATALOG_ID}:database/test_database", resource_arns)
         self.assertIn(f"arn:aws:glue:{REGION}:{CATALOG_ID}:database/test_database2", resource_arns)
 
+    def test_glue_table_glob_pattern(self):
+        """Resource: table/test_data*/test_table? should match the tables whose names match the globs."""
+        app_config, iam_reader = _make_app_config()
+        reader = _make_reader(app_config, iam_reader, {
+            PRINCIPAL: [_make_policy([{
+                "Effect": "Allow",
+                "Action": ["glue:GetTable"],
+                "Resource": f"arn:aws:glue:{REGION}:{CATALOG_ID}:table/test_data*2/test_table?"
+            }])]
+        })
+
+        perms = reader.read_policies()
+        resource_arns = {p.resource_arn() for p in perms.get_permissions()}
+
+        self.assertEqual(resource_arns, {f"arn:aws:glue:{REGION}:{CATALOG_ID}:table/test_database2/test_table{i}" for i in range(2, 10)})
+
+    def test_glue_database_glob_pattern(self):
+        """Resource: database/test_database? should match test_database2 but not test_database."""
+        app_config, iam_reader = _make_app_config()
+        reader = _make_reader(app_config, iam_reader, {
+            PRINCIPAL: [_make_policy([{
+                "Effect": "Allow",
+                "Action": ["glue:GetDatabase"],
+                "Resource": f"arn:aws:glue:{REGION}:{CATALOG_ID}:database/test_database?"
+            }])]
+        })
+
+        perms = reader.read_policies()
+        resource_arns = {p.resource_arn() for p in perms.get_permissions()}
+
+        self.assertEqual(resource_arns, {f"arn:aws:glue:{REGION}:{CATALOG_ID}:database/test_database2"})
+
     def test_glue_specific_table_no_wildcard(self):
         """Resource: specific table ARN should match exactly one table."""
         app_config, iam_reader = _make_app_config()
@@ -848,6 +880,23 @@ class TestIamPolicyParserS3EdgeCases(unittest.TestCase):
         for p in perms_list:
             self.assertSetEqual(p.permission_actions(), {"s3:GetObject", "s3:PutObject"})
 
+    def test_s3_wildcard_in_middle_of_path(self):
+        """S3 wildcards in the middle of the path expand to the tables whose locations match."""
+        app_config, iam_reader = _make_app_config()
+        reader = _make_reader(app_config, iam_reader, {
+            PRINCIPAL: [_make_policy([{
+                "Effect": "Allow",
+                "Action": ["s3:GetObject"],
+                "Resource": "arn:aws:s3:::mybucket/*_abc/test_table?/*"
+            }])]
+        })
+
+        perms = reader.read_policies()
+        perms_list = perms.get_permissions()
+
+        self.assertEqual(len(perms_list), 1)
+        self.assertEqual(perms_list[0].resource_arn(), "arn:aws:s3:::mybucket/test_database2_abc/test_table3/*")
+
     def test_s3_wildcard_no_matching_tables(self):
         """S3 wildcard pointing to a path with no tables."""
         app_config, iam_reader = _make_app_config()